@@ -0,0 +1,121 @@
+import time
+import random
+import logging
+from typing import Optional
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+BLOCK_CAPTCHA = 'captcha'
+BLOCK_AUTHWALL = 'authwall'
+BLOCK_LOGIN = 'login'
+
+# URL fragments that mean we were redirected away from the page we asked for
+BLOCK_URL_MARKERS = [
+    ('google.com/sorry', BLOCK_CAPTCHA),
+    ('linkedin.com/checkpoint', BLOCK_CAPTCHA),
+    ('linkedin.com/authwall', BLOCK_AUTHWALL),
+    ('linkedin.com/login', BLOCK_LOGIN),
+    ('linkedin.com/uas/login', BLOCK_LOGIN),
+    ('linkedin.com/signup', BLOCK_LOGIN),
+]
+
+# Page text that shows up on interstitials served under the original URL
+BLOCK_PAGE_MARKERS = [
+    ('our systems have detected unusual traffic', BLOCK_CAPTCHA),
+    ('id="captcha-form"', BLOCK_CAPTCHA),
+    ('class="g-recaptcha"', BLOCK_CAPTCHA),
+    ("let's do a quick security check", BLOCK_CAPTCHA),
+    ('join linkedin to see', BLOCK_AUTHWALL),
+]
+
+
+class BlockDetectedError(Exception):
+    """
+    Raised when Google or LinkedIn serves a CAPTCHA, authwall or login page
+    instead of the page we requested
+    """
+    def __init__(self, block_type: str, url: str = ''):
+        self.block_type = block_type
+        self.url = url
+        super().__init__(f"{block_type} detected at {url}")
+
+
+def detect_block(driver) -> Optional[str]:
+    """
+    Check the page currently loaded in the driver for a block
+    Returns the block type or None if the page looks normal
+    """
+    try:
+        current_url = driver.current_url.lower()
+    except Exception:
+        return None
+
+    for marker, block_type in BLOCK_URL_MARKERS:
+        if marker in current_url:
+            return block_type
+
+    try:
+        page_source = driver.page_source.lower()
+    except Exception:
+        return None
+
+    for marker, block_type in BLOCK_PAGE_MARKERS:
+        if marker in page_source:
+            return block_type
+
+    return None
+
+
+def raise_if_blocked(driver):
+    """
+    Raise BlockDetectedError if the current page is a block page
+    """
+    block_type = detect_block(driver)
+    if block_type:
+        raise BlockDetectedError(block_type, driver.current_url)
+
+
+class CircuitBreaker:
+    """
+    Per-worker circuit breaker that backs off exponentially on consecutive blocks
+    and resets as soon as a record goes through cleanly
+    """
+    def __init__(self, base_delay: float = 30, max_delay: float = 900, worker_id: int = 0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.worker_id = worker_id
+        self.consecutive_blocks = 0
+        self.total_blocks = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.consecutive_blocks > 0
+
+    def record_success(self):
+        """
+        Close the breaker after a clean record
+        """
+        if self.consecutive_blocks:
+            logger.info(f"Worker {self.worker_id}: Circuit breaker closed after {self.consecutive_blocks} block(s)")
+        self.consecutive_blocks = 0
+
+    def record_block(self, block_type: str) -> float:
+        """
+        Open the breaker and return how long to pause before the next attempt
+        """
+        self.consecutive_blocks += 1
+        self.total_blocks += 1
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (self.consecutive_blocks - 1)))
+        delay += random.uniform(0, delay * 0.1)
+
+        logger.warning(f"Worker {self.worker_id}: {block_type} detected "
+                       f"({self.consecutive_blocks} in a row), backoff {delay:.0f}s")
+        return delay
+
+    def pause(self, delay: float):
+        """
+        Sleep for the backoff delay
+        """
+        time.sleep(delay)
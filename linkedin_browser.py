@@ -0,0 +1,427 @@
+import os
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import secrets
+import logging
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, quote
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchElementException, TimeoutException,
+                                        WebDriverException)
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+# Selenium's own page-load timeout, which a record budget shortens
+DEFAULT_PAGE_LOAD_TIMEOUT = 300.0
+
+# Shortest page-load timeout handed to the browser, so a nearly spent budget still gets a real attempt
+MIN_PAGE_LOAD_TIMEOUT = 1.0
+
+
+def pause(driver, seconds: float):
+    """
+    Fixed wait tied to a driver, e.g. for a page to settle or between records
+    Fake drivers scale it down so load tests measure orchestration, not sleeps
+    """
+    time.sleep(seconds * getattr(driver, 'wait_scale', 1.0))
+
+
+def load_page(driver, url: str, timeout: Optional[float] = None) -> bool:
+    """
+    driver.get bounded by timeout seconds; a load still running then is stopped
+    and whatever has rendered stays in the browser to extract from
+    Returns False if the load was cut short
+    """
+    if timeout is None:
+        driver.get(url)
+        return True
+
+    driver.set_page_load_timeout(max(timeout, MIN_PAGE_LOAD_TIMEOUT))
+    start_time = time.time()
+    try:
+        driver.get(url)
+        return True
+    except TimeoutException:
+        logger.warning(f"Stopped loading {url} after {time.time() - start_time:.1f}s, keeping the partial page")
+        try:
+            driver.execute_script("window.stop();")
+        except TimeoutException:
+            pass
+        return False
+    finally:
+        # Later plain driver.get calls (login checks, warm-ups) mustn't inherit a short budget
+        try:
+            driver.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT)
+        except WebDriverException:
+            pass
+
+
+class BrowserBackend:
+    """
+    Creates the drivers the enrichers work with
+    """
+    def create_driver(self, chrome_options):
+        raise NotImplementedError
+
+
+class SeleniumBackend(BrowserBackend):
+    """
+    Real Chrome through Selenium and webdriver-manager
+    """
+    def create_driver(self, chrome_options):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        service = Service(ChromeDriverManager().install())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+
+
+class FakeBackend(BrowserBackend):
+    """
+    In-memory browser for load tests: serves generated Google results and fixture
+    profile HTML with configurable latency and injected blocks, errors and crashes
+    """
+    def __init__(self, fixture_dir: str = None, serp_latency: float = 0.05, profile_latency: float = 0.1,
+                 jitter: float = 0.5, block_rate: float = 0.0, error_rate: float = 0.0,
+                 not_found_rate: float = 0.1, wait_scale: float = 0.0, seed: int = None,
+                 crash_rate: float = 0.0, hang_rate: float = 0.0, hang_seconds: float = 30.0,
+                 session_authority: 'FakeSessionAuthority' = None, launch_latency: float = 0.0):
+        self.fixture_dir = fixture_dir
+        self.serp_latency = serp_latency
+        self.profile_latency = profile_latency
+        self.jitter = jitter
+        self.block_rate = block_rate
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        # Fraction of page loads where the browser dies; every later call fails like a dead session
+        self.crash_rate = crash_rate
+        # Fraction of page loads that stay open for hang_seconds, like a page whose scripts never finish
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        # With an authority, LinkedIn pages need one of its session cookies and each session is throttled
+        self.session_authority = session_authority
+        # Seconds to start a browser, like Chrome and chromedriver launching
+        self.launch_latency = launch_latency
+        self.wait_scale = wait_scale
+        self.seed = seed
+
+    def create_driver(self, chrome_options=None):
+        if self.launch_latency:
+            time.sleep(self.launch_latency)
+        return FakeDriver(self)
+
+
+class FakeSessionAuthority:
+    """
+    Stand-in for LinkedIn's side of sessions in load tests: issues li_at cookies,
+    checks them on every LinkedIn page load and throttles a session past
+    max_requests profile loads per window_seconds, the way one account gets limited
+    Counts live in SQLite so every worker process sees the same ones
+    """
+    def __init__(self, path: str, max_requests: int = None, window_seconds: float = 60):
+        self.path = path
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS sessions (token TEXT PRIMARY KEY, name TEXT, "
+                     "window_start REAL, requests INTEGER)")
+        conn.commit()
+
+    def __getstate__(self):
+        # Each process opens its own connections
+        return {key: value for key, value in self.__dict__.items() if key != '_local'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connect(self):
+        # One connection per thread, spare drivers warm up in a background thread
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+        return self._local.conn
+
+    def issue(self, name: str) -> List[Dict]:
+        """
+        Cookies of a new logged-in session
+        """
+        token = secrets.token_hex(16)
+        self._connect().execute("INSERT INTO sessions VALUES (?, ?, 0, 0)", (token, name))
+        return [{'name': 'li_at', 'value': token, 'domain': '.www.linkedin.com', 'path': '/',
+                 'secure': True, 'httpOnly': True}]
+
+    def check(self, cookies: List[Dict], counted: bool = True) -> str:
+        """
+        'ok', 'invalid' (no or unknown session cookie) or 'throttled'
+        """
+        token = next((cookie['value'] for cookie in cookies if cookie.get('name') == 'li_at'), None)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT window_start, requests FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None:
+                return 'invalid'
+            if not counted:
+                return 'ok'
+            window_start, requests = row
+            now = time.time()
+            if now - window_start >= self.window_seconds:
+                window_start, requests = now, 0
+            requests += 1
+            conn.execute("UPDATE sessions SET window_start = ?, requests = ? WHERE token = ?",
+                         (window_start, requests, token))
+            return 'throttled' if self.max_requests and requests > self.max_requests else 'ok'
+        finally:
+            conn.execute("COMMIT")
+
+
+LOGIN_HTML = """<html><body><form class="login__form"><input id="username"></form></body></html>"""
+
+FEED_HTML = """<html><body><nav data-test-id="global-nav"><input placeholder="Search"></nav>
+<main data-test-id="main-feed"></main></body></html>"""
+
+CAPTCHA_HTML = """<html><body><form id="captcha-form">Our systems have detected unusual traffic
+from your computer network.</form></body></html>"""
+
+AUTHWALL_HTML = """<html><body><h1>Join LinkedIn to see the full profile</h1></body></html>"""
+
+PROFILE_TEMPLATE = """<html><body><main>
+<section><h1>{name}</h1>
+<div class="text-body-medium break-words">{title} at {company}</div>
+<span class="text-body-small inline t-black--light break-words">Austin, Texas, United States</span></section>
+<section><div id="experience"></div><ul><li><span aria-hidden="true">{title}</span>
+<span aria-hidden="true">{company}</span><span aria-hidden="true">Jan 2020 - Present</span></li></ul></section>
+</main></body></html>"""
+
+
+class FakeElement:
+    """
+    The parts of a Selenium WebElement the enrichers use, backed by BeautifulSoup
+    """
+    def __init__(self, driver: 'FakeDriver', tag):
+        self.driver = driver
+        self.tag = tag
+
+    @property
+    def text(self) -> str:
+        return ' '.join(self.tag.get_text(' ', strip=True).split())
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        value = self.tag.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def click(self):
+        href = self.tag.get('href')
+        if href:
+            self.driver.get(href)
+
+    def find_elements(self, by: str, value: str) -> List['FakeElement']:
+        return self.driver._find(self.tag, by, value)
+
+    def find_element(self, by: str, value: str) -> 'FakeElement':
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+
+class FakeDriver:
+    """
+    The parts of a Selenium WebDriver the enrichers use, with no browser or network
+    """
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+        self.wait_scale = backend.wait_scale
+        self.random = random.Random(backend.seed)
+        self.current_url = 'about:blank'
+        self.page_source = '<html><body></body></html>'
+        self.cookies = []
+        self._soup = None
+        self.crashed = False
+        self.page_load_timeout = DEFAULT_PAGE_LOAD_TIMEOUT
+        self._fixtures = []
+        if backend.fixture_dir and os.path.isdir(backend.fixture_dir):
+            for name in sorted(os.listdir(backend.fixture_dir)):
+                if name.endswith('.html'):
+                    with open(os.path.join(backend.fixture_dir, name), encoding='utf-8') as f:
+                        self._fixtures.append(f.read())
+
+    def _wait(self, latency: float):
+        time.sleep(latency * (1 + self.random.uniform(-self.backend.jitter, self.backend.jitter)))
+
+    def _serve(self, url: str, html: str):
+        self.current_url = url
+        self.page_source = html
+        self._soup = None
+
+    def _check_alive(self):
+        if self.crashed:
+            raise InvalidSessionIdException("invalid session id")
+
+    def _load(self, url: str, html: str):
+        """
+        Serve html; a hung load is cut off at the page-load timeout with the page
+        rendered so far, the way Chrome reports it
+        """
+        if self.backend.hang_rate and self.random.random() < self.backend.hang_rate:
+            time.sleep(min(self.backend.hang_seconds, self.page_load_timeout))
+            if self.backend.hang_seconds >= self.page_load_timeout:
+                self._serve(url, html)
+                raise TimeoutException(f"Timed out receiving message from renderer: {self.page_load_timeout:.3f}")
+        self._serve(url, html)
+
+    def set_page_load_timeout(self, seconds: float):
+        self.page_load_timeout = seconds
+
+    def get(self, url: str):
+        self._check_alive()
+        if self.random.random() < self.backend.crash_rate:
+            self.crashed = True
+            raise WebDriverException("chrome not reachable")
+        host = urlparse(url).netloc
+        if 'google.' in host:
+            self._wait(self.backend.serp_latency)
+            if self.random.random() < self.backend.error_rate:
+                self._serve(url, '<html><body></body></html>')
+                raise TimeoutException(f"Timed out loading {url}")
+            if self.random.random() < self.backend.block_rate:
+                return self._serve(f"https://www.google.com/sorry/index?continue={quote(url)}", CAPTCHA_HTML)
+            return self._load(url, self._serp_html(url))
+
+        if 'linkedin.' in host:
+            authority = self.backend.session_authority
+            if '/in/' not in url:
+                if authority and authority.check(self.cookies, counted=False) != 'ok':
+                    return self._serve(f"https://www.linkedin.com/login?session_redirect={quote(url)}", LOGIN_HTML)
+                return self._serve(url, FEED_HTML)
+            self._wait(self.backend.profile_latency)
+            if authority and authority.check(self.cookies) != 'ok':
+                return self._serve(f"https://www.linkedin.com/authwall?sessionRedirect={quote(url)}", AUTHWALL_HTML)
+            if self.random.random() < self.backend.error_rate:
+                self._serve(url, '<html><body></body></html>')
+                raise TimeoutException(f"Timed out loading {url}")
+            if self.random.random() < self.backend.block_rate:
+                return self._serve(f"https://www.linkedin.com/authwall?sessionRedirect={quote(url)}", AUTHWALL_HTML)
+            return self._load(url, self._profile_html(url))
+
+        self._serve(url, '<html><body></body></html>')
+
+    def _serp_html(self, url: str) -> str:
+        query = parse_qs(urlparse(url).query).get('q', [''])[0]
+        terms = query.replace('site:linkedin.com/in', '').split()
+        digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+        if not terms or int(digest[:8], 16) / 0xFFFFFFFF < self.backend.not_found_rate:
+            return '<html><body><div id="search"></div></body></html>'
+        slug = '-'.join(re.sub(r'[^a-z0-9]', '', term.lower()) for term in terms[:2])
+        links = ''.join(self._serp_result(f"https://www.linkedin.com/in/{slug}-{digest[i:i + 6]}", ' '.join(terms[:2]))
+                        for i in range(3))
+        # Google often repeats a result through a country subdomain with tracking parameters
+        links += (f'<div class="g"><a href="/url?q=https://uk.linkedin.com/in/{slug}-{digest[:6]}/%3Ftrk%3Dpublic_profile'
+                  f'&amp;sa=U"><h3>{" ".join(terms[:2])} - LinkedIn</h3></a></div>')
+        return f'<html><body><div id="search">{links}</div></body></html>'
+
+    def _person(self, url: str) -> tuple:
+        """
+        Name, title and company of the generated profile behind a URL
+        """
+        digest = int(hashlib.md5(url.encode('utf-8')).hexdigest()[:8], 16)
+        slug = url.rstrip('/').rsplit('/', 1)[-1]
+        name = ' '.join(part.title() for part in slug.split('-')[:2])
+        titles = ['Software Engineer', 'Product Manager', 'Account Executive', 'Analyst']
+        companies = ['Acme Corp', 'Globex', 'Initech', 'Umbrella']
+        return name, titles[digest % 4], companies[(digest >> 2) % 4]
+
+    def _serp_result(self, url: str, name: str) -> str:
+        """
+        One Google result; most titles carry the headline, some are bare names or old snippets
+        """
+        _, title, company = self._person(url)
+        variant = int(hashlib.md5(url.encode('utf-8')).hexdigest()[8:10], 16) % 5
+        heading = f"{name} | LinkedIn" if variant == 3 else f"{name} - {title} - {company} | LinkedIn"
+        snippet = f"Experience: {company} · Location: Austin, Texas, United States"
+        if variant == 4:
+            snippet = f"Mar 3, 2019 — {snippet}"
+        return (f'<div class="g"><a href="{url}"><h3>{heading}</h3></a>'
+                f'<div class="VwiC3b">{snippet}</div></div>')
+
+    def _profile_html(self, url: str) -> str:
+        digest = int(hashlib.md5(url.encode('utf-8')).hexdigest()[:8], 16)
+        if self._fixtures:
+            return self._fixtures[digest % len(self._fixtures)]
+        name, title, company = self._person(url)
+        return PROFILE_TEMPLATE.format(name=name, title=title, company=company)
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.page_source, 'lxml')
+        return self._soup
+
+    def _find(self, root, by: str, value: str) -> List[FakeElement]:
+        if by == By.CSS_SELECTOR:
+            tags = root.select(value)
+        elif by == By.TAG_NAME:
+            tags = root.find_all(value)
+        elif by == By.ID:
+            tags = root.find_all(id=value)
+        elif by == By.XPATH:
+            # XPath runs through lxml; each match is re-parsed so the element API stays the same
+            tree = lxml_html.fromstring(str(root))
+            tags = []
+            for match in tree.xpath(value):
+                fragment = BeautifulSoup(lxml_html.tostring(match, encoding='unicode'), 'lxml')
+                tags.append(fragment.find(match.tag))
+        else:
+            raise NotImplementedError(f"FakeDriver does not support locating by {by}")
+        return [FakeElement(self, tag) for tag in tags if tag is not None]
+
+    def find_elements(self, by: str, value: str) -> List[FakeElement]:
+        self._check_alive()
+        return self._find(self.soup, by, value)
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    def execute_script(self, script: str, *args):
+        if 'performance.getEntriesByType' in script:
+            return {'ttfb_ms': 0.0, 'dom_ready_ms': 0.0, 'load_ms': 0.0, 'transfer_bytes': len(self.page_source)}
+        return None
+
+    def execute_cdp_cmd(self, command: str, params: Dict) -> Dict:
+        self._check_alive()
+        if command == 'Network.getAllCookies':
+            return {'cookies': list(self.cookies)}
+        if command == 'Network.setCookies':
+            # Cookies with the same name and domain are replaced, like in Chrome
+            added = list(params.get('cookies', []))
+            keys = {(cookie['name'], cookie.get('domain')) for cookie in added}
+            self.cookies = [cookie for cookie in self.cookies if (cookie['name'], cookie.get('domain')) not in keys] + added
+        if command == 'Network.deleteCookies':
+            self.cookies = [cookie for cookie in self.cookies
+                            if (cookie['name'], cookie.get('domain')) != (params.get('name'), params.get('domain'))]
+        return {}
+
+    def get_log(self, log_type: str) -> List[Dict]:
+        return []
+
+    def quit(self):
+        self._soup = None
@@ -0,0 +1,313 @@
+import re
+import time
+import sqlite3
+import threading
+import logging
+import pandas as pd
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote, quote
+
+try:
+    import pyarrow  # noqa: F401
+    # Arrow-backed strings run the vectorized .str operations in C
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = object
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "linkedin_cache.sqlite"
+
+# Input columns used to build the search key
+NAME_COLUMNS = ['first_name', 'last_name', 'company', 'location']
+
+# Input values that mean "no data" (pandas NaN shows up as 'nan' once stringified)
+MISSING_VALUES = ['nan', 'none', 'not specified']
+
+# Any LinkedIn host (www, country subdomains, mobile) followed by /in/<slug>
+PROFILE_URL_PATTERN = re.compile(r'^(?:https?://)?(?:[a-z0-9-]+\.)*linkedin\.com/(?:mwlite/)?in/([^/?#&;]+)', re.IGNORECASE)
+
+# States of a profile load in the in-flight table
+INFLIGHT_CLAIMED = 'claimed'
+INFLIGHT_LOADING = 'loading'
+INFLIGHT_DONE = 'done'
+INFLIGHT_FAILED = 'failed'
+
+# A load that hasn't finished after this long is assumed to belong to a dead worker
+INFLIGHT_STALE_SECONDS = 180
+
+# Profile fields kept in the profile cache, keyed by LinkedIn URL
+PROFILE_COLUMNS = [
+    'headline', 'current_title', 'current_company', 'location_linkedin',
+    'industry_linkedin', 'education', 'experience', 'description', 'last_enriched_at'
+]
+
+
+def normalize_value(value) -> str:
+    """
+    Single-value version of the normalization done by normalize_input_frame
+    """
+    text = '' if value is None else str(value).strip()
+    return '' if text.lower() in MISSING_VALUES else text
+
+
+def make_search_key(first_name: str, last_name: str, company: str = '', location: str = '') -> str:
+    """
+    Build the search cache key for one record
+    """
+    parts = [' '.join(normalize_value(value).lower().split()) for value in (first_name, last_name, company, location)]
+    return '|'.join(parts)
+
+
+def canonical_profile_url(url: str) -> str:
+    """
+    Canonical form of a LinkedIn profile link: https://www.linkedin.com/in/<slug>
+    Unwraps Google redirects and drops country subdomains, extra path segments,
+    query strings and trailing slashes. Returns '' for anything that isn't a profile link
+    """
+    url = normalize_value(url)
+    parsed = urlparse(url)
+    if parsed.path == '/url' or 'url?q=' in url:
+        query = parse_qs(parsed.query)
+        url = (query.get('q') or query.get('url') or [''])[0]
+
+    match = PROFILE_URL_PATTERN.match(unquote(url).strip())
+    if not match:
+        return ''
+    # Slugs are case-insensitive; re-encode so non-ASCII slugs have one spelling
+    return f"https://www.linkedin.com/in/{quote(match.group(1).lower(), safe='-_')}"
+
+
+def profile_key(url: str) -> str:
+    """
+    Build the profile cache key for a LinkedIn URL
+    """
+    canonical_url = canonical_profile_url(url)
+    if canonical_url:
+        return canonical_url
+    return normalize_value(url).split('?')[0].split('#')[0].rstrip('/').lower()
+
+
+def _profile_keys(urls: pd.Series) -> pd.Series:
+    # Inputs repeat a lot, so canonicalize each distinct URL once
+    unique_urls = urls.astype(object).unique()
+    return urls.astype(object).map(dict(zip(unique_urls, map(profile_key, unique_urls))))
+
+
+def _normalize_column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=STRING_DTYPE)
+    values = df[column].fillna('').astype(str).astype(STRING_DTYPE).str.strip()
+    return values.mask(values.str.lower().isin(MISSING_VALUES), '')
+
+
+def normalize_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Stripped copies of columns with missing values as '', and '' for columns df lacks
+    """
+    return pd.DataFrame({column: _normalize_column(df, column) for column in columns}, index=df.index)
+
+
+def normalize_input_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized equivalent of the per-row str(...).strip() and 'nan' checks
+    Returns a frame aligned with df holding the cleaned Email and name columns, any
+    LinkedIn URLs already present in the input, the search key and has_name
+    """
+    normalized = pd.DataFrame(index=df.index)
+    for column in ['Email'] + NAME_COLUMNS + ['linkedin_url', 'additional_linkedin_urls']:
+        normalized[column] = _normalize_column(df, column)
+
+    key_parts = [normalized[column].str.lower().str.replace(r'\s+', ' ', regex=True) for column in NAME_COLUMNS]
+    normalized['search_key'] = key_parts[0].str.cat(key_parts[1:], sep='|')
+    normalized['has_name'] = ((normalized['first_name'] != '') & (normalized['last_name'] != '')).astype(bool)
+    return normalized
+
+
+class EnrichmentCache:
+    """
+    SQLite-backed search cache (search key -> LinkedIn URLs) and profile cache
+    (LinkedIn URL -> extracted fields), shared by all workers on a machine
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                search_key TEXT PRIMARY KEY,
+                linkedin_url TEXT,
+                additional_linkedin_urls TEXT,
+                searched_at TEXT
+            )
+        """)
+        profile_columns = ', '.join(f"{column} TEXT" for column in PROFILE_COLUMNS)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS profile_cache (
+                profile_key TEXT PRIMARY KEY,
+                linkedin_url TEXT,
+                {profile_columns}
+            )
+        """)
+        
+        # Caches created before a profile field was added get the new column
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(profile_cache)")}
+        for column in PROFILE_COLUMNS:
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE profile_cache ADD COLUMN {column} TEXT")
+        
+        # Keys written before URLs were fully canonicalized are rewritten once; when two old
+        # keys map to the same profile the most recently enriched row wins
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            rows = self.conn.execute(
+                "SELECT rowid, profile_key FROM profile_cache ORDER BY last_enriched_at DESC"
+            ).fetchall()
+            kept = set()
+            for rowid, key in rows:
+                new_key = profile_key(key)
+                if new_key in kept:
+                    self.conn.execute("DELETE FROM profile_cache WHERE rowid = ?", (rowid,))
+                    continue
+                kept.add(new_key)
+                if new_key != key:
+                    self.conn.execute("UPDATE OR REPLACE profile_cache SET profile_key = ? WHERE rowid = ?",
+                                      (new_key, rowid))
+            self.conn.execute("PRAGMA user_version = 1")
+        
+        # Profiles being loaded right now, so two workers never load the same one
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS inflight (
+                profile_key TEXT PRIMARY KEY,
+                owner TEXT,
+                state TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def store_search(self, search_key: str, linkedin_url: str, additional_urls: List[str]):
+        """
+        Remember the URLs a search returned
+        """
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)",
+                (search_key, linkedin_url, '; '.join(additional_urls) if additional_urls else '',
+                 pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            self.conn.commit()
+
+    def store_profile(self, profile_data: Dict[str, str]):
+        """
+        Remember the fields extracted from a profile
+        Profiles where nothing could be extracted are not cached
+        """
+        if not any(profile_data.get(column) for column in ['current_title', 'current_company', 'description']):
+            return
+
+        columns = ['profile_key', 'linkedin_url'] + PROFILE_COLUMNS
+        values = [profile_key(profile_data['linkedin_url']), profile_data['linkedin_url']]
+        values += [profile_data.get(column, '') for column in PROFILE_COLUMNS]
+        placeholders = ', '.join('?' * len(values))
+        with self._lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO profile_cache ({', '.join(columns)}) VALUES ({placeholders})", values
+            )
+            self.conn.commit()
+
+    def get_profile(self, linkedin_url: str) -> Optional[Dict[str, str]]:
+        """
+        Cached fields for one profile, or None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT linkedin_url, {', '.join(PROFILE_COLUMNS)} FROM profile_cache WHERE profile_key = ?",
+                (profile_key(linkedin_url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {column: value or '' for column, value in zip(['linkedin_url'] + PROFILE_COLUMNS, row)}
+
+    def claim_profile(self, linkedin_url: str, owner: str, stale_seconds: float = INFLIGHT_STALE_SECONDS) -> str:
+        """
+        Try to become the one worker loading a profile in this run
+        Returns INFLIGHT_CLAIMED if the caller should load it, INFLIGHT_LOADING if
+        another worker is loading it, or INFLIGHT_DONE if it was already loaded
+        """
+        key = profile_key(linkedin_url)
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so check-and-set is atomic across processes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT owner, state, updated_at FROM inflight WHERE profile_key = ?",
+                                        (key,)).fetchone()
+                if row and row[1] == INFLIGHT_DONE:
+                    state = INFLIGHT_DONE
+                elif row and row[1] == INFLIGHT_LOADING and row[0] != owner and row[2] > now - stale_seconds:
+                    state = INFLIGHT_LOADING
+                else:
+                    self.conn.execute("INSERT OR REPLACE INTO inflight VALUES (?, ?, ?, ?)",
+                                      (key, owner, INFLIGHT_LOADING, now))
+                    state = INFLIGHT_CLAIMED
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return state
+
+    def finish_profile(self, linkedin_url: str, owner: str, success: bool):
+        """
+        Mark a claimed profile as loaded, or release it so another worker can retry
+        """
+        with self._lock:
+            self.conn.execute("UPDATE inflight SET state = ?, updated_at = ? WHERE profile_key = ? AND owner = ?",
+                              (INFLIGHT_DONE if success else INFLIGHT_FAILED, time.time(),
+                               profile_key(linkedin_url), owner))
+            self.conn.commit()
+
+    def clear_inflight(self):
+        """
+        Forget which profiles were loaded, at the start of a run
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM inflight")
+            self.conn.commit()
+
+    def lookup(self, normalized: pd.DataFrame) -> pd.DataFrame:
+        """
+        Join a normalized input frame against both caches in bulk
+        Returns a frame aligned with the input holding linkedin_url,
+        additional_linkedin_urls, the cached profile fields and profile_hit.
+        URLs already present in the input take precedence over cached searches.
+        """
+        with self._lock:
+            searches = pd.read_sql_query(
+                "SELECT search_key, linkedin_url, additional_linkedin_urls FROM search_cache", self.conn
+            ).set_index('search_key')
+            profiles = pd.read_sql_query(
+                f"SELECT profile_key, {', '.join(PROFILE_COLUMNS)} FROM profile_cache", self.conn
+            ).set_index('profile_key')
+
+        found = searches.reindex(normalized['search_key']).fillna('').astype(STRING_DTYPE)
+        found.index = normalized.index
+
+        input_urls = normalized['linkedin_url']
+        has_input_url = input_urls != ''
+        urls = input_urls.where(has_input_url, found['linkedin_url'])
+        additional = normalized['additional_linkedin_urls'].where(has_input_url, found['additional_linkedin_urls'])
+
+        cached = profiles.reindex(_profile_keys(urls))
+        cached.index = normalized.index
+
+        result = cached[PROFILE_COLUMNS].fillna('')
+        result['linkedin_url'] = urls
+        result['additional_linkedin_urls'] = additional
+        result['profile_hit'] = ((urls != '') & cached['last_enriched_at'].notna()).astype(bool)
+        return result
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,113 @@
+import math
+import statistics
+import logging
+from typing import List, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencySample:
+    """
+    What the run looked like over one control interval
+    """
+    def __init__(self, workers: int, records_per_minute: float, block_rate: float, error_rate: float,
+                 record_seconds: List[float]):
+        self.workers = workers
+        self.records_per_minute = records_per_minute
+        self.block_rate = block_rate
+        self.error_rate = error_rate
+        self.median_seconds = statistics.median(record_seconds) if record_seconds else None
+
+    def __repr__(self):
+        latency = f"{self.median_seconds:.1f}s" if self.median_seconds is not None else "n/a"
+        return (f"{self.workers} workers: {self.records_per_minute:.1f} records/min, "
+                f"block rate {self.block_rate:.1%}, error rate {self.error_rate:.1%}, median {latency}/record")
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease worker count
+    Adds one worker per interval while throughput keeps improving and blocks, errors
+    and latency stay low; cuts the worker count by decrease_factor as soon as any
+    of them spikes, then holds for a few intervals before probing upwards again
+    """
+    def __init__(self, min_workers: int = 1, max_workers: int = 8, initial_workers: int = None,
+                 decrease_factor: float = 0.5, max_block_rate: float = 0.05, max_error_rate: float = 0.1,
+                 max_latency_factor: float = 2.0, min_gain: float = 0.05, cooldown_intervals: int = 2):
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        self.workers = min(max(initial_workers or min_workers, min_workers), self.max_workers)
+        self.decrease_factor = decrease_factor
+        self.max_block_rate = max_block_rate
+        self.max_error_rate = max_error_rate
+        self.max_latency_factor = max_latency_factor
+        self.min_gain = min_gain
+        self.cooldown_intervals = cooldown_intervals
+
+        # Fastest median record time seen, the reference for latency spikes
+        self.baseline_seconds = None
+        # Throughput before the last increase, to tell whether it paid off
+        self._throughput_before_increase = None
+        self._cooldown = 0
+        # Worker counts where adding another one didn't help
+        self._plateau = None
+
+    def decide(self, sample: ConcurrencySample) -> Tuple[int, str]:
+        """
+        New worker count and the reason for it, given the last interval
+        """
+        if sample.median_seconds is not None:
+            if self.baseline_seconds is None or sample.median_seconds < self.baseline_seconds:
+                self.baseline_seconds = sample.median_seconds
+
+        reason = self._backoff_reason(sample)
+        if reason:
+            target = max(self.min_workers, math.floor(self.workers * self.decrease_factor))
+            self._cooldown = self.cooldown_intervals
+            self._throughput_before_increase = None
+            # Whatever plateau we measured was under different conditions
+            self._plateau = None
+            return self._set(target, reason)
+
+        if self._cooldown:
+            self._cooldown -= 1
+            return self._set(self.workers, f"holding after backoff ({self._cooldown} intervals left)")
+
+        # The last increase didn't buy enough throughput: step back and stay there
+        if self._throughput_before_increase is not None:
+            gain = (sample.records_per_minute / self._throughput_before_increase - 1
+                    if self._throughput_before_increase else 1.0)
+            self._throughput_before_increase = None
+            if gain < self.min_gain:
+                self._plateau = self.workers - 1
+                return self._set(max(self.min_workers, self.workers - 1),
+                                 f"last worker added {gain:.0%} throughput (< {self.min_gain:.0%}), removing it")
+
+        if self.workers >= self.max_workers:
+            return self._set(self.workers, f"at the maximum of {self.max_workers} workers")
+        if self._plateau is not None and self.workers >= self._plateau:
+            return self._set(self.workers, f"throughput plateaued at {self._plateau} workers")
+
+        self._throughput_before_increase = sample.records_per_minute
+        return self._set(self.workers + 1, "throughput healthy, blocks and errors low: adding a worker")
+
+    def _backoff_reason(self, sample: ConcurrencySample) -> Optional[str]:
+        if sample.block_rate > self.max_block_rate:
+            return f"block rate {sample.block_rate:.1%} above {self.max_block_rate:.1%}"
+        if sample.error_rate > self.max_error_rate:
+            return f"error rate {sample.error_rate:.1%} above {self.max_error_rate:.1%}"
+        if (sample.median_seconds is not None and self.baseline_seconds
+                and sample.median_seconds > self.baseline_seconds * self.max_latency_factor):
+            return (f"median record time {sample.median_seconds:.1f}s is over {self.max_latency_factor:g}x "
+                    f"the best seen ({self.baseline_seconds:.1f}s)")
+        return None
+
+    def _set(self, target: int, reason: str) -> Tuple[int, str]:
+        self.workers = target
+        return target, reason
+
+    def __repr__(self):
+        return (f"{self.min_workers}-{self.max_workers} workers, x{self.decrease_factor:g} on blocks > "
+                f"{self.max_block_rate:.0%}, errors > {self.max_error_rate:.0%} or latency > "
+                f"{self.max_latency_factor:g}x best")
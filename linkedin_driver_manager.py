@@ -0,0 +1,387 @@
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+from linkedin_block_detector import detect_block
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is skipped without psutil
+    psutil = None
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Cookie fields accepted by the DevTools Network.setCookies command
+SESSION_COOKIE_FIELDS = ['name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires']
+
+# Page a spare loads to check it is ready; search-only drivers have no LinkedIn session to check
+WARMUP_URL = "https://www.linkedin.com/feed/"
+SEARCH_WARMUP_URL = "https://www.google.com/"
+
+# Drivers each worker keeps launched and logged in ahead of need, and at most; off by
+# default since every spare is another Chrome process on top of the per-worker budget
+DEFAULT_SPARE_DRIVERS = 0
+MAX_SPARE_DRIVERS = 4
+
+# WebDriver errors that mean Chrome or chromedriver is gone, rather than a bad page
+CRASH_ERRORS = ['InvalidSessionIdException', 'NoSuchWindowException']
+CRASH_MARKERS = [
+    'invalid session id', 'chrome not reachable', 'session deleted', 'disconnected:',
+    'target window already closed', 'unable to receive message from renderer',
+    'connection refused', 'max retries exceeded'
+]
+
+
+class DriverCrashedError(Exception):
+    """
+    Raised when the browser died under a record; the driver has to be replaced
+    """
+
+
+def raise_if_crashed(error: Exception):
+    """
+    Re-raise error as DriverCrashedError if it came from a dead browser, so code that
+    swallows page errors doesn't turn a crash into an empty result
+    """
+    if isinstance(error, DriverCrashedError):
+        raise error
+    message = str(error).strip()
+    if type(error).__name__ in CRASH_ERRORS or any(marker in message.lower() for marker in CRASH_MARKERS):
+        # Selenium messages carry a stack trace after the first line
+        first_line = (message.splitlines() or [''])[0]
+        raise DriverCrashedError(f"{type(error).__name__}: {first_line}") from error
+
+
+def export_session_cookies(driver, domain: str = 'linkedin.com') -> List[Dict]:
+    """
+    Export the cookies for a domain from a running driver via DevTools
+    """
+    cookies = []
+    try:
+        all_cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        for cookie in all_cookies:
+            if domain not in cookie.get('domain', ''):
+                continue
+            if cookie.get('session'):
+                cookie.pop('expires', None)
+            cookies.append({key: cookie[key] for key in SESSION_COOKIE_FIELDS if key in cookie})
+    except Exception as e:
+        logger.warning(f"Could not export session cookies: {e}")
+    return cookies
+
+
+def import_session_cookies(driver, cookies: List[Dict]) -> bool:
+    """
+    Inject previously exported cookies into a fresh driver before its first page load
+    """
+    if not cookies:
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not restore session cookies: {e}")
+        return False
+
+
+def replace_session_cookies(driver, cookies: List[Dict], domain: str = 'linkedin.com') -> bool:
+    """
+    Swap the driver's cookies for a domain for another session's, leaving other sites' cookies alone
+    """
+    try:
+        for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']:
+            if domain in cookie.get('domain', ''):
+                driver.execute_cdp_cmd('Network.deleteCookies', {'name': cookie['name'], 'domain': cookie['domain']})
+    except Exception as e:
+        logger.warning(f"Could not clear session cookies: {e}")
+    return import_session_cookies(driver, cookies)
+
+
+def chrome_memory_mb(driver) -> Optional[float]:
+    """
+    Resident memory of the chromedriver process and every Chrome process under it
+    Returns None if psutil is not installed or the process tree can't be read
+    """
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class DriverManager:
+    """
+    Owns a worker's Chrome driver and recycles it after too many page loads,
+    too much resident memory or repeated errors. Replacements are launched,
+    given the session and checked in a background thread so the swap itself
+    is instant: with spares set that many stay ready at all times, otherwise
+    one is warmed up as the driver nears a limit.
+    Each driver gets a profile slot no other running driver uses, passed to
+    driver_factory so it can pick its own user data directory.
+    """
+    def __init__(self, driver_factory: Callable[[int], object], max_page_loads: int = 300,
+                 max_memory_mb: float = 2048, max_errors: int = 5, warmup_fraction: float = 0.8,
+                 worker_id: int = 0, spares: int = 0, warmup_url: str = WARMUP_URL):
+        self.driver_factory = driver_factory
+        self.max_page_loads = max_page_loads
+        self.max_memory_mb = max_memory_mb
+        self.max_errors = max_errors
+        self.warmup_fraction = warmup_fraction
+        self.worker_id = worker_id
+        self.spares = min(max(spares, 0), MAX_SPARE_DRIVERS)
+        self.warmup_url = warmup_url
+
+        self.driver = None
+        self.slot = None
+        self.page_loads = 0
+        self.consecutive_errors = 0
+        self.recycle_count = 0
+
+        # True when the current driver was verified as logged in during warm-up
+        self.verified = False
+
+        # Ready spares as (driver, verified, slot, epoch); drop_spares bumps the epoch
+        # so a spare still warming up with an old session is thrown away
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._spares = []
+        self._epoch = 0
+        self._slots = set()
+        self._cookies = []
+        self._warmup_thread = None
+        self._retire_threads = []
+
+    def start(self):
+        """
+        Launch the first driver
+        """
+        self.slot = self._take_slot()
+        try:
+            self.driver = self.driver_factory(self.slot)
+        except Exception:
+            self._free_slot(self.slot)
+            raise
+        self.verified = False
+        return self.driver
+
+    def record_page_load(self, count: int = 1):
+        self.page_loads += count
+
+    def record_error(self):
+        self.consecutive_errors += 1
+
+    def record_success(self):
+        self.consecutive_errors = 0
+
+    def recycle_reason(self, memory_mb: Optional[float] = None) -> Optional[str]:
+        """
+        Return why the current driver should be retired, or None if it is healthy
+        """
+        if self.page_loads >= self.max_page_loads:
+            return f"{self.page_loads} page loads"
+        if self.consecutive_errors >= self.max_errors:
+            return f"{self.consecutive_errors} consecutive errors"
+        if memory_mb is not None and memory_mb >= self.max_memory_mb:
+            return f"{memory_mb:.0f} MB resident memory"
+        return None
+
+    def _nearing_limit(self, memory_mb: Optional[float] = None) -> bool:
+        if self.page_loads >= self.max_page_loads * self.warmup_fraction:
+            return True
+        return memory_mb is not None and memory_mb >= self.max_memory_mb * self.warmup_fraction
+
+    def maintain(self):
+        """
+        Call between records: keeps the spares topped up (or starts warming one as
+        the driver nears a limit) and swaps a spare in once a limit is reached
+        Returns the driver to use for the next record
+        """
+        memory_mb = chrome_memory_mb(self.driver)
+        reason = self.recycle_reason(memory_mb)
+        if reason:
+            return self.recycle(reason)
+        if self.spares or self._nearing_limit(memory_mb):
+            self.start_warmup()
+        return self.driver
+
+    def _take_slot(self) -> int:
+        with self._lock:
+            slot = 0
+            while slot in self._slots:
+                slot += 1
+            self._slots.add(slot)
+            return slot
+
+    def _free_slot(self, slot: int):
+        with self._lock:
+            self._slots.discard(slot)
+
+    def _session_cookies(self) -> List[Dict]:
+        """
+        Cookies of the current driver, or the last ones read if it has crashed
+        """
+        cookies = export_session_cookies(self.driver) if self.driver else []
+        if cookies:
+            self._cookies = cookies
+        return self._cookies
+
+    def spares_ready(self) -> int:
+        with self._lock:
+            return len(self._spares)
+
+    def start_warmup(self):
+        """
+        Launch and warm up replacement drivers in the background until the spares
+        setting (at least one) are ready
+        """
+        if self._warmup_thread and self._warmup_thread.is_alive():
+            return
+        target = max(self.spares, 1)
+        if self.spares_ready() >= target:
+            return
+
+        # Read cookies here, the current driver must not be used from two threads
+        cookies = self._session_cookies()
+        self._warmup_thread = threading.Thread(target=self._warm_up, args=(cookies, target, self._epoch),
+                                               daemon=True)
+        self._warmup_thread.start()
+
+    def _warm_up(self, cookies: List[Dict], target: int, epoch: int):
+        try:
+            while epoch == self._epoch and self.spares_ready() < target:
+                slot = self._take_slot()
+                driver = None
+                try:
+                    driver = self.driver_factory(slot)
+                    import_session_cookies(driver, cookies)
+                    driver.get(self.warmup_url)
+                    block_type = detect_block(driver)
+                    if block_type:
+                        logger.warning(f"Worker {self.worker_id}: Spare driver hit {block_type} during warm-up")
+                    verified = block_type is None
+                except Exception as e:
+                    logger.warning(f"Worker {self.worker_id}: Spare driver warm-up failed: {e}")
+                    self._retire(driver, slot)
+                    return
+
+                with self._ready:
+                    current = epoch == self._epoch
+                    if current:
+                        self._spares.append((driver, verified, slot, epoch))
+                        ready = len(self._spares)
+                        self._ready.notify_all()
+                if not current:
+                    self._retire(driver, slot)
+                    return
+                logger.info(f"Worker {self.worker_id}: Spare driver ready ({ready} of {target})")
+        finally:
+            with self._ready:
+                self._ready.notify_all()
+
+    def _take_spare(self) -> Optional[tuple]:
+        """
+        Pop a ready spare, waiting for one that is warming up if none is ready yet
+        Returns None if warm-up failed
+        """
+        if not self.spares_ready():
+            self.start_warmup()
+        with self._ready:
+            while not self._spares and self._warmup_thread and self._warmup_thread.is_alive():
+                # The warm-up thread notifies on exit, the timeout covers exiting before the wait
+                self._ready.wait(0.5)
+            if not self._spares:
+                return None
+            driver, verified, slot, epoch = self._spares.pop(0)
+            return driver, verified, slot
+
+    def recycle(self, reason: str):
+        """
+        Swap in a fresh driver and retire the current one in the background
+        Returns the new driver
+        """
+        logger.info(f"Worker {self.worker_id}: Recycling driver ({reason})")
+        started = time.time()
+
+        old_driver, old_slot = self.driver, self.slot
+        was_ready = self.spares_ready() > 0
+        spare = self._take_spare()
+        if spare is not None:
+            self.driver, self.verified, self.slot = spare
+            source = 'warm spare' if was_ready else 'spare warmed on demand'
+        else:
+            # Warm-up failed, fall back to a cold start
+            cookies = self._session_cookies()
+            self._retire(old_driver, old_slot)
+            old_driver = old_slot = self.driver = None
+            self.start()
+            import_session_cookies(self.driver, cookies)
+            source = 'cold start'
+
+        self.page_loads = 0
+        self.consecutive_errors = 0
+        self.recycle_count += 1
+        self._retire(old_driver, old_slot)
+        logger.info(f"Worker {self.worker_id}: Driver replaced in {time.time() - started:.2f}s ({source})")
+
+        # Refill straight away from a driver known to be logged in; otherwise the
+        # next maintain() refills once the login has been checked
+        if self.spares and self.verified:
+            self.start_warmup()
+        return self.driver
+
+    def drop_spares(self):
+        """
+        Retire every spare, for instance after the worker moved to another session,
+        so a later swap doesn't bring back the old one; maintain() warms new ones
+        """
+        with self._lock:
+            self._epoch += 1
+            spares, self._spares = self._spares, []
+        self._cookies = []
+        for driver, verified, slot, epoch in spares:
+            self._retire(driver, slot)
+
+    def _retire(self, driver, slot: int):
+        """
+        Quit a driver in a background thread and free its profile slot once it has exited
+        """
+        if driver is None:
+            self._free_slot(slot)
+            return
+        thread = threading.Thread(target=self._quit_and_free, args=(driver, slot), daemon=True)
+        thread.start()
+        self._retire_threads = [t for t in self._retire_threads if t.is_alive()] + [thread]
+
+    def _quit_and_free(self, driver, slot: int):
+        self._quit_quietly(driver)
+        self._free_slot(slot)
+
+    def _quit_quietly(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Worker {self.worker_id}: Error closing retired driver: {e}")
+
+    def quit(self):
+        """
+        Close the current driver and every spare and wait for retired drivers to exit
+        """
+        self.drop_spares()
+        if self._warmup_thread:
+            self._warmup_thread.join()
+        if self.driver:
+            self._quit_and_free(self.driver, self.slot)
+            self.driver = None
+        for thread in self._retire_threads:
+            thread.join()
+        self._retire_threads = []
@@ -1,29 +1,57 @@
 import pandas as pd
-import time
 import re
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import quote_plus
 import logging
 from typing import Dict, Optional, List
 import os
-from linkedin_profile_scraper import LinkedInProfileScraper
+import argparse
+from collections import deque
+from linkedin_profile_scraper import LinkedInProfileScraper, to_enrichment_fields
+from linkedin_html_archive import HtmlArchive
+from linkedin_browser import BrowserBackend, SeleniumBackend, pause
+from linkedin_block_detector import BlockDetectedError, CircuitBreaker, raise_if_blocked
+from linkedin_driver_manager import DriverManager
+from linkedin_cache import EnrichmentCache, DEFAULT_CACHE_PATH, canonical_profile_url, PROFILE_COLUMNS, NAME_COLUMNS, normalize_input_frame
+from linkedin_schedule import (DeadlineGuard, parse_deadline, priority_order, report_remaining,
+                               PRIORITY_FILE, PRIORITY_VALUE, PRIORITY_POLICIES)
+from linkedin_export import (export_profiles, print_summary, found_profile_lines, read_table, FORMAT_CSV,
+                              OUTPUT_FORMATS)
+from linkedin_telemetry import (Telemetry, TelemetryReporter, DEFAULT_TELEMETRY_PATH, DEFAULT_STATUS_FILE,
+                                EVENT_BLOCK, EVENT_ERROR, STATE_SEARCHING, STATE_PROFILE, STATE_BACKOFF,
+                                STATE_STOPPED)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class LinkedInEnricher:
-    def __init__(self):
-        # Setup Chrome driver with stealth options
-        self.driver = self._setup_driver()
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH, archive_dir: str = None,
+                 browser_backend: BrowserBackend = None):
+        # Real Chrome unless a fake backend is passed in for load tests
+        self.browser_backend = browser_backend or SeleniumBackend()
+        
+        # Setup Chrome driver with stealth options; the manager recycles it as it ages
+        self.driver_manager = DriverManager(lambda slot: self._setup_driver())
+        self.driver = self.driver_manager.start()
+        
+        # Pause and rotate the driver when Google or LinkedIn starts blocking us
+        self.circuit_breaker = CircuitBreaker()
+        self.max_block_retries = 3
+        
+        # Search and profile results from earlier runs
+        self.cache = EnrichmentCache(cache_path)
+        
+        # Raw SERP and profile HTML for offline re-extraction, if enabled
+        self.archive = HtmlArchive(archive_dir) if archive_dir else None
+        
+        # Outcomes, blocks, errors and current state for the live status report
+        self.telemetry = Telemetry(DEFAULT_TELEMETRY_PATH, 'worker-0')
         
         # Ensure LinkedIn login
         self.ensure_linkedin_login()
@@ -38,11 +66,40 @@ class LinkedInEnricher:
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        return driver
+        return self.browser_backend.create_driver(chrome_options)
+    
+    def _rotate_driver(self, reason: str = 'rotation'):
+        """
+        Swap in a fresh driver (carrying over the LinkedIn session) and re-check the login
+        """
+        self.driver = self.driver_manager.recycle(reason)
+        if not self.driver_manager.verified:
+            self.ensure_linkedin_login()
+    
+    def _maintain_driver(self):
+        """
+        Recycle the driver between records once it hits its page, memory or error limit
+        """
+        driver = self.driver_manager.maintain()
+        if driver is not self.driver:
+            self.driver = driver
+            if not self.driver_manager.verified:
+                self.ensure_linkedin_login()
+    
+    def _recover_from_block(self, error: BlockDetectedError, attempts: int) -> bool:
+        """
+        Pause with backoff and rotate to a fresh driver after a block
+        A record out of retries is given up at once, without the pause or rotation
+        Returns True if the affected record should be requeued
+        """
+        delay = self.circuit_breaker.record_block(error.block_type)
+        self.telemetry.record(EVENT_BLOCK)
+        if attempts >= self.max_block_retries:
+            return False
+        self.telemetry.set_state(STATE_BACKOFF, f"{error.block_type}, {delay:.0f}s")
+        pause(self.driver, delay)
+        self._rotate_driver(error.block_type)
+        return True
     
     def ensure_linkedin_login(self) -> bool:
         """
@@ -52,7 +109,7 @@ class LinkedInEnricher:
         try:
             # Go to LinkedIn to check login status
             self.driver.get("https://www.linkedin.com/feed/")
-            time.sleep(5)  # Increased wait time
+            pause(self.driver, 5)  # Increased wait time
             
             # Multiple ways to check if we're logged in
             login_indicators = [
@@ -94,7 +151,7 @@ class LinkedInEnricher:
                 
                 # Refresh and check again
                 self.driver.refresh()
-                time.sleep(5)
+                pause(self.driver, 5)
                 
                 # Re-check login status
                 for indicator in login_indicators:
@@ -120,6 +177,7 @@ class LinkedInEnricher:
         """
         Search for LinkedIn profile using Google search
         Returns tuple: (primary_url, additional_urls_list)
+        The driver stays on Google; the profile is left to extract_profile_data
         """
         try:
             # Construct search query
@@ -134,30 +192,30 @@ class LinkedInEnricher:
             
             logger.info(f"Searching for: {first_name} {last_name}")
             logger.info(f"Search URL: {search_url}")
+            self.telemetry.set_state(STATE_SEARCHING, f"{first_name} {last_name}")
             
             self.driver.get(search_url)
-            time.sleep(5)  # Increased wait time
+            self.driver_manager.record_page_load()
+            pause(self.driver, 5)  # Increased wait time
+            
+            # A CAPTCHA page has no results, so don't report it as "not found"
+            raise_if_blocked(self.driver)
+            
+            if self.archive:
+                self.archive.save(search_url, self.driver.page_source, 'serp')
             
             # Look specifically for LinkedIn links
             linkedin_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='linkedin.com/in/']")
             
-            if linkedin_links:
-                # Clean up URLs (remove Google redirect)
-                clean_urls = []
-                for link in linkedin_links:
-                    url = link.get_attribute('href')
-                    if 'url?q=' in url:
-                        url = url.split('url?q=')[1].split('&')[0]
-                    clean_urls.append(url)
-                
-                # Remove duplicates while preserving order
-                unique_urls = []
-                seen = set()
-                for url in clean_urls:
-                    if url not in seen:
-                        unique_urls.append(url)
-                        seen.add(url)
-                
+            # Canonicalize every link (Google redirect, country subdomain, tracking parameters)
+            # and remove duplicates while preserving order
+            unique_urls = []
+            for link in linkedin_links:
+                url = canonical_profile_url(link.get_attribute('href'))
+                if url and url not in unique_urls:
+                    unique_urls.append(url)
+            
+            if unique_urls:
                 primary_url = unique_urls[0]
                 additional_urls = unique_urls[1:5]  # Get next 3-4 URLs (max 4 additional)
                 
@@ -165,26 +223,13 @@ class LinkedInEnricher:
                 if additional_urls:
                     logger.info(f"Found {len(additional_urls)} additional LinkedIn URLs")
                 
-                # Click on the first LinkedIn profile
-                try:
-                    linkedin_links[0].click()
-                    logger.info(f"Clicked on LinkedIn profile: {primary_url}")
-                    time.sleep(3)  # Wait for page to load
-                    
-                    # Check if we're on LinkedIn login page
-                    current_url = self.driver.current_url
-                    if "linkedin.com/authwall" in current_url or "linkedin.com/login" in current_url:
-                        logger.info("Not on LinkedIn login page. Current URL: " + current_url)
-                    else:
-                        logger.info("Successfully navigated to LinkedIn profile")
-                    
-                    return primary_url, additional_urls
-                except Exception as e:
-                    logger.warning(f"Could not click LinkedIn link: {e}")
-                    return primary_url, additional_urls
+                # The profile itself is loaded once, by extract_profile_data
+                return primary_url, additional_urls
             else:
                 logger.info(f"No LinkedIn links found in search results for {first_name} {last_name}")
                 
+        except BlockDetectedError:
+            raise
         except Exception as e:
             logger.error(f"Error searching for {first_name} {last_name}: {e}")
             
@@ -196,24 +241,18 @@ class LinkedInEnricher:
         """
         try:
             # Initialize the scraper with our driver
-            scraper = LinkedInProfileScraper(self.driver)
+            scraper = LinkedInProfileScraper(self.driver, self.archive)
             
             # Extract profile info
+            self.telemetry.set_state(STATE_PROFILE, linkedin_url)
+            self.driver_manager.record_page_load()
             profile_data = scraper.extract_profile_info(linkedin_url)
             
             # Map to the expected format
-            return {
-                'linkedin_url': profile_data['linkedin_url'],
-                'headline': profile_data['description'][:200] if profile_data['description'] else '',  # Truncate for headline
-                'current_title': profile_data['job_title'],
-                'current_company': profile_data['company'],
-                'location_linkedin': '',  # We can add this later
-                'industry_linkedin': '',   # We can add this later
-                'education': '',          # We can add this later
-                'last_enriched_at': profile_data['scraped_at'],
-                'description': profile_data['description']  # Add the full description
-            }
+            return to_enrichment_fields(profile_data)
             
+        except BlockDetectedError:
+            raise
         except Exception as e:
             logger.error(f"Error extracting profile data from {linkedin_url}: {e}")
             return {
@@ -224,22 +263,27 @@ class LinkedInEnricher:
                 'location_linkedin': '',
                 'industry_linkedin': '',
                 'education': '',
+                'experience': '',
                 'last_enriched_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'description': ''
             }
     
-    def process_excel_file(self, file_path: str, max_records: int = None, output_file: str = None) -> pd.DataFrame:
+    def process_excel_file(self, file_path: str, max_records: int = None, output_file: str = None,
+                           deadline: float = None, priority: str = PRIORITY_FILE) -> pd.DataFrame:
         """
         Process Excel file and search for LinkedIn profiles
         Saves incrementally after each row is processed
+        With a deadline (a time.time() value) no record is started that isn't expected to
+        finish before it; records are taken in the order of the priority policy and
+        whatever is left is saved to a remaining-records file
         """
         try:
             # Check if file exists
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Excel file not found: {file_path}")
             
-            # Read Excel file
-            df = pd.read_excel(file_path)
+            # Read Excel file (or CSV, e.g. the remaining records of a budgeted run)
+            df = read_table(file_path)
             logger.info(f"Loaded {len(df)} records from {file_path}")
             
             # Show column structure
@@ -249,17 +293,20 @@ class LinkedInEnricher:
             if max_records:
                 df = df.head(max_records)
                 logger.info(f"Limited to first {max_records} records for testing")
+            input_columns = list(df.columns)
             
             # Initialize enrichment columns
             enrichment_columns = [
                 'linkedin_url', 'headline', 'current_title', 'current_company',
-                'location_linkedin', 'industry_linkedin', 'education', 'last_enriched_at',
-                'additional_linkedin_urls', 'description'
+                'location_linkedin', 'industry_linkedin', 'education', 'experience', 'last_enriched_at',
+                'additional_linkedin_urls', 'description', 'enrichment_status'
             ]
             
             for col in enrichment_columns:
                 if col not in df.columns:
                     df[col] = ''
+                else:
+                    df[col] = df[col].astype(object)
             
             # Generate output filename if not provided
             if not output_file:
@@ -269,57 +316,124 @@ class LinkedInEnricher:
             # Initialize the CSV file with headers
             self._initialize_csv_file(output_file, enrichment_columns)
             
-            # Process each record
-            processed_count = 0
-            for index, row in df.iterrows():
-                try:
-                    first_name = str(row.get('first_name', '')).strip()
-                    last_name = str(row.get('last_name', '')).strip()
-                    company = str(row.get('company', '')).strip()
-                    location = str(row.get('location', '')).strip()
-                    
-                    if not first_name or not last_name or first_name == 'nan' or last_name == 'nan':
-                        logger.warning(f"Skipping row {index}: missing name data")
-                        continue
+            # Clean the input and join it against the caches in bulk
+            normalized = normalize_input_frame(df)
+            cached = self.cache.lookup(normalized)
+            
+            missing_names = ~normalized['has_name']
+            if missing_names.any():
+                logger.warning(f"Skipping {missing_names.sum()} rows with missing name data")
+            
+            # Rows whose profile is already cached are filled and saved without the browser
+            cache_hits = normalized['has_name'] & cached['profile_hit']
+            for column in PROFILE_COLUMNS + ['linkedin_url', 'additional_linkedin_urls']:
+                df.loc[cache_hits, column] = cached.loc[cache_hits, column]
+            df.loc[cache_hits, 'enrichment_status'] = 'enriched'
+            self._save_rows_to_csv(df.loc[cache_hits], output_file)
+            processed_count = int(cache_hits.sum())
+            logger.info(f"Filled {processed_count} records from cache, "
+                        f"{(normalized['has_name'] & ~cache_hits).sum()} left for the browser")
+            
+            # Live throughput, ETA and worker state in linkedin_status.json
+            self.telemetry.start_run(int(normalized['has_name'].sum()), processed_count)
+            reporter = TelemetryReporter(DEFAULT_TELEMETRY_PATH, DEFAULT_STATUS_FILE).start()
+            
+            # The reporter is stopped even if the loop fails, so the status file doesn't go stale
+            try:
+                # Process each cache miss in priority order; records hit by a block are requeued
+                # once the driver is rotated
+                pending = deque(priority_order(df.loc[normalized['has_name'] & ~cache_hits], priority))
+                block_retries = {}
+                guard = DeadlineGuard(deadline)
+            
+                # Profiles loaded earlier in this run are read back from the cache instead of reloaded
+                loaded_profiles = set()
+                while pending:
+                    guard.finish()
+                    if not guard.allows_next():
+                        break
+                    index = pending.popleft()
+                    guard.start()
+                    try:
+                        first_name, last_name, company, location = normalized.loc[index, NAME_COLUMNS]
                     
-                    logger.info(f"Processing {index + 1}/{len(df)}: {first_name} {last_name}")
+                        logger.info(f"Processing {index + 1}/{len(df)}: {first_name} {last_name}")
+                        self._maintain_driver()
                     
-                    # Search for LinkedIn profile
-                    primary_url, additional_urls = self.search_linkedin_profile(first_name, last_name, company, location)
+                        try:
+                            # Search for LinkedIn profile unless the URL is already known, then
+                            # extract profile data from primary URL
+                            known_url = cached.at[index, 'linkedin_url']
+                            if known_url:
+                                primary_url = canonical_profile_url(known_url) or known_url
+                                additional_urls = [url for url in cached.at[index, 'additional_linkedin_urls'].split('; ') if url]
+                            else:
+                                primary_url, additional_urls = self.search_linkedin_profile(first_name, last_name, company, location)
+                            profile_data = None
+                            if primary_url in loaded_profiles:
+                                profile_data = self.cache.get_profile(primary_url)
+                            if primary_url and not profile_data:
+                                profile_data = self.extract_profile_data(primary_url)
+                                loaded_profiles.add(primary_url)
+                            self.circuit_breaker.record_success()
+                            self.driver_manager.record_success()
+                        except BlockDetectedError as e:
+                            attempts = block_retries.get(index, 0)
+                            if self._recover_from_block(e, attempts):
+                                block_retries[index] = attempts + 1
+                                pending.appendleft(index)
+                                logger.info(f"Requeued {first_name} {last_name} after {e.block_type}")
+                                continue
+                        
+                            logger.warning(f"Giving up on {first_name} {last_name} after {attempts + 1} blocks")
+                            df.at[index, 'enrichment_status'] = 'blocked'
+                            self.telemetry.record('blocked')
+                            self._save_row_to_csv(df.loc[index], output_file)
+                            processed_count += 1
+                            continue
                     
-                    if primary_url:
-                        # Extract profile data from primary URL
-                        profile_data = self.extract_profile_data(primary_url)
+                        if primary_url:
+                            self.cache.store_search(normalized.at[index, 'search_key'], primary_url, additional_urls)
+                            self.cache.store_profile(profile_data)
                         
-                        # Update dataframe with primary URL and additional URLs
-                        df.at[index, 'linkedin_url'] = primary_url
-                        df.at[index, 'additional_linkedin_urls'] = '; '.join(additional_urls) if additional_urls else ''
+                            # Update dataframe with primary URL and additional URLs
+                            df.at[index, 'linkedin_url'] = primary_url
+                            df.at[index, 'additional_linkedin_urls'] = '; '.join(additional_urls) if additional_urls else ''
                         
-                        # Update other profile data
-                        for key, value in profile_data.items():
-                            if key in df.columns and key != 'linkedin_url':
-                                df.at[index, key] = value
+                            # Update other profile data
+                            for key, value in profile_data.items():
+                                if key in df.columns and key != 'linkedin_url':
+                                    df.at[index, key] = value
                         
-                        logger.info(f"Successfully enriched {first_name} {last_name}")
-                    else:
-                        logger.info(f"No LinkedIn profile found for {first_name} {last_name}")
+                            df.at[index, 'enrichment_status'] = 'enriched'
+                            logger.info(f"Successfully enriched {first_name} {last_name}")
+                        else:
+                            df.at[index, 'enrichment_status'] = 'not_found'
+                            logger.info(f"No LinkedIn profile found for {first_name} {last_name}")
                     
-                    # Save this row to CSV immediately
-                    self._save_row_to_csv(df.iloc[index], output_file)
-                    processed_count += 1
+                        # Save this row to CSV immediately
+                        self.telemetry.record(df.at[index, 'enrichment_status'])
+                        self._save_row_to_csv(df.loc[index], output_file)
+                        processed_count += 1
                     
-                    # Log progress every 10 records
-                    if processed_count % 10 == 0:
-                        logger.info(f"Progress: {processed_count} records processed and saved")
+                        # Log progress every 10 records
+                        if processed_count % 10 == 0:
+                            logger.info(f"Progress: {processed_count} records processed and saved")
                     
-                    # Be respectful with delays
-                    time.sleep(2)
+                        # Be respectful with delays
+                        pause(self.driver, 2)
                     
-                except Exception as e:
-                    logger.error(f"Error processing row {index}: {e}")
-                    continue
+                    except Exception as e:
+                        logger.error(f"Error processing row {index}: {e}")
+                        self.driver_manager.record_error()
+                        self.telemetry.record(EVENT_ERROR)
+                        continue
+            finally:
+                reporter.stop()
             
             logger.info(f"Completed processing {processed_count} records. All data saved to {output_file}")
+            if deadline is not None:
+                report_remaining(df.loc[list(pending), input_columns])
             return df
             
         except Exception as e:
@@ -331,14 +445,14 @@ class LinkedInEnricher:
         Initialize CSV file with headers
         """
         try:
-            # Create headers for the CSV
-            headers = ['Email', 'first_name', 'last_name', 'company', 'location'] + enrichment_columns
+            # Create headers for the CSV; rows are written in the same order
+            self.csv_headers = ['Email', 'first_name', 'last_name', 'company', 'location'] + enrichment_columns
             
             # Create the CSV file with headers
             with open(output_file, 'w', newline='', encoding='utf-8') as f:
                 import csv
                 writer = csv.writer(f)
-                writer.writerow(headers)
+                writer.writerow(self.csv_headers)
             
             logger.info(f"Initialized CSV file: {output_file}")
             
@@ -350,91 +464,51 @@ class LinkedInEnricher:
         Save a single row to CSV file
         """
         try:
-            # Prepare row data for CSV
-            row_data = {
-                'Email': str(row.get('Email', '')).strip(),
-                'first_name': str(row.get('first_name', '')).strip(),
-                'last_name': str(row.get('last_name', '')).strip(),
-                'company': str(row.get('company', '')).strip(),
-                'location': str(row.get('location', '')).strip(),
-                'linkedin_url': str(row.get('linkedin_url', '')).strip(),
-                'additional_linkedin_urls': str(row.get('additional_linkedin_urls', '')).strip(),
-                'current_title': str(row.get('current_title', '')).strip(),
-                'current_company': str(row.get('current_company', '')).strip(),
-                'description': str(row.get('description', '')).strip(),
-                'last_enriched_at': str(row.get('last_enriched_at', '')).strip()
-            }
+            # Prepare row data for CSV in header order
+            row_data = [str(row.get(column, '')).strip() for column in self.csv_headers]
             
             # Append row to CSV
             with open(output_file, 'a', newline='', encoding='utf-8') as f:
                 import csv
                 writer = csv.writer(f)
-                writer.writerow([
-                    row_data['Email'],
-                    row_data['first_name'],
-                    row_data['last_name'],
-                    row_data['company'],
-                    row_data['location'],
-                    row_data['linkedin_url'],
-                    row_data['additional_linkedin_urls'],
-                    row_data['current_title'],
-                    row_data['current_company'],
-                    row_data['description'],
-                    row_data['last_enriched_at']
-                ])
+                writer.writerow(row_data)
             
         except Exception as e:
             logger.error(f"Error saving row to CSV: {e}")
     
+    def _save_rows_to_csv(self, rows: pd.DataFrame, output_file: str):
+        """
+        Append many rows to the CSV file at once
+        """
+        try:
+            if rows.empty:
+                return
+            
+            # Same column order and cleanup as _save_row_to_csv, done per column
+            rows = rows.reindex(columns=self.csv_headers).fillna('').astype(str)
+            rows = rows.apply(lambda column: column.str.strip())
+            rows.to_csv(output_file, mode='a', header=False, index=False, encoding='utf-8', lineterminator='\r\n')
+            
+        except Exception as e:
+            logger.error(f"Error saving rows to CSV: {e}")
+    
     def close(self):
         """Close the browser driver"""
-        if self.driver:
-            self.driver.quit()
+        self.driver_manager.quit()
+        self.driver = None
+        self.cache.close()
+        self.telemetry.set_state(STATE_STOPPED)
+        self.telemetry.close()
+        if self.archive:
+            self.archive.close()
 
-    def save_linkedin_urls_to_csv(self, df: pd.DataFrame, output_file: str = None) -> str:
+    def save_linkedin_urls_to_csv(self, df: pd.DataFrame, output_file: str = None,
+                                  output_format: str = FORMAT_CSV) -> str:
         """
-        Save LinkedIn URLs to a CSV file with email, linkedin_url, additional_urls, company, job_title, and description columns
+        Save LinkedIn URLs to a CSV (or Parquet) file with email, linkedin_url, additional_urls, company, job_title, and description columns
         """
         try:
-            # Create a dataframe with all the relevant columns
-            csv_data = []
-            
-            for index, row in df.iterrows():
-                email = str(row.get('Email', '')).strip()
-                linkedin_url = str(row.get('linkedin_url', '')).strip()
-                additional_urls = str(row.get('additional_linkedin_urls', '')).strip()
-                company = str(row.get('current_company', '')).strip()
-                job_title = str(row.get('current_title', '')).strip()
-                description = str(row.get('description', '')).strip()
-                
-                # Only include rows where we found a LinkedIn URL
-                if linkedin_url and linkedin_url != 'nan' and linkedin_url != '':
-                    csv_data.append({
-                        'email': email if email != 'nan' else '',
-                        'linkedin_url': linkedin_url,
-                        'additional_linkedin_urls': additional_urls if additional_urls != 'nan' else '',
-                        'company': company if company != 'nan' else '',
-                        'job_title': job_title if job_title != 'nan' else '',
-                        'description': description if description != 'nan' else ''
-                    })
-            
-            if not csv_data:
-                logger.warning("No LinkedIn URLs found to save")
-                return None
-            
-            # Create dataframe and save to CSV
-            csv_df = pd.DataFrame(csv_data)
-            
-            # Generate output filename if not provided (save to current directory)
-            if not output_file:
-                timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-                output_file = f"linkedin_profiles_complete_{timestamp}.csv"
-            
-            # Save to CSV in current directory
-            csv_df.to_csv(output_file, index=False)
-            
-            logger.info(f"Saved {len(csv_data)} complete LinkedIn profiles to {output_file}")
-            return output_file
+            return export_profiles(df, output_file, output_format)
             
         except Exception as e:
             logger.error(f"Error saving LinkedIn profiles to CSV: {e}")
@@ -442,31 +516,48 @@ class LinkedInEnricher:
 
 def main():
     """Main function to run the enricher"""
+    parser = argparse.ArgumentParser(description="LinkedIn enrichment with a single browser")
+    parser.add_argument('input_file', nargs='?',
+                        default=r"C:\Users\dmaso\OneDrive\Documents\002 Projects\003 Web Development Agency\01_Clients\01_Greekrow_Trailblaze\03_Development\alumni_scraper\data\Test-Upload-9-3.xlsx")
+    parser.add_argument('--max-records', type=int, help="Only process the first N rows")
+    parser.add_argument('--deadline', help="Stop starting records so the run ends by this time (e.g. 09:00)")
+    parser.add_argument('--budget', help="Stop after this long (e.g. 90m, 2h30m)")
+    parser.add_argument('--priority', choices=PRIORITY_POLICIES,
+                        help="value: never-enriched, then stalest, then most input data first; file: input order "
+                        "(default: value with a deadline or budget, file otherwise)")
+    parser.add_argument('--export', choices=OUTPUT_FORMATS,
+                        help="Also write the found profiles (email, URLs, company, title, description) in this format")
+    args = parser.parse_args()
+    deadline = parse_deadline(args.deadline, args.budget)
+    
     enricher = LinkedInEnricher()
     
     try:
         # Use the full file path
-        input_file = r"C:\Users\dmaso\OneDrive\Documents\002 Projects\003 Web Development Agency\01_Clients\01_Greekrow_Trailblaze\03_Development\alumni_scraper\data\Test-Upload-9-3.xlsx"
+        input_file = args.input_file
         
         logger.info("Starting LinkedIn enrichment process...")
         
         # Process the file with incremental saving
-        enriched_df = enricher.process_excel_file(input_file, max_records=None)
+        enriched_df = enricher.process_excel_file(input_file, max_records=args.max_records,
+                                                  deadline=deadline,
+                                                  priority=args.priority or (PRIORITY_VALUE if deadline is not None else PRIORITY_FILE))
         
         logger.info("LinkedIn enrichment completed successfully!")
         
         # Show summary
-        linkedin_found = enriched_df['linkedin_url'].notna().sum()
-        print(f"\n=== ENRICHMENT SUMMARY ===")
-        print(f"Total records processed: {len(enriched_df)}")
-        print(f"LinkedIn profiles found: {linkedin_found}")
-        print(f"Success rate: {(linkedin_found/len(enriched_df)*100):.1f}%")
+        print_summary(enriched_df)
         
         # Show results
         print(f"\n=== RESULTS ===")
-        for index, row in enriched_df.iterrows():
-            if row['linkedin_url']:
-                print(f"{row['first_name']} {row['last_name']}: {row['linkedin_url']}")
+        lines = found_profile_lines(enriched_df)
+        if not lines.empty:
+            print('\n'.join(lines))
+        
+        if args.export:
+            export_file = enricher.save_linkedin_urls_to_csv(enriched_df, output_format=args.export)
+            if export_file:
+                print(f"\nFound profiles exported to: {export_file}")
         
         print(f"\n=== INCREMENTAL SAVING ===")
         print("Data has been saved incrementally throughout the process")
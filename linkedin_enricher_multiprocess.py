@@ -3,32 +3,165 @@ import time
 import re
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import quote_plus
 import logging
 from typing import Dict, Optional, List
 import os
+import socket
+import argparse
+import threading
 import multiprocessing as mp
 from multiprocessing import Pool, Manager
+from multiprocessing.util import Finalize
 import queue
-from linkedin_profile_scraper import LinkedInProfileScraper
+from collections import deque
+from linkedin_profile_scraper import LinkedInProfileScraper, to_enrichment_fields
+from linkedin_html_archive import HtmlArchive
+from linkedin_browser import BrowserBackend, SeleniumBackend, FakeBackend, FakeSessionAuthority, load_page, pause
+from linkedin_block_detector import (BlockDetectedError, CircuitBreaker, detect_block, raise_if_blocked, BLOCK_AUTHWALL,
+                                     BLOCK_LOGIN)
+from linkedin_driver_manager import (DriverManager, DriverCrashedError, raise_if_crashed, replace_session_cookies,
+                                     DEFAULT_SPARE_DRIVERS, SEARCH_WARMUP_URL, WARMUP_URL)
+from linkedin_cache import (EnrichmentCache, DEFAULT_CACHE_PATH, NAME_COLUMNS, INFLIGHT_CLAIMED, INFLIGHT_DONE,
+                            INFLIGHT_STALE_SECONDS, canonical_profile_url, make_search_key, normalize_input_frame)
+from linkedin_identity import IdentityIndex, DEFAULT_MATCH_CONFIDENCE
+from linkedin_job_store import open_job_store, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS
+from linkedin_sessions import SessionPool, reset_session_holders, MAX_SESSION_WAIT_SECONDS
+from linkedin_stage_pools import RetryPolicy, StagePool
+from linkedin_concurrency import AIMDController, ConcurrencySample
+from linkedin_serp import parse_serp_html, parse_snippet, DEFAULT_SNIPPET_MAX_AGE_DAYS
+from linkedin_schedule import (DeadlineGuard, RecordBudget, RecordTimeoutError, parse_deadline, priority_order,
+                               report_remaining, PRIORITY_FILE, PRIORITY_VALUE, PRIORITY_POLICIES,
+                               DEFAULT_RECORD_TIMEOUT)
+from linkedin_refresh import plan_refresh, refresh_records, merge_refresh, DEFAULT_MAX_AGE_DAYS
+from linkedin_history import append_history
+from linkedin_logging import (LogConfig, configure_worker_logging, worker_log_config, set_log_record, log_event,
+                               start_logging, DEFAULT_LOG_LEVEL, DEFAULT_DEBUG_SAMPLE_RATE)
+from linkedin_export import print_summary, read_table, write_table, timestamped_path, FORMAT_CSV, OUTPUT_FORMATS
+from linkedin_run_profiler import WorkerProfiler, enable_performance_logging, build_report
+from linkedin_telemetry import (Telemetry, TelemetryReporter, DEFAULT_TELEMETRY_PATH, DEFAULT_STATUS_FILE,
+                                EVENT_BLOCK, EVENT_ERROR, STATE_SEARCHING, STATE_PROFILE, STATE_BACKOFF,
+                                STATE_IDLE, STATE_STOPPED)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_INPUT_FILE = r"C:\Users\dmaso\OneDrive\Documents\002 Projects\003 Web Development Agency\01_Clients\01_Greekrow_Trailblaze\03_Development\alumni_scraper\data\Test-Upload-9-3.xlsx"
+DEFAULT_JOB_STORE = "linkedin_jobs.sqlite"
+
+# Times a record left unprocessed by a failed batch is handed to another worker
+MAX_REQUEUES = 2
+REQUEUE_KEY = '_requeues'
+
+# Columns of each result record
+RESULT_COLUMNS = [
+    'Email', 'first_name', 'last_name', 'company', 'location', 'linkedin_url', 'additional_linkedin_urls',
+    'current_title', 'current_company', 'description', 'location_linkedin', 'industry_linkedin',
+    'education', 'experience', 'last_enriched_at', 'enrichment_status', 'enrichment_source'
+]
+
+def _record_fields(record: Dict) -> Dict[str, str]:
+    """
+    Cleaned input fields of one record
+    """
+    fields = {}
+    for column in ['Email', 'first_name', 'last_name', 'company', 'location', 'linkedin_url', 'additional_linkedin_urls']:
+        value = str(record.get(column, '')).strip()
+        fields[column] = '' if value == 'nan' else value
+    return fields
+
+def _record_id(fields: Dict[str, str]) -> str:
+    """
+    Id that tags a record's log lines: its email, or its search key when there is none
+    """
+    return fields['Email'].lower() or make_search_key(fields['first_name'], fields['last_name'],
+                                                       fields['company'], fields['location'])
+
+def _known_urls(fields: Dict[str, str]) -> tuple:
+    """
+    LinkedIn URLs already present in the record, which make the Google search unnecessary
+    """
+    additional_urls = [canonical_profile_url(url) or url for url in fields['additional_linkedin_urls'].split('; ') if url]
+    return canonical_profile_url(fields['linkedin_url']) or fields['linkedin_url'], additional_urls
+
 class LinkedInEnricherMultiprocess:
-    def __init__(self, worker_id: int = 0):
+    def __init__(self, worker_id: int = 0, cache_path: str = DEFAULT_CACHE_PATH, archive_dir: str = None,
+                 user_data_suffix: str = '', requires_login: bool = True,
+                 telemetry_path: str = DEFAULT_TELEMETRY_PATH, profile_dir: str = None,
+                 browser_backend: BrowserBackend = None, snippet_max_age_days: float = None,
+                 record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                 spare_drivers: int = DEFAULT_SPARE_DRIVERS):
         self.worker_id = worker_id
         self.driver = None
+        self.user_data_suffix = user_data_suffix
+        
+        # Real Chrome unless a fake backend is passed in for load tests
+        self.browser_backend = browser_backend or SeleniumBackend()
+        
+        # Outcomes, blocks, errors and current state for the live status report
+        self.telemetry = Telemetry(telemetry_path, f"worker-{worker_id}{user_data_suffix}")
+        
+        # Python profile and per-page browser timing for --profile runs; started by the process entry point
+        self.profiler = WorkerProfiler(profile_dir, f"worker-{worker_id}{user_data_suffix}") if profile_dir else None
+        
+        # Google-only search drivers don't need a LinkedIn session
+        self.requires_login = requires_login
+        
+        # Search-only enricher with its own driver, created for pipelined batches
+        self._searcher = None
+        
+        # With a max age set, confident Google snippets replace the profile visit;
+        # last_snippet holds the fields read from the latest search, if any
+        self.snippet_max_age_days = snippet_max_age_days
+        self.last_snippet = None
+        
+        # Search and profile results shared with the other workers through SQLite
+        self.cache = EnrichmentCache(cache_path)
+        
+        # Name, nickname, phonetic and email keys of everyone found, for later exports
+        self.identity = IdentityIndex(cache_path)
+        
+        # Identifies this worker's claims in the cache's in-flight table
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{worker_id}{user_data_suffix}"
+        
+        # Raw SERP and profile HTML for offline re-extraction, if enabled
+        self.archive = HtmlArchive(archive_dir) if archive_dir else None
         
-    def _setup_driver(self):
+        # Recycles the driver after N page loads, a memory threshold or repeated errors, keeping
+        # spare_drivers launched and logged in so a retired or crashed driver is replaced at once
+        self.spare_drivers = spare_drivers
+        self.driver_manager = DriverManager(self._setup_driver, worker_id=worker_id, spares=spare_drivers,
+                                            warmup_url=WARMUP_URL if requires_login else SEARCH_WARMUP_URL)
+        
+        # Pause and rotate the driver when Google or LinkedIn starts blocking us
+        self.circuit_breaker = CircuitBreaker(worker_id=worker_id)
+        self.max_block_retries = 3
+        
+        # A record whose browser crashed is redone this many times on a fresh driver
+        self.max_crash_retries = 1
+        
+        # Called with each result as soon as its record is done, so a batch that fails
+        # later keeps what it finished; last_unprocessed holds the records the latest
+        # batch didn't get to
+        self.result_sink = None
+        self.last_unprocessed = []
+        
+        # Seconds each record gets for search, page loads and extraction (None for no limit);
+        # budget is the current record's, restarted by _begin_record
+        self.record_timeout = record_timeout
+        self.budget = RecordBudget(None)
+        
+        # LinkedIn sessions of several accounts shared by every worker, if a pool is given;
+        # session is the name of the one this worker holds
+        self.sessions = SessionPool(session_pool) if session_pool and requires_login else None
+        self.session = None
+        
+    def _setup_driver(self, slot: int = 0):
         """Setup Chrome driver with stealth options"""
         chrome_options = Options()
         chrome_options.add_argument("--no-sandbox")
@@ -38,24 +171,162 @@ class LinkedInEnricherMultiprocess:
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
-        # Add unique user data directory for each worker
-        chrome_options.add_argument(f"--user-data-dir=C:/temp/chrome_worker_{self.worker_id}")
+        # Add unique user data directory for each worker; spare and retiring drivers run
+        # alongside the current one, so each slot gets its own directory (_b, _c, ...)
+        profile_suffix = '' if slot == 0 else f"_{chr(ord('a') + slot)}"
+        chrome_options.add_argument(f"--user-data-dir=C:/temp/chrome_worker_{self.worker_id}{self.user_data_suffix}{profile_suffix}")
         
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if self.profiler:
+            enable_performance_logging(chrome_options)
+        
+        return self.browser_backend.create_driver(chrome_options)
+    
+    def _rotate_driver(self, reason: str = 'rotation'):
+        """
+        Swap in a fresh driver (carrying over the LinkedIn session) and re-check the login
+        """
+        self.driver = self.driver_manager.recycle(reason)
+        if self.requires_login and not self.driver_manager.verified:
+            self.ensure_linkedin_login()
+    
+    def _maintain_driver(self):
+        """
+        Recycle the driver between records once it hits its page, memory or error limit
+        """
+        driver = self.driver_manager.maintain()
+        if driver is not self.driver:
+            self.driver = driver
+            if self.requires_login and not self.driver_manager.verified:
+                self.ensure_linkedin_login()
+    
+    def _recover_from_block(self, error: BlockDetectedError, attempts: int) -> bool:
+        """
+        Pause with backoff and rotate to a fresh driver after a block
+        With a session pool, an authwall or login page rests the session instead and
+        the worker carries on with another one
+        A record out of retries, or a worker with no pooled session left, gives the
+        record up at once, without the pause or rotation
+        Returns True if the affected record should be requeued
+        """
+        retry = attempts < self.max_block_retries
+        # Counted once, whichever way the block is handled
+        self.telemetry.record(EVENT_BLOCK)
+        if self.session and error.block_type in (BLOCK_AUTHWALL, BLOCK_LOGIN):
+            # The blocked session rests either way, so later records need another one
+            self.sessions.record_block(self.session, error.block_type)
+            if self._login_with_session(exclude=[self.session]):
+                return retry
         
-        return driver
+        delay = self.circuit_breaker.record_block(error.block_type)
+        # With every pooled session expired a fresh driver couldn't log in either
+        if not retry or (self.sessions is not None and self.session is None):
+            return False
+        self.telemetry.set_state(STATE_BACKOFF, f"{error.block_type}, {delay:.0f}s")
+        pause(self.driver, delay)
+        self._rotate_driver(error.block_type)
+        return True
+    
+    def _record_error(self):
+        """
+        Count a failed record towards driver recycling and the error rate
+        """
+        self.driver_manager.record_error()
+        self.telemetry.record(EVENT_ERROR)
+    
+    def _restart_driver(self, error: DriverCrashedError):
+        """
+        Replace a crashed driver; raises DriverCrashedError if Chrome can't be started
+        again, leaving no driver so the next batch starts from scratch
+        """
+        logger.warning(f"Worker {self.worker_id}: Browser crashed ({error}), starting a new one")
+        self._record_error()
+        try:
+            self._rotate_driver('crash')
+        except Exception as e:
+            self._reset_driver()
+            raise DriverCrashedError(f"could not restart the browser: {e}")
+    
+    def _reset_driver(self):
+        """
+        Drop the driver after a failed batch so the next batch launches and logs in afresh
+        """
+        self.driver_manager.quit()
+        self.driver = None
+    
+    def _commit(self, results: List[Dict], result: Dict):
+        results.append(result)
+        if self.result_sink:
+            self.result_sink(result)
+    
+    def _begin_record(self):
+        """
+        Start the time budget of the next record
+        """
+        self.budget = RecordBudget(self.record_timeout)
+    
+    def _timed_out(self) -> bool:
+        return self.budget.expired()
+    
+    def _login_with_session(self, exclude: List[str] = None) -> bool:
+        """
+        Put the least-used rested session from the pool into the driver and check it
+        logs in; a session that doesn't is taken out of rotation and the next one tried
+        Waits while every session is resting; returns False if none is left active
+        """
+        tried = list(exclude or [])
+        previous = self.session
+        while True:
+            session = self.sessions.acquire(self.owner, tried)
+            if session is None:
+                wait = self.sessions.seconds_until_available()
+                if wait is None:
+                    logger.error(f"Worker {self.worker_id}: No LinkedIn session left in the pool")
+                    self.session = None
+                    return False
+                # Excluded sessions are only skipped while another one is ready
+                tried = []
+                self.telemetry.set_state(STATE_BACKOFF, f"all sessions resting, {wait:.0f}s")
+                time.sleep(min(max(wait, 0.5), MAX_SESSION_WAIT_SECONDS))
+                continue
+            
+            replace_session_cookies(self.driver, session['cookies'])
+            self.session = session['name']
+            try:
+                self.driver.get("https://www.linkedin.com/feed/")
+                pause(self.driver, 5)
+                if detect_block(self.driver) is None:
+                    logger.info(f"Worker {self.worker_id}: Logged into LinkedIn with session {self.session}")
+                    # Spares carry the old session's cookies
+                    if self.session != previous:
+                        self.driver_manager.drop_spares()
+                    return True
+            except Exception as e:
+                raise_if_crashed(e)
+                logger.error(f"Worker {self.worker_id}: Error checking session {self.session}: {e}")
+                return False
+            self.sessions.expire(self.session)
+            tried.append(self.session)
+    
+    def _use_session(self):
+        """
+        Count a LinkedIn page load against the held session, moving to another
+        session once this one reaches its request limit
+        """
+        if self.session and not self.sessions.record_request(self.session):
+            self._login_with_session(exclude=[self.session])
     
     def ensure_linkedin_login(self) -> bool:
         """
         Ensure user is logged into LinkedIn, prompt if needed
+        With a session pool, a stored session is used instead of prompting
         Returns True if logged in
         """
+        if self.sessions is not None:
+            return self._login_with_session()
         try:
             # Go to LinkedIn to check login status
             self.driver.get("https://www.linkedin.com/feed/")
-            time.sleep(5)
+            pause(self.driver, 5)
             
             # Multiple ways to check if we're logged in
             login_indicators = [
@@ -92,7 +363,7 @@ class LinkedInEnricherMultiprocess:
                 
                 # Refresh and check again
                 self.driver.refresh()
-                time.sleep(5)
+                pause(self.driver, 5)
                 
                 # Re-check login status
                 for indicator in login_indicators:
@@ -111,6 +382,7 @@ class LinkedInEnricherMultiprocess:
                 return True
                 
         except Exception as e:
+            raise_if_crashed(e)
             logger.error(f"Worker {self.worker_id}: Error checking LinkedIn login: {e}")
             return False
     
@@ -118,6 +390,8 @@ class LinkedInEnricherMultiprocess:
         """
         Search for LinkedIn profile using Google search
         Returns tuple: (primary_url, additional_urls_list)
+        Raises RecordTimeoutError if the results page was cut short before any result rendered
+        The driver stays on Google; the profile is left to fetch_profile
         """
         try:
             # Construct search query
@@ -129,82 +403,113 @@ class LinkedInEnricherMultiprocess:
             
             query = f'site:linkedin.com/in {" ".join(search_terms)}'
             search_url = f"https://www.google.com/search?q={quote_plus(query)}"
+            self.last_snippet = None
+            
+            logger.debug("Searching for: %s", query)
+            self.telemetry.set_state(STATE_SEARCHING, f"{first_name} {last_name}")
+            
+            # A results page cut off by the record budget still has whatever links rendered
+            loaded = load_page(self.driver, search_url, self.budget.remaining())
+            if loaded:
+                pause(self.driver, 5)
+            self.driver_manager.record_page_load()
             
-            logger.info(f"Worker {self.worker_id}: Searching for: {first_name} {last_name}")
+            # A CAPTCHA page has no results, so don't report it as "not found"
+            raise_if_blocked(self.driver)
             
-            self.driver.get(search_url)
-            time.sleep(5)
+            if self.profiler:
+                self.profiler.record_page(self.driver, 'serp')
+            if self.archive:
+                self.archive.save(search_url, self.driver.page_source, 'serp')
             
             # Look specifically for LinkedIn links
             linkedin_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='linkedin.com/in/']")
             
-            if linkedin_links:
-                # Clean up URLs (remove Google redirect)
-                clean_urls = []
-                for link in linkedin_links:
-                    url = link.get_attribute('href')
-                    if 'url?q=' in url:
-                        url = url.split('url?q=')[1].split('&')[0]
-                    clean_urls.append(url)
-                
-                # Remove duplicates while preserving order
-                unique_urls = []
-                seen = set()
-                for url in clean_urls:
-                    if url not in seen:
-                        unique_urls.append(url)
-                        seen.add(url)
-                
+            # Canonicalize every link (Google redirect, country subdomain, tracking parameters)
+            # and remove duplicates while preserving order
+            unique_urls = []
+            for link in linkedin_links:
+                url = canonical_profile_url(link.get_attribute('href'))
+                if url and url not in unique_urls:
+                    unique_urls.append(url)
+            
+            if unique_urls:
                 primary_url = unique_urls[0]
                 additional_urls = unique_urls[1:5]  # Get next 3-4 URLs (max 4 additional)
                 
-                logger.info(f"Worker {self.worker_id}: Found LinkedIn profile: {primary_url}")
-                if additional_urls:
-                    logger.info(f"Worker {self.worker_id}: Found {len(additional_urls)} additional LinkedIn URLs")
+                log_event(logger, 'search_done', url=primary_url, additional=len(additional_urls))
                 
-                # Click on the first LinkedIn profile
-                try:
-                    linkedin_links[0].click()
-                    logger.info(f"Worker {self.worker_id}: Clicked on LinkedIn profile: {primary_url}")
-                    time.sleep(3)
-                    
-                    return primary_url, additional_urls
-                except Exception as e:
-                    logger.warning(f"Worker {self.worker_id}: Could not click LinkedIn link: {e}")
-                    return primary_url, additional_urls
+                if self.snippet_max_age_days is not None:
+                    self.last_snippet = self._snippet_profile(primary_url, first_name, last_name)
+                
+                return primary_url, additional_urls
+            elif not loaded:
+                # Cut off before any result rendered, which says nothing about whether a profile exists
+                raise RecordTimeoutError('search')
             else:
-                logger.info(f"Worker {self.worker_id}: No LinkedIn links found for {first_name} {last_name}")
+                log_event(logger, 'search_done', url='none')
                 
+        except (BlockDetectedError, RecordTimeoutError):
+            raise
         except Exception as e:
+            raise_if_crashed(e)
             logger.error(f"Worker {self.worker_id}: Error searching for {first_name} {last_name}: {e}")
             
         return None, []
     
+    def _snippet_profile(self, linkedin_url: str, first_name: str, last_name: str) -> Optional[Dict[str, str]]:
+        """
+        Profile fields read from the Google result for linkedin_url on the current page,
+        or None when its snippet is ambiguous or stale and the profile has to be visited
+        """
+        for result in parse_serp_html(self.driver.page_source):
+            if result['url'] != linkedin_url:
+                continue
+            fields, reason = parse_snippet(result, first_name, last_name, self.snippet_max_age_days)
+            if not fields:
+                log_event(logger, 'snippet_skipped', reason=reason)
+                return None
+            log_event(logger, 'snippet_used', title=fields['current_title'], company=fields['current_company'])
+            return {
+                'linkedin_url': linkedin_url,
+                'headline': fields['headline'],
+                'current_title': fields['current_title'],
+                'current_company': fields['current_company'],
+                'location_linkedin': fields['location_linkedin'],
+                'industry_linkedin': '',
+                'education': '',
+                'experience': '',
+                'last_enriched_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'description': '',
+                'enrichment_source': 'snippet'
+            }
+        return None
+    
     def extract_profile_data(self, linkedin_url: str) -> Dict[str, str]:
         """
         Extract data from LinkedIn public profile using the new scraper
         """
         try:
             # Initialize the scraper with our driver
-            scraper = LinkedInProfileScraper(self.driver)
+            scraper = LinkedInProfileScraper(self.driver, self.archive, page_timeout=self.budget.remaining())
             
             # Extract profile info
+            self._use_session()
+            self.telemetry.set_state(STATE_PROFILE, linkedin_url)
+            self.driver_manager.record_page_load()
             profile_data = scraper.extract_profile_info(linkedin_url)
+            if self.session:
+                self.sessions.record_success(self.session)
+            if self.profiler:
+                self.profiler.record_page(self.driver, 'profile')
             
             # Map to the expected format
-            return {
-                'linkedin_url': profile_data['linkedin_url'],
-                'headline': profile_data['description'][:200] if profile_data['description'] else '',
-                'current_title': profile_data['job_title'],
-                'current_company': profile_data['company'],
-                'location_linkedin': '',
-                'industry_linkedin': '',
-                'education': '',
-                'last_enriched_at': profile_data['scraped_at'],
-                'description': profile_data['description']
-            }
+            return to_enrichment_fields(profile_data)
             
+        except BlockDetectedError:
+            raise
         except Exception as e:
+            raise_if_crashed(e)
             logger.error(f"Worker {self.worker_id}: Error extracting profile data from {linkedin_url}: {e}")
             return {
                 'linkedin_url': linkedin_url,
@@ -214,98 +519,541 @@ class LinkedInEnricherMultiprocess:
                 'location_linkedin': '',
                 'industry_linkedin': '',
                 'education': '',
+                'experience': '',
                 'last_enriched_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'description': ''
             }
     
-    def process_batch(self, batch_data: List[Dict]) -> List[Dict]:
+    def fetch_profile(self, linkedin_url: str) -> Dict[str, str]:
         """
-        Process a batch of records
+        Extract a profile unless another worker is loading it or already loaded it this
+        run, in which case wait for that load and reuse its result from the cache
+        Raises RecordTimeoutError if the record's budget runs out while waiting
         """
+        deadline = time.time() + INFLIGHT_STALE_SECONDS
+        while True:
+            state = self.cache.claim_profile(linkedin_url, self.owner)
+            if state == INFLIGHT_CLAIMED or time.time() > deadline:
+                break
+            if state == INFLIGHT_DONE:
+                cached = self.cache.get_profile(linkedin_url)
+                if cached:
+                    log_event(logger, 'profile_reused', url=linkedin_url)
+                    return cached
+            self.budget.check('profile wait')
+            time.sleep(0.5)
+        
+        success = False
         try:
-            # Initialize driver
-            self.driver = self._setup_driver()
+            profile_data = self.extract_profile_data(linkedin_url)
+            # A page cut short by the budget is partial, so it isn't shared through the cache
+            if self._timed_out():
+                return profile_data
+            # Store before marking the load done so waiting workers find it
+            self.cache.store_profile(profile_data)
+            success = self.cache.get_profile(linkedin_url) is not None
+            return profile_data
+        finally:
+            self.cache.finish_profile(linkedin_url, self.owner, success)
+    
+    def _build_result(self, fields: Dict[str, str], primary_url: Optional[str], additional_urls: List[str],
+                      profile_data: Optional[Dict[str, str]], blocked: bool = False,
+                      timed_out: bool = False, failed: bool = False) -> Dict[str, str]:
+        """
+        Build the output record and store successful lookups in the cache
+        A timed-out record keeps the URLs and fields it got to, but only its search
+        is cached, so the next run goes straight to the profile; a failed record (its
+        search or profile load kept erroring) keeps the URLs it found the same way
+        """
+        result = {
+            'Email': fields['Email'],
+            'first_name': fields['first_name'],
+            'last_name': fields['last_name'],
+            'company': fields['company'],
+            'location': fields['location'],
+            'linkedin_url': '',
+            'additional_linkedin_urls': '',
+            'current_title': '',
+            'current_company': '',
+            'description': '',
+            'location_linkedin': '',
+            'industry_linkedin': '',
+            'education': '',
+            'experience': '',
+            'last_enriched_at': '',
+            'enrichment_status': ('timed_out' if timed_out else 'blocked' if blocked else 'failed' if failed
+                                  else 'not_found'),
+            'enrichment_source': ''
+        }
+        
+        if primary_url and (profile_data or timed_out or failed):
+            self.cache.store_search(make_search_key(fields['first_name'], fields['last_name'], fields['company'], fields['location']),
+                                    primary_url, additional_urls)
+            self.identity.add(fields, primary_url)
+            result.update({
+                'linkedin_url': primary_url,
+                'additional_linkedin_urls': '; '.join(additional_urls) if additional_urls else ''
+            })
+        
+        if primary_url and profile_data:
+            source = profile_data.get('enrichment_source', 'profile')
+            # Snippet fields are partial, so only full profiles go into the profile cache
+            if source == 'profile' and not timed_out:
+                self.cache.store_profile(profile_data)
             
-            # Ensure LinkedIn login
-            if not self.ensure_linkedin_login():
-                logger.error(f"Worker {self.worker_id}: Failed to login to LinkedIn")
+            # Update result
+            result.update({
+                'linkedin_url': profile_data['linkedin_url'],
+                'additional_linkedin_urls': '; '.join(additional_urls) if additional_urls else '',
+                'current_title': profile_data['current_title'],
+                'current_company': profile_data['current_company'],
+                'description': profile_data['description'],
+                'location_linkedin': profile_data['location_linkedin'],
+                'industry_linkedin': profile_data['industry_linkedin'],
+                'education': profile_data['education'],
+                'experience': profile_data['experience'],
+                'last_enriched_at': profile_data['last_enriched_at'],
+                'enrichment_status': 'timed_out' if timed_out else 'enriched',
+                'enrichment_source': source
+            })
+        
+        log_event(logger, 'record_done', status=result['enrichment_status'], source=result['enrichment_source'],
+                  url=result['linkedin_url'], seconds=f"{self.budget.elapsed():.1f}")
+        self.telemetry.record(result['enrichment_status'])
+        return result
+    
+    def _start_driver(self) -> bool:
+        """
+        Initialize the driver on the first batch; it is reused across batches after that
+        A browser that fails to launch or crashes during the login check is relaunched up
+        to max_crash_retries times
+        Returns False if there is no logged-in driver to work with
+        """
+        for attempt in range(self.max_crash_retries + 1):
+            if self.driver is not None:
+                return True
+            try:
+                self.driver = self.driver_manager.start()
+                
+                # Ensure LinkedIn login
+                if self.requires_login and not self.ensure_linkedin_login():
+                    logger.error(f"Worker {self.worker_id}: Failed to login to LinkedIn")
+                    self._reset_driver()
+                    return False
+                return True
+            except Exception as e:
+                logger.warning(f"Worker {self.worker_id}: Browser failed while starting ({e})")
+                self._reset_driver()
+        return False
+    
+    def process_batch(self, batch_data: List[Dict], deadline: float = None) -> List[Dict]:
+        """
+        Process a batch of records
+        With a deadline, stops before the first record not expected to finish in time
+        If the batch fails part way, returns what it finished; the records it didn't
+        get to are left in last_unprocessed
+        """
+        results = []
+        # Positions of records that are finished with, successfully or not
+        done = set()
+        try:
+            if not self._start_driver():
+                self._reset_driver()
                 return []
             
-            results = []
-            
-            for i, record in enumerate(batch_data):
+            # Records hit by a block are requeued once the driver is rotated, records
+            # whose browser crashed once it is restarted
+            pending = deque(enumerate(batch_data))
+            block_retries = {}
+            crash_retries = {}
+            guard = DeadlineGuard(deadline)
+            while pending:
+                guard.finish()
+                if not guard.allows_next():
+                    logger.info(f"Worker {self.worker_id}: Deadline reached with {len(pending)} records of the batch left")
+                    break
+                i, record = pending.popleft()
+                guard.start()
                 try:
-                    first_name = str(record.get('first_name', '')).strip()
-                    last_name = str(record.get('last_name', '')).strip()
-                    company = str(record.get('company', '')).strip()
-                    location = str(record.get('location', '')).strip()
-                    email = str(record.get('Email', '')).strip()
+                    fields = _record_fields(record)
+                    first_name, last_name = fields['first_name'], fields['last_name']
+                    set_log_record(_record_id(fields))
                     
-                    if not first_name or not last_name or first_name == 'nan' or last_name == 'nan':
+                    if not first_name or not last_name:
                         logger.warning(f"Worker {self.worker_id}: Skipping record {i}: missing name data")
+                        done.add(i)
                         continue
                     
-                    logger.info(f"Worker {self.worker_id}: Processing {i+1}/{len(batch_data)}: {first_name} {last_name}")
-                    
-                    # Search for LinkedIn profile
-                    primary_url, additional_urls = self.search_linkedin_profile(first_name, last_name, company, location)
+                    log_event(logger, 'record_start', position=f"{i+1}/{len(batch_data)}", name=f"{first_name} {last_name}")
+                    self._maintain_driver()
+                    self._begin_record()
                     
-                    result = {
-                        'Email': email,
-                        'first_name': first_name,
-                        'last_name': last_name,
-                        'company': company,
-                        'location': location,
-                        'linkedin_url': '',
-                        'additional_linkedin_urls': '',
-                        'current_title': '',
-                        'current_company': '',
-                        'description': '',
-                        'last_enriched_at': ''
-                    }
-                    
-                    if primary_url:
-                        # Extract profile data
-                        profile_data = self.extract_profile_data(primary_url)
-                        
-                        # Update result
-                        result.update({
-                            'linkedin_url': profile_data['linkedin_url'],
-                            'additional_linkedin_urls': '; '.join(additional_urls) if additional_urls else '',
-                            'current_title': profile_data['current_title'],
-                            'current_company': profile_data['current_company'],
-                            'description': profile_data['description'],
-                            'last_enriched_at': profile_data['last_enriched_at']
-                        })
+                    blocked = False
+                    timed_out = False
+                    # Search for LinkedIn profile unless the URL is already known
+                    primary_url, additional_urls = _known_urls(fields)
+                    profile_data = None
+                    try:
+                        snippet_profile = None
+                        if not primary_url:
+                            primary_url, additional_urls = self.search_linkedin_profile(
+                                first_name, last_name, fields['company'], fields['location'])
+                            snippet_profile = self.last_snippet
+                        self.budget.check('search')
+                        profile_data = snippet_profile or (self.fetch_profile(primary_url) if primary_url else None)
+                        self.circuit_breaker.record_success()
+                        self.driver_manager.record_success()
+                    except RecordTimeoutError as e:
+                        logger.warning(f"Worker {self.worker_id}: {first_name} {last_name} ran out of its "
+                                       f"{self.record_timeout:g}s budget during {e.stage}")
+                        timed_out = True
+                    except BlockDetectedError as e:
+                        attempts = block_retries.get(i, 0)
+                        if self._recover_from_block(e, attempts):
+                            block_retries[i] = attempts + 1
+                            pending.appendleft((i, record))
+                            logger.info(f"Worker {self.worker_id}: Requeued {first_name} {last_name} after {e.block_type}")
+                            continue
                         
-                        logger.info(f"Worker {self.worker_id}: Successfully enriched {first_name} {last_name}")
-                    else:
-                        logger.info(f"Worker {self.worker_id}: No LinkedIn profile found for {first_name} {last_name}")
+                        logger.warning(f"Worker {self.worker_id}: Giving up on {first_name} {last_name} after {attempts + 1} blocks")
+                        primary_url, additional_urls, profile_data = None, [], None
+                        blocked = True
                     
-                    results.append(result)
+                    self._commit(results, self._build_result(fields, primary_url, additional_urls, profile_data, blocked,
+                                                             timed_out or self._timed_out()))
+                    done.add(i)
                     
                     # Be respectful with delays
-                    time.sleep(2)
+                    pause(self.driver, 2)
                     
+                except DriverCrashedError as e:
+                    # Only this record is redone; a failed restart ends the batch below
+                    self._restart_driver(e)
+                    crash_retries[i] = crash_retries.get(i, 0) + 1
+                    if crash_retries[i] <= self.max_crash_retries:
+                        pending.appendleft((i, record))
+                    else:
+                        logger.warning(f"Worker {self.worker_id}: Record {i} crashed the browser "
+                                       f"{crash_retries[i]} times, leaving it for another worker")
+                    continue
                 except Exception as e:
                     logger.error(f"Worker {self.worker_id}: Error processing record {i}: {e}")
+                    self._record_error()
+                    done.add(i)
                     continue
             
+            self.telemetry.set_state(STATE_IDLE)
             return results
             
         except Exception as e:
-            logger.error(f"Worker {self.worker_id}: Error processing batch: {e}")
-            return []
+            logger.error(f"Worker {self.worker_id}: Error processing batch after {len(results)} records: {e}")
+            self._reset_driver()
+            return results
+        finally:
+            set_log_record(None)
+            self.last_unprocessed = [record for i, record in enumerate(batch_data) if i not in done]
+    
+    def _search_stage(self, records: List[tuple], found: queue.Queue, stop: threading.Event):
+        """
+        Search thread of a pipelined batch: resolves candidate URLs on this enricher's
+        own driver and hands them to the profile stage through a bounded queue
+        Blocks on a full queue, so searching never runs more than a few records ahead
+        """
+        if self.profiler:
+            self.profiler.start()
+        try:
+            for i, fields in records:
+                if stop.is_set():
+                    break
+                
+                set_log_record(_record_id(fields))
+                self._begin_record()
+                primary_url, additional_urls = _known_urls(fields)
+                snippet_profile = None
+                blocked = False
+                timed_out = False
+                attempts = 0
+                crashes = 0
+                while not primary_url:
+                    try:
+                        self._maintain_driver()
+                        primary_url, additional_urls = self.search_linkedin_profile(
+                            fields['first_name'], fields['last_name'], fields['company'], fields['location'])
+                        snippet_profile = self.last_snippet
+                        self.circuit_breaker.record_success()
+                        self.driver_manager.record_success()
+                        break
+                    except RecordTimeoutError as e:
+                        logger.warning(f"Worker {self.worker_id}: {fields['first_name']} {fields['last_name']} ran "
+                                       f"out of its {self.record_timeout:g}s budget during {e.stage}")
+                        timed_out = True
+                        break
+                    except BlockDetectedError as e:
+                        if not self._recover_from_block(e, attempts):
+                            logger.warning(f"Worker {self.worker_id}: Giving up search for {fields['first_name']} "
+                                           f"{fields['last_name']} after {attempts + 1} blocks")
+                            blocked = True
+                            break
+                        attempts += 1
+                    except DriverCrashedError as e:
+                        self._restart_driver(e)
+                        crashes += 1
+                        if crashes > self.max_crash_retries:
+                            break
+                    except Exception as e:
+                        logger.error(f"Worker {self.worker_id}: Search stage error for record {i}: {e}")
+                        self._record_error()
+                        break
+                
+                # A record that keeps crashing the browser is left unprocessed
+                if crashes > self.max_crash_retries:
+                    logger.warning(f"Worker {self.worker_id}: Record {i} crashed the search browser "
+                                   f"{crashes} times, leaving it for another worker")
+                    continue
+                found.put((i, fields, primary_url, additional_urls or [], blocked, snippet_profile,
+                           timed_out or self._timed_out()))
+        except DriverCrashedError as e:
+            # Records not handed over yet stay unprocessed
+            logger.error(f"Worker {self.worker_id}: Search stage stopped: {e}")
         finally:
-            if self.driver:
-                self.driver.quit()
+            set_log_record(None)
+            if self.profiler:
+                self.profiler.pause()
+            found.put(None)
+    
+    def _get_searcher(self) -> Optional['LinkedInEnricherMultiprocess']:
+        """
+        Search-only enricher sharing this worker's id, cache and archive settings but
+        running its own Chrome instance in a separate profile directory
+        Returns None if its browser can't be started
+        """
+        if self._searcher is None:
+            self._searcher = LinkedInEnricherMultiprocess(
+                self.worker_id, self.cache.path,
+                self.archive.root if self.archive else None,
+                user_data_suffix='_search', requires_login=False,
+                profile_dir=self.profiler.output_dir if self.profiler else None,
+                browser_backend=self.browser_backend, snippet_max_age_days=self.snippet_max_age_days,
+                record_timeout=self.record_timeout, spare_drivers=self.spare_drivers
+            )
+        # Also restarts a search driver dropped after a crash
+        if not self._searcher._start_driver():
+            return None
+        return self._searcher
+    
+    def process_batch_pipelined(self, batch_data: List[Dict], queue_size: int = 2, deadline: float = None) -> List[Dict]:
+        """
+        Process a batch with the Google search for upcoming records running on a second
+        driver while the current record's profile loads, so steady-state time per record
+        approaches the slower of the two stages instead of their sum
+        With a deadline, stops before the first record not expected to finish in time
+        If the batch fails part way, returns what it finished; the records it didn't
+        get to are left in last_unprocessed
+        """
+        results = []
+        done = set()
+        try:
+            if not self._start_driver():
+                self._reset_driver()
+                return []
+            searcher = self._get_searcher()
+            if searcher is None:
+                # The whole batch is left unprocessed and goes to another worker
+                logger.error(f"Worker {self.worker_id}: Could not start the search browser")
+                return []
+            
+            records = []
+            for i, record in enumerate(batch_data):
+                fields = _record_fields(record)
+                if not fields['first_name'] or not fields['last_name']:
+                    logger.warning(f"Worker {self.worker_id}: Skipping record {i}: missing name data")
+                    done.add(i)
+                    continue
+                records.append((i, fields))
+            
+            found = queue.Queue(maxsize=queue_size)
+            stop = threading.Event()
+            search_thread = threading.Thread(target=searcher._search_stage, args=(records, found, stop), daemon=True)
+            search_thread.start()
+            
+            guard = DeadlineGuard(deadline)
+            try:
+                while True:
+                    guard.finish()
+                    if not guard.allows_next():
+                        logger.info(f"Worker {self.worker_id}: Deadline reached, stopping the batch")
+                        break
+                    item = found.get()
+                    if item is None:
+                        break
+                    guard.start()
+                    i, fields, primary_url, additional_urls, blocked, snippet_profile, timed_out = item
+                    set_log_record(_record_id(fields))
+                    # The profile stage gets its own budget; the search ran on the other driver
+                    self._begin_record()
+                    log_event(logger, 'record_start', position=f"{i+1}/{len(batch_data)}",
+                              name=f"{fields['first_name']} {fields['last_name']}")
+                    
+                    # A usable snippet means the profile never has to be loaded; a search that
+                    # used up the record's budget leaves the profile for the next run
+                    profile_data = snippet_profile
+                    attempts = 0
+                    crashes = 0
+                    while primary_url and not blocked and not profile_data and not timed_out:
+                        try:
+                            self._maintain_driver()
+                            # Backoff after a block doesn't count against the retried load
+                            self._begin_record()
+                            profile_data = self.fetch_profile(primary_url)
+                            timed_out = self._timed_out()
+                            self.circuit_breaker.record_success()
+                            self.driver_manager.record_success()
+                            break
+                        except RecordTimeoutError as e:
+                            logger.warning(f"Worker {self.worker_id}: {fields['first_name']} {fields['last_name']} ran "
+                                           f"out of its {self.record_timeout:g}s budget during {e.stage}")
+                            timed_out = True
+                            break
+                        except BlockDetectedError as e:
+                            if not self._recover_from_block(e, attempts):
+                                logger.warning(f"Worker {self.worker_id}: Giving up on {fields['first_name']} "
+                                               f"{fields['last_name']} after {attempts + 1} blocks")
+                                blocked = True
+                                break
+                            attempts += 1
+                        except DriverCrashedError as e:
+                            self._restart_driver(e)
+                            crashes += 1
+                            if crashes > self.max_crash_retries:
+                                break
+                        except Exception as e:
+                            logger.error(f"Worker {self.worker_id}: Error processing record {i}: {e}")
+                            self._record_error()
+                            break
+                    
+                    # A record that keeps crashing the browser is left unprocessed
+                    if crashes > self.max_crash_retries:
+                        logger.warning(f"Worker {self.worker_id}: Record {i} crashed the browser "
+                                       f"{crashes} times, leaving it for another worker")
+                        continue
+                    if blocked:
+                        primary_url, additional_urls, profile_data = None, [], None
+                    self._commit(results, self._build_result(fields, primary_url, additional_urls, profile_data, blocked,
+                                                             timed_out))
+                    done.add(i)
+                    
+                    # Be respectful with delays
+                    pause(self.driver, 2)
+            finally:
+                set_log_record(None)
+                # Unblock the search thread if the profile stage stopped early
+                stop.set()
+                while search_thread.is_alive():
+                    try:
+                        found.get(timeout=1)
+                    except queue.Empty:
+                        pass
+            
+            self.telemetry.set_state(STATE_IDLE)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: Error processing batch after {len(results)} records: {e}")
+            self._reset_driver()
+            return results
+        finally:
+            self.last_unprocessed = [record for i, record in enumerate(batch_data) if i not in done]
+    
+    def close(self):
+        """Close the browser driver"""
+        self.telemetry.set_state(STATE_STOPPED)
+        self.telemetry.close()
+        if self.profiler:
+            self.profiler.save()
+        if self._searcher:
+            self._searcher.close()
+            self._searcher = None
+        self.driver_manager.quit()
+        self.driver = None
+        self.cache.close()
+        self.identity.close()
+        if self.sessions:
+            self.sessions.release(self.owner)
+            self.sessions.close()
+        if self.archive:
+            self.archive.close()
 
-def worker_process(worker_id: int, batch_data: List[Dict]) -> List[Dict]:
+# Enricher owned by the current pool process, set up by init_worker
+_worker_enricher = None
+# Queue each finished result is posted to, set up by init_worker
+_result_queue = None
+
+def init_worker(worker_counter, cache_path: str = DEFAULT_CACHE_PATH, archive_dir: str = None, profile_dir: str = None,
+                browser_backend: BrowserBackend = None, snippet_max_age_days: float = None,
+                log_config: LogConfig = None, result_queue=None, record_timeout: float = DEFAULT_RECORD_TIMEOUT,
+                session_pool: str = None, spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Pool initializer: give each pool process a stable worker id and one enricher
+    whose driver lives until the process exits
+    """
+    global _worker_enricher, _result_queue
+    _result_queue = result_queue
+    with worker_counter.get_lock():
+        worker_id = worker_counter.value
+        worker_counter.value += 1
+    configure_worker_logging(log_config, worker_id)
+    
+    _worker_enricher = LinkedInEnricherMultiprocess(worker_id, cache_path, archive_dir, profile_dir=profile_dir,
+                                                    browser_backend=browser_backend,
+                                                    snippet_max_age_days=snippet_max_age_days,
+                                                    record_timeout=record_timeout, session_pool=session_pool,
+                                                    spare_drivers=spare_drivers)
+    if _worker_enricher.profiler:
+        _worker_enricher.profiler.start()
+    
+    # Runs when the pool is closed and the process exits normally
+    Finalize(None, _worker_enricher.close, exitpriority=10)
+
+def worker_process(worker_id: int, batch_data: List[Dict], pipelined: bool = False,
+                   deadline: float = None, batch_index: int = 0) -> tuple:
     """
     Worker process function for multiprocessing
+    Each result is posted to the result queue as (batch_index, result) the moment its
+    record finishes, so a batch that fails later doesn't lose it
+    Returns the number of results posted and the records the batch didn't get to
     """
-    enricher = LinkedInEnricherMultiprocess(worker_id)
-    return enricher.process_batch(batch_data)
+    enricher = _worker_enricher or LinkedInEnricherMultiprocess(worker_id)
+    if _result_queue is not None:
+        enricher.result_sink = lambda result: _result_queue.put((batch_index, result))
+    try:
+        results = (enricher.process_batch_pipelined(batch_data, deadline=deadline) if pipelined
+                   else enricher.process_batch(batch_data, deadline))
+        return len(results), enricher.last_unprocessed
+    finally:
+        enricher.result_sink = None
+        if enricher is not _worker_enricher:
+            enricher.close()
+
+def requeue_records(records: List[Dict]) -> List[Dict]:
+    """
+    Copies of unprocessed records with their requeue count raised, leaving out those
+    that already used up MAX_REQUEUES
+    """
+    requeued = []
+    for record in records:
+        count = record.get(REQUEUE_KEY, 0)
+        if count >= MAX_REQUEUES:
+            fields = _record_fields(record)
+            logger.warning(f"Giving up on {fields['first_name']} {fields['last_name']} after {count} requeues")
+            continue
+        requeued.append({**record, REQUEUE_KEY: count + 1})
+    return requeued
+
+def read_input(input_file: str) -> pd.DataFrame:
+    """
+    Load the input records from an Excel, CSV or Parquet file
+    """
+    return read_table(input_file)
 
 def split_into_batches(data: List[Dict], batch_size: int = 100) -> List[List[Dict]]:
     """
@@ -317,66 +1065,1182 @@ def split_into_batches(data: List[Dict], batch_size: int = 100) -> List[List[Dic
         batches.append(batch)
     return batches
 
-def main():
+def prioritize(data: List[Dict], policy: str = PRIORITY_FILE) -> List[Dict]:
     """
-    Main function to run the multiprocess enricher
+    Records in the order the priority policy wants them worked on
+    """
+    if policy == PRIORITY_FILE or not data:
+        return data
+    records = pd.DataFrame(data)
+    return [data[position] for position in priority_order(records, policy)]
+
+def remaining_records(data: List[Dict], all_results: List[Dict]) -> pd.DataFrame:
+    """
+    Records of data that produced no result, in their original order
     """
+    done = {_record_id(_record_fields(result)) for result in all_results}
+    return pd.DataFrame([record for record in data if _record_id(_record_fields(record)) not in done],
+                        columns=pd.DataFrame(data[:1]).columns)
+
+def resolve_from_cache(df: pd.DataFrame, cache_path: str = DEFAULT_CACHE_PATH,
+                       match_confidence: float = DEFAULT_MATCH_CONFIDENCE) -> tuple:
+    """
+    Join the input against the search and profile caches in bulk
+    Rows the exact search key misses are matched against the identity index, so a
+    nickname, initial or maiden-name spelling of someone already enriched still
+    finds their profile; match_confidence=None turns that off
+    Returns tuple: (cached_results_df, records_left_for_workers)
+    """
+    cache = EnrichmentCache(cache_path)
+    identity = IdentityIndex(cache_path)
+    try:
+        normalized = normalize_input_frame(df)
+        cached = cache.lookup(normalized)
+        
+        matched = pd.Series(False, index=normalized.index)
+        if match_confidence is not None:
+            unknown = normalized['has_name'] & (cached['linkedin_url'] == '')
+            found = identity.match(normalized[unknown], match_confidence)
+            matched = (found['linkedin_url'] != '').reindex(normalized.index, fill_value=False)
+            if matched.any():
+                normalized.loc[matched, 'linkedin_url'] = found.loc[matched[matched].index, 'linkedin_url']
+                cached = cache.lookup(normalized)
+                logger.info(f"Matched {matched.sum()} records to known profiles by identity "
+                            f"(confidence >= {match_confidence:g})")
+    finally:
+        cache.close()
+        identity.close()
+    
+    missing_names = ~normalized['has_name']
+    if missing_names.any():
+        logger.warning(f"Skipping {missing_names.sum()} records with missing name data")
+    
+    # Rows whose profile is already cached never reach a worker
+    cache_hits = normalized['has_name'] & cached['profile_hit']
+    cached_results = normalized.loc[cache_hits, ['Email'] + NAME_COLUMNS]
+    for column in RESULT_COLUMNS[5:-2]:
+        cached_results[column] = cached.loc[cache_hits, column]
+    cached_results['enrichment_status'] = 'enriched'
+    cached_results['enrichment_source'] = 'cache'
+    cached_results.loc[matched[cache_hits], 'enrichment_source'] = 'identity'
+    
+    # Misses carry any URL we already know so workers can skip the search
+    misses = normalized['has_name'] & ~cache_hits
+    pending = df.loc[misses].copy()
+    pending['linkedin_url'] = cached.loc[misses, 'linkedin_url']
+    pending['additional_linkedin_urls'] = cached.loc[misses, 'additional_linkedin_urls']
+    
+    logger.info(f"Filled {len(cached_results)} records from cache, {len(pending)} left for workers")
+    return cached_results, pending.to_dict('records')
+
+def reset_inflight(cache_path: str = DEFAULT_CACHE_PATH):
+    """
+    Start a new run: profiles loaded by earlier runs may be loaded again
+    """
+    cache = EnrichmentCache(cache_path)
     try:
-        # Use the full file path
-        input_file = r"C:\Users\dmaso\OneDrive\Documents\002 Projects\003 Web Development Agency\01_Clients\01_Greekrow_Trailblaze\03_Development\alumni_scraper\data\Test-Upload-9-3.xlsx"
+        cache.clear_inflight()
+    finally:
+        cache.close()
+
+def start_status_reporter(total: int, cache_hits: int = 0, status_port: int = None) -> TelemetryReporter:
+    """
+    Reset the telemetry for a new run and start publishing the live status
+    """
+    telemetry = Telemetry(DEFAULT_TELEMETRY_PATH, 'coordinator')
+    telemetry.start_run(total, cache_hits)
+    telemetry.close()
+    logger.info(f"Live status in {DEFAULT_STATUS_FILE} (or: python linkedin_telemetry.py --watch 10)")
+    return TelemetryReporter(DEFAULT_TELEMETRY_PATH, DEFAULT_STATUS_FILE, status_port).start()
+
+def enrich_records(data: List[Dict], num_workers: int = 4, archive_dir: str = None, pipelined: bool = False,
+                   profile_dir: str = None, browser_backend: BrowserBackend = None,
+                   cache_path: str = DEFAULT_CACHE_PATH, snippet_max_age_days: float = None,
+                   deadline: float = None, record_timeout: float = DEFAULT_RECORD_TIMEOUT,
+                   session_pool: str = None, spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> List[Dict]:
+    """
+    Run records through a pool of workers on this machine, in input order
+    With a deadline, batches are small so the order of data is kept closely and
+    little work is stranded in batches that are cut short
+    Results are collected as records finish; records a failed batch didn't get to
+    are submitted again as a new task, so they go to whichever worker is free
+    """
+    # Split into batches of 100 (10 under a deadline)
+    batch_size = 10 if deadline is not None else 100
+    batches = split_into_batches(data, batch_size=batch_size)
+    logger.info(f"Split into {len(batches)} batches of ~{batch_size} records each")
+    
+    # Process batches with the worker pool; results arrive as (batch index, result)
+    collected = []
+    result_queue = mp.Queue()
+    
+    worker_counter = mp.Value('i', 0)
+    with Pool(processes=num_workers, initializer=init_worker, initargs=(worker_counter, cache_path, archive_dir, profile_dir, browser_backend,
+                                                                                       snippet_max_age_days, worker_log_config(), result_queue,
+                                                                                       record_timeout, session_pool, spare_drivers)) as pool:
+        tasks = {}
+        
+        def submit(index: int, batch: List[Dict]):
+            worker_id = index % num_workers  # Distribute batches across workers
+            tasks[pool.apply_async(worker_process, (worker_id, batch, pipelined, deadline, index))] = index
+        
+        def collect(timeout: float):
+            try:
+                collected.append(result_queue.get(timeout=timeout))
+                while True:
+                    collected.append(result_queue.get_nowait())
+            except queue.Empty:
+                pass
         
+        # Process batches in parallel, one batch per task so they are taken in order
+        logger.info(f"Starting {num_workers} workers to process {len(batches)} batches...")
+        for i, batch in enumerate(batches):
+            submit(i, batch)
+        
+        posted = 0
+        while tasks:
+            collect(0.5)
+            for task in [task for task in tasks if task.ready()]:
+                index = tasks.pop(task)
+                try:
+                    count, unprocessed = task.get()
+                except Exception as e:
+                    logger.error(f"Batch {index} failed: {e}")
+                    continue
+                posted += count
+                if not unprocessed:
+                    continue
+                if deadline is not None and time.time() >= deadline:
+                    continue
+                requeued = requeue_records(unprocessed)
+                if requeued:
+                    log_event(logger, 'batch_requeued', level=logging.WARNING, batch=index, records=len(requeued))
+                    submit(index, requeued)
+        
+        # Results posted just before their task finished may still be in transit
+        while len(collected) < posted:
+            received = len(collected)
+            collect(5)
+            if len(collected) == received:
+                logger.warning(f"{posted - received} results never arrived from the workers")
+                break
+        
+        # Let workers exit normally so their drivers are closed
+        pool.close()
+        pool.join()
+    
+    # Back into input order; requeued records follow the rest of their batch
+    collected.sort(key=lambda item: item[0])
+    return [result for _, result in collected]
+
+def run_local(input_file: str = DEFAULT_INPUT_FILE, num_workers: int = 4, archive_dir: str = None,
+              pipelined: bool = False, status_port: int = None, profile_dir: str = None,
+              browser_backend: BrowserBackend = None, cache_path: str = DEFAULT_CACHE_PATH,
+              snippet_max_age_days: float = None, match_confidence: float = DEFAULT_MATCH_CONFIDENCE,
+              deadline: float = None, priority: str = PRIORITY_FILE, output_format: str = FORMAT_CSV,
+              record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+              spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> str:
+    """
+    Enrich an Excel or CSV file with a pool of workers on this machine
+    With a deadline (a time.time() value), records are started in the order of the
+    priority policy until the deadline and whatever is left is saved separately
+    Returns the output file, or None if the run failed
+    """
+    reporter = None
+    try:
         logger.info("Starting LinkedIn enrichment process with multiprocessing...")
         
         # Read Excel file
-        df = pd.read_excel(input_file)
+        df = read_input(input_file)
         logger.info(f"Loaded {len(df)} records from {input_file}")
         
-        # Convert to list of dictionaries
-        data = df.to_dict('records')
+        # Fill cached rows in bulk and convert the rest to a list of dictionaries
+        cached_results, data = resolve_from_cache(df, cache_path, match_confidence)
+        data = prioritize(data, priority)
+        reset_inflight(cache_path)
+        if session_pool:
+            reset_session_holders(session_pool)
+        reporter = start_status_reporter(len(cached_results) + len(data), len(cached_results), status_port)
         
-        # Split into batches of 100
-        batches = split_into_batches(data, batch_size=100)
-        logger.info(f"Split into {len(batches)} batches of ~100 records each")
+        all_results = enrich_records(data, num_workers, archive_dir, pipelined, profile_dir, browser_backend, cache_path,
+                                     snippet_max_age_days, deadline, record_timeout, session_pool, spare_drivers)
         
-        # Process batches with 4 workers
-        num_workers = 4
-        all_results = []
+        output_file = save_results(cached_results, all_results, output_format)
+        if deadline is not None:
+            report_remaining(remaining_records(data, all_results))
+        return output_file
         
-        with Pool(processes=num_workers) as pool:
-            # Create worker tasks
-            worker_tasks = []
-            for i, batch in enumerate(batches):
-                worker_id = i % num_workers  # Distribute batches across workers
-                worker_tasks.append((worker_id, batch))
-            
-            # Process batches in parallel
-            logger.info(f"Starting {num_workers} workers to process {len(batches)} batches...")
-            results = pool.starmap(worker_process, worker_tasks)
-            
-            # Flatten results
-            for batch_results in results:
-                all_results.extend(batch_results)
+    except Exception as e:
+        logger.error(f"Error in main process: {e}")
+    finally:
+        if reporter:
+            reporter.stop()
+
+def run_refresh(previous_file: str, export_file: str, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                num_workers: int = 4, archive_dir: str = None, pipelined: bool = False, status_port: int = None,
+                profile_dir: str = None, browser_backend: BrowserBackend = None,
+                cache_path: str = DEFAULT_CACHE_PATH, snippet_max_age_days: float = None,
+                output_format: str = FORMAT_CSV, record_timeout: float = DEFAULT_RECORD_TIMEOUT,
+                session_pool: str = None, spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> tuple:
+    """
+    Re-enrich only the rows of a new export that are new, stale, incomplete or timed
+    out in the previous output, then write a merged result and a delta file
+    Returns (merged_file, delta_file), or None if the run failed
+    """
+    reporter = None
+    try:
+        previous = read_input(previous_file)
+        export = read_input(export_file)
+        logger.info(f"Loaded {len(previous)} previous results from {previous_file} and {len(export)} records from {export_file}")
         
-        # Create final dataframe
-        final_df = pd.DataFrame(all_results)
+        plan = plan_refresh(previous, export, max_age_days)
+        reasons = plan.loc[plan['reason'] != '', 'reason'].value_counts().to_dict()
+        logger.info(f"Refreshing {sum(reasons.values())} of {len(export)} records "
+                    f"(older than {max_age_days:g} days or incomplete): {reasons}")
         
-        # Save results
-        timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f"linkedin_profiles_multiprocess_{timestamp}.csv"
-        final_df.to_csv(output_file, index=False)
+        # Scheduled rows skip the cache lookup, their cached profiles are what's being refreshed
+        data = refresh_records(previous, export, plan)
+        reset_inflight(cache_path)
+        if session_pool:
+            reset_session_holders(session_pool)
+        reporter = start_status_reporter(len(data), 0, status_port)
+        all_results = enrich_records(data, num_workers, archive_dir, pipelined, profile_dir, browser_backend, cache_path,
+                                     snippet_max_age_days, record_timeout=record_timeout,
+                                     session_pool=session_pool, spare_drivers=spare_drivers) if data else []
         
-        logger.info("LinkedIn enrichment completed successfully!")
+        merged, delta = merge_refresh(previous, export, plan, pd.DataFrame(all_results, columns=RESULT_COLUMNS))
+        merged_file = write_table(merged, timestamped_path('linkedin_profiles_refreshed', output_format), output_format)
+        delta_file = write_table(delta, timestamped_path('linkedin_profiles_delta', output_format), output_format)
         
-        # Show summary
-        linkedin_found = final_df['linkedin_url'].notna().sum()
-        print(f"\n=== ENRICHMENT SUMMARY ===")
-        print(f"Total records processed: {len(final_df)}")
-        print(f"LinkedIn profiles found: {linkedin_found}")
-        print(f"Success rate: {(linkedin_found/len(final_df)*100):.1f}%")
-        print(f"Results saved to: {output_file}")
+        print("\n=== REFRESH SUMMARY ===")
+        print(f"Records in export: {len(export)}")
+        print(f"Re-enriched: {len(all_results)} {reasons}")
+        print(f"Changes: {delta['change_type'].value_counts().to_dict()}")
+        print(f"Merged results saved to: {merged_file}")
+        print(f"Delta saved to: {delta_file}")
+        return merged_file, delta_file
+        
+    except Exception as e:
+        logger.error(f"Error in refresh: {e}")
+    finally:
+        if reporter:
+            reporter.stop()
+
+def save_results(cached_results: pd.DataFrame, all_results: List[Dict], output_format: str = FORMAT_CSV) -> str:
+    """
+    Combine cached and freshly enriched records, save them and print a summary
+    """
+    # Create final dataframe
+    final_df = pd.concat([cached_results, pd.DataFrame(all_results, columns=RESULT_COLUMNS)], ignore_index=True)
+    
+    # Save results
+    output_file = write_table(final_df, timestamped_path('linkedin_profiles_multiprocess', output_format), output_format)
+    
+    logger.info("LinkedIn enrichment completed successfully!")
+    
+    # Show summary
+    print_summary(final_df, output_file)
+    return output_file
+
+def run_load_test(num_records: int = 1000, num_workers: int = 4, pipelined: bool = False,
+                  backend: FakeBackend = None, work_dir: str = "loadtest", profile_dir: str = None,
+                  snippet_max_age_days: float = None, controller: AIMDController = None,
+                  interval: float = 60, record_timeout: float = DEFAULT_RECORD_TIMEOUT, sessions: int = 0,
+                  session_limit: int = None, session_window: float = 60,
+                  spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> Dict[str, float]:
+    """
+    Push synthetic records through run_local against the fake browser backend
+    Each run starts from an empty cache so every record reaches a worker
+    With sessions, the fake LinkedIn only serves pages to sessions it issued and
+    throttles each past session_limit profile loads per session_window seconds;
+    the workers rotate that many sessions from a pool with the same limit
+    """
+    backend = backend or FakeBackend()
+    os.makedirs(work_dir, exist_ok=True)
+    input_file = os.path.join(work_dir, 'loadtest_input.csv')
+    cache_path = os.path.join(work_dir, 'loadtest_cache.sqlite')
+    session_pool = os.path.join(work_dir, 'loadtest_sessions.sqlite') if sessions else None
+    authority_path = os.path.join(work_dir, 'loadtest_authority.sqlite')
+    for database in [cache_path, session_pool, authority_path]:
+        for path in [database, f"{database}-wal", f"{database}-shm"] if database else []:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    if sessions:
+        backend.session_authority = FakeSessionAuthority(authority_path, session_limit, session_window)
+        pool = SessionPool(session_pool)
+        try:
+            pool.configure(session_limit or 10 ** 9, session_window, session_window)
+            for i in range(sessions):
+                pool.add(f"account{i + 1}", backend.session_authority.issue(f"account{i + 1}"))
+        finally:
+            pool.close()
+    
+    companies = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Not Specified']
+    pd.DataFrame({
+        'Email': [f"person{i}@example.com" for i in range(num_records)],
+        'first_name': [f"First{i}" for i in range(num_records)],
+        'last_name': [f"Last{i}" for i in range(num_records)],
+        'company': [companies[i % len(companies)] for i in range(num_records)],
+        'location': ['Austin, TX'] * num_records
+    }).to_csv(input_file, index=False)
+    
+    logger.info(f"Load test: {num_records} records, {num_workers} workers, pipelined={pipelined}")
+    start_time = time.time()
+    if controller:
+        output_file = run_adaptive(input_file, controller, interval, profile_dir=profile_dir, browser_backend=backend,
+                                   cache_path=cache_path, snippet_max_age_days=snippet_max_age_days,
+                                   record_timeout=record_timeout, session_pool=session_pool,
+                                   spare_drivers=spare_drivers)
+    else:
+        output_file = run_local(input_file, num_workers, pipelined=pipelined, profile_dir=profile_dir,
+                                browser_backend=backend, cache_path=cache_path, snippet_max_age_days=snippet_max_age_days,
+                                record_timeout=record_timeout, session_pool=session_pool, spare_drivers=spare_drivers)
+    elapsed = time.time() - start_time
+    
+    results = read_table(output_file) if output_file else pd.DataFrame(columns=RESULT_COLUMNS)
+    statuses = results['enrichment_status'].value_counts().to_dict()
+    print("\n=== LOAD TEST ===")
+    print(f"Records: {num_records}  Workers: {num_workers}  Pipelined: {pipelined}")
+    print(f"Elapsed: {elapsed:.1f}s  Throughput: {len(results) / elapsed:.1f} records/s")
+    print(f"Outcomes: {statuses}")
+    if session_pool:
+        pool = SessionPool(session_pool)
+        try:
+            print("Sessions: " + ', '.join(f"{session['name']} {session['total_requests']} requests "
+                                           f"{session['total_blocks']} blocks" for session in pool.snapshot()))
+        finally:
+            pool.close()
+    return {'elapsed': elapsed, 'records': len(results), 'records_per_second': len(results) / elapsed}
+
+# Outcomes of a stage action
+STAGE_DONE = 'done'
+STAGE_BLOCKED = 'blocked'
+STAGE_FAILED = 'failed'
+STAGE_CRASHED = 'crashed'
+
+# Seconds a requeue waits for room on a full stage queue before giving up
+REQUEUE_PUT_TIMEOUT = 30
+
+def _run_stage_action(enricher: LinkedInEnricherMultiprocess, stage: StagePool, action):
+    """
+    Run one stage action under the stage's rate budget and retry policy
+    Returns (value, outcome): STAGE_DONE with the action's value, STAGE_BLOCKED after
+    repeated blocks, STAGE_FAILED when errors used up the retries or the record ran
+    out of time, or STAGE_CRASHED when the record kept crashing the browser; value is
+    None unless the action succeeded
+    A crashed browser is restarted before the action is redone; raises
+    DriverCrashedError if it can't be restarted
+    """
+    policy = stage.retry_policy
+    attempts = 0
+    crashes = 0
+    while True:
+        stage.rate_limiter.acquire()
+        try:
+            enricher._maintain_driver()
+            value = action()
+            enricher.circuit_breaker.record_success()
+            enricher.driver_manager.record_success()
+            return value, STAGE_DONE
+        except BlockDetectedError as e:
+            if not enricher._recover_from_block(e, attempts):
+                logger.warning(f"Worker {enricher.worker_id}: {stage.name} gave up after {attempts + 1} blocks")
+                return None, STAGE_BLOCKED
+        except RecordTimeoutError as e:
+            logger.warning(f"Worker {enricher.worker_id}: {stage.name} ran out of the record's budget during {e.stage}")
+            return None, STAGE_FAILED
+        except DriverCrashedError as e:
+            # Retrying on the dead driver would only fail again, so restart it first
+            enricher._restart_driver(e)
+            crashes += 1
+            if crashes > enricher.max_crash_retries:
+                logger.warning(f"Worker {enricher.worker_id}: {stage.name} crashed the browser {crashes} times")
+                return None, STAGE_CRASHED
+            continue
+        except Exception as e:
+            enricher._record_error()
+            # A record out of time isn't retried; it is saved as timed_out
+            if enricher._timed_out() or not policy.should_retry(attempts + 1):
+                logger.error(f"Worker {enricher.worker_id}: {stage.name} gave up after {attempts + 1} attempts: {e}")
+                return None, STAGE_FAILED
+            delay = policy.delay(attempts)
+            logger.warning(f"Worker {enricher.worker_id}: {stage.name} error, retrying in {delay:.0f}s: {e}")
+            pause(enricher.driver, delay)
+        attempts += 1
+
+def _requeue_stage_item(stage_queue, item: tuple) -> bool:
+    """
+    Put a record that crashed the browser back on its stage queue for another worker,
+    counting requeues in its fields like requeue_records does
+    Returns False if it already used up MAX_REQUEUES or the queue stayed full
+    """
+    fields = item[1]
+    count = fields.get(REQUEUE_KEY, 0)
+    if count >= MAX_REQUEUES:
+        logger.warning(f"Giving up on {fields['first_name']} {fields['last_name']} after {count} requeues")
+        return False
+    try:
+        stage_queue.put((item[0], {**fields, REQUEUE_KEY: count + 1}) + tuple(item[2:]),
+                        timeout=REQUEUE_PUT_TIMEOUT)
+    except queue.Full:
+        logger.warning(f"Could not requeue {fields['first_name']} {fields['last_name']}, the queue is full")
+        return False
+    return True
+
+def search_pool_worker(worker_id: int, stage: StagePool, search_queue, profile_queue, result_queue,
+                       archive_dir: str = None, profile_dir: str = None, snippet_max_age_days: float = None,
+                       log_config: LogConfig = None, record_timeout: float = DEFAULT_RECORD_TIMEOUT,
+                       spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Search pool process: turns names into candidate URLs on a Google-only driver and
+    hands them to the profile pool; records without a match, with a usable snippet
+    or out of time are finished here
+    A record that keeps crashing the browser is requeued for another search worker
+    """
+    configure_worker_logging(log_config, f"search-{worker_id}")
+    enricher = LinkedInEnricherMultiprocess(worker_id, archive_dir=archive_dir, user_data_suffix='_search',
+                                            requires_login=False, profile_dir=profile_dir,
+                                            snippet_max_age_days=snippet_max_age_days, record_timeout=record_timeout,
+                                            spare_drivers=spare_drivers)
+    enricher.max_block_retries = stage.retry_policy.max_attempts
+    if enricher.profiler:
+        enricher.profiler.start()
+    try:
+        # Queued records are left for the other search workers
+        if not enricher._start_driver():
+            logger.error(f"Search worker {worker_id}: Could not start the browser, exiting")
+            return
+        while True:
+            item = search_queue.get()
+            if item is None:
+                break
+            i, fields = item
+            set_log_record(_record_id(fields))
+            enricher._begin_record()
+            try:
+                found, outcome = _run_stage_action(enricher, stage, lambda: enricher.search_linkedin_profile(
+                    fields['first_name'], fields['last_name'], fields['company'], fields['location']))
+            except DriverCrashedError as e:
+                logger.error(f"Search worker {worker_id}: {e}")
+                found, outcome = None, STAGE_CRASHED
+            if outcome == STAGE_CRASHED and _requeue_stage_item(search_queue, item):
+                # Start again from scratch if the crash restart left no driver
+                if enricher.driver is None and not enricher._start_driver():
+                    logger.error(f"Search worker {worker_id}: Could not restart the browser, exiting")
+                    break
+                continue
+            primary_url, additional_urls = found or (None, [])
+            timed_out = enricher._timed_out()
+            if primary_url and enricher.last_snippet:
+                result_queue.put(enricher._build_result(fields, primary_url, additional_urls, enricher.last_snippet,
+                                                        timed_out=timed_out))
+            elif primary_url and not timed_out:
+                profile_queue.put((i, fields, primary_url, additional_urls))
+            else:
+                # A search that kept erroring is failed, not evidence that there is no profile
+                result_queue.put(enricher._build_result(fields, primary_url, additional_urls or [], None,
+                                                        outcome == STAGE_BLOCKED, timed_out,
+                                                        outcome in (STAGE_FAILED, STAGE_CRASHED)))
+                if enricher.driver is None and not enricher._start_driver():
+                    logger.error(f"Search worker {worker_id}: Could not restart the browser, exiting")
+                    break
+    finally:
+        enricher.close()
+
+def profile_pool_worker(worker_id: int, stage: StagePool, profile_queue, result_queue, archive_dir: str = None,
+                        profile_dir: str = None, log_config: LogConfig = None,
+                        record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                        spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Profile pool process: loads and extracts profiles on a logged-in driver
+    A record that keeps crashing the browser is requeued for another profile worker
+    """
+    configure_worker_logging(log_config, f"profile-{worker_id}")
+    enricher = LinkedInEnricherMultiprocess(worker_id, archive_dir=archive_dir, profile_dir=profile_dir,
+                                            record_timeout=record_timeout, session_pool=session_pool,
+                                            spare_drivers=spare_drivers)
+    enricher.max_block_retries = stage.retry_policy.max_attempts
+    if enricher.profiler:
+        enricher.profiler.start()
+    try:
+        # Queued records are left for the other profile workers
+        if not enricher._start_driver():
+            logger.error(f"Profile worker {worker_id}: Could not start the browser or log in, exiting")
+            return
+        while True:
+            item = profile_queue.get()
+            if item is None:
+                break
+            i, fields, primary_url, additional_urls = item
+            set_log_record(_record_id(fields))
+            log_event(logger, 'profile_start', url=primary_url)
+            enricher._begin_record()
+            try:
+                profile_data, outcome = _run_stage_action(enricher, stage, lambda: enricher.fetch_profile(primary_url))
+            except DriverCrashedError as e:
+                logger.error(f"Profile worker {worker_id}: {e}")
+                profile_data, outcome = None, STAGE_CRASHED
+            if outcome == STAGE_CRASHED and _requeue_stage_item(profile_queue, item):
+                # Start again from scratch, and log in, if the crash restart left no driver
+                if enricher.driver is None and not enricher._start_driver():
+                    logger.error(f"Profile worker {worker_id}: Could not restart the browser, exiting")
+                    break
+                continue
+            blocked = outcome == STAGE_BLOCKED
+            if blocked:
+                primary_url, additional_urls = None, []
+            # A failed profile load keeps the URL the search found, so a later run only has to load it
+            result_queue.put(enricher._build_result(fields, primary_url, additional_urls, profile_data, blocked,
+                                                    enricher._timed_out(), outcome in (STAGE_FAILED, STAGE_CRASHED)))
+            if enricher.driver is None and not enricher._start_driver():
+                logger.error(f"Profile worker {worker_id}: Could not restart the browser, exiting")
+                break
+    finally:
+        enricher.close()
+
+def run_split_pools(input_file: str, search_stage: StagePool, profile_stage: StagePool, archive_dir: str = None,
+                    status_port: int = None, profile_dir: str = None, snippet_max_age_days: float = None,
+                    match_confidence: float = DEFAULT_MATCH_CONFIDENCE, output_format: str = FORMAT_CSV,
+                    record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                    spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> str:
+    """
+    Enrich a file with separate search and profile pools, each with its own
+    concurrency, rate budget and retry policy
+    Records whose URL is already known go straight to the profile pool
+    Returns the output file, or None if the run failed
+    """
+    reporter = None
+    try:
+        logger.info(f"Starting split pools ({search_stage}; {profile_stage})")
+        
+        df = read_input(input_file)
+        logger.info(f"Loaded {len(df)} records from {input_file}")
+        cached_results, data = resolve_from_cache(df, match_confidence=match_confidence)
+        reset_inflight()
+        if session_pool:
+            reset_session_holders(session_pool)
+        reporter = start_status_reporter(len(cached_results) + len(data), len(cached_results), status_port)
+        
+        search_queue = mp.Queue()
+        # Bounded so the search pool can't run arbitrarily far ahead of the profile pool
+        profile_queue = mp.Queue(maxsize=profile_stage.workers * 2)
+        result_queue = mp.Queue()
+        
+        search_processes = [mp.Process(target=search_pool_worker,
+                                       args=(worker_id, search_stage, search_queue, profile_queue, result_queue,
+                                             archive_dir, profile_dir, snippet_max_age_days, worker_log_config(),
+                                             record_timeout, spare_drivers))
+                            for worker_id in range(search_stage.workers)]
+        profile_processes = [mp.Process(target=profile_pool_worker,
+                                        args=(worker_id, profile_stage, profile_queue, result_queue, archive_dir,
+                                              profile_dir, worker_log_config(), record_timeout, session_pool,
+                                              spare_drivers))
+                             for worker_id in range(profile_stage.workers)]
+        for process in search_processes + profile_processes:
+            process.start()
+        
+        # Route each record: known URLs skip the search pool entirely
+        known, to_search = [], []
+        for i, record in enumerate(data):
+            fields = _record_fields(record)
+            primary_url, additional_urls = _known_urls(fields)
+            if primary_url:
+                known.append((i, fields, primary_url, additional_urls))
+            else:
+                to_search.append((i, fields))
+        logger.info(f"{len(to_search)} records to search, {len(known)} with known URLs")
+        
+        for item in to_search:
+            search_queue.put(item)
+        
+        # The profile queue is bounded, so feed it from a thread while results are collected
+        def feed_known():
+            for item in known:
+                profile_queue.put(item)
+        threading.Thread(target=feed_known, daemon=True).start()
+        
+        all_results = []
+        while len(all_results) < len(data):
+            try:
+                all_results.append(result_queue.get(timeout=30))
+            except queue.Empty:
+                if not any(process.is_alive() for process in profile_processes):
+                    logger.error("All profile workers exited, stopping early")
+                    break
+                if to_search and not any(process.is_alive() for process in search_processes):
+                    logger.error("All search workers exited, stopping early")
+                    break
+                continue
+            if len(all_results) % 50 == 0:
+                logger.info(f"Finished {len(all_results)}/{len(data)} records")
+            
+            # Queue lengths show which pool is the bottleneck (qsize isn't available on macOS)
+            try:
+                reporter.telemetry.set_gauge('search_queue', search_queue.qsize())
+                reporter.telemetry.set_gauge('profile_queue', profile_queue.qsize())
+            except NotImplementedError:
+                pass
+        
+        # Everything is accounted for, tell both pools to exit
+        for _ in search_processes:
+            search_queue.put(None)
+        for _ in profile_processes:
+            profile_queue.put(None)
+        for process in search_processes + profile_processes:
+            process.join()
+        
+        return save_results(cached_results, all_results, output_format)
         
     except Exception as e:
         logger.error(f"Error in main process: {e}")
+    finally:
+        if reporter:
+            reporter.stop()
+
+def adaptive_worker(worker_id: int, record_queue, result_queue, stop, cache_path: str = DEFAULT_CACHE_PATH,
+                    archive_dir: str = None, profile_dir: str = None, browser_backend: BrowserBackend = None,
+                    snippet_max_age_days: float = None, log_config: LogConfig = None, deadline: float = None,
+                    record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                    spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Worker of an adaptive run: takes one record at a time until the queue is empty,
+    the controller sets its stop event or the next record wouldn't finish before the
+    deadline, then exits after the record in hand
+    A record the worker couldn't finish goes back on the queue for another worker
+    """
+    configure_worker_logging(log_config, worker_id)
+    enricher = LinkedInEnricherMultiprocess(worker_id, cache_path, archive_dir, profile_dir=profile_dir,
+                                            browser_backend=browser_backend, snippet_max_age_days=snippet_max_age_days,
+                                            record_timeout=record_timeout, session_pool=session_pool,
+                                            spare_drivers=spare_drivers)
+    if enricher.profiler:
+        enricher.profiler.start()
+    try:
+        if not enricher._start_driver():
+            return
+        guard = DeadlineGuard(deadline)
+        while not stop.is_set() and guard.allows_next():
+            try:
+                record = record_queue.get(timeout=5)
+            except queue.Empty:
+                break
+            guard.start()
+            start_time = time.time()
+            results = enricher.process_batch([record])
+            requeued = requeue_records(enricher.last_unprocessed) if not results else []
+            if requeued:
+                record_queue.put(requeued[0])
+                # Restart the driver, and log in again, if the batch had to drop it
+                if not enricher._start_driver():
+                    break
+            else:
+                result_queue.put((worker_id, results, time.time() - start_time))
+            guard.finish()
+    finally:
+        result_queue.put((worker_id, None, 0))
+        enricher.close()
+
+def run_adaptive(input_file: str, controller: AIMDController, interval: float = 60, archive_dir: str = None,
+                 status_port: int = None, profile_dir: str = None, browser_backend: BrowserBackend = None,
+                 cache_path: str = DEFAULT_CACHE_PATH, snippet_max_age_days: float = None,
+                 match_confidence: float = DEFAULT_MATCH_CONFIDENCE, deadline: float = None,
+                 priority: str = PRIORITY_FILE, output_format: str = FORMAT_CSV,
+                 record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                 spare_drivers: int = DEFAULT_SPARE_DRIVERS) -> str:
+    """
+    Enrich a file with a worker count tuned at runtime by an AIMD controller
+    Every interval the controller sees throughput, block and error rates and record
+    latency, and workers are started or told to stop accordingly
+    With a deadline, records are queued in priority order and every worker is
+    stopped when it passes
+    """
+    reporter = None
+    workers = {}
+    try:
+        logger.info(f"Starting adaptive run ({controller})")
+        df = read_input(input_file)
+        logger.info(f"Loaded {len(df)} records from {input_file}")
+        cached_results, data = resolve_from_cache(df, cache_path, match_confidence)
+        data = prioritize(data, priority)
+        reset_inflight(cache_path)
+        if session_pool:
+            reset_session_holders(session_pool)
+        reporter = start_status_reporter(len(cached_results) + len(data), len(cached_results), status_port)
+        
+        record_queue = mp.Queue()
+        for record in data:
+            record_queue.put(record)
+        result_queue = mp.Queue()
+        
+        def start_worker():
+            worker_id = max(workers, default=-1) + 1
+            stop = mp.Event()
+            process = mp.Process(target=adaptive_worker,
+                                 args=(worker_id, record_queue, result_queue, stop, cache_path, archive_dir,
+                                       profile_dir, browser_backend, snippet_max_age_days, worker_log_config(),
+                                       deadline, record_timeout, session_pool, spare_drivers))
+            process.start()
+            workers[worker_id] = (process, stop)
+        
+        def active_workers() -> List[int]:
+            return [worker_id for worker_id, (process, stop) in workers.items() if not stop.is_set()]
+        
+        for _ in range(controller.workers):
+            start_worker()
+        
+        all_results = []
+        processed = 0
+        record_seconds = []
+        next_decision = time.time() + interval
+        while processed < len(data) and any(process.is_alive() for process, _ in workers.values()):
+            try:
+                worker_id, results, seconds = result_queue.get(timeout=1)
+                if results is None:
+                    # The worker exited; forget it so its id can be reused
+                    workers[worker_id][0].join()
+                    del workers[worker_id]
+                else:
+                    all_results.extend(results)
+                    processed += 1
+                    record_seconds.append(seconds)
+            except queue.Empty:
+                pass
+            
+            # Past the deadline no more workers are started; the rest finish the record in hand
+            if deadline is not None and time.time() >= deadline:
+                for worker_id in active_workers():
+                    workers[worker_id][1].set()
+                continue
+            if time.time() < next_decision:
+                continue
+            snapshot = reporter.telemetry.snapshot(interval)
+            sample = ConcurrencySample(len(active_workers()), len(record_seconds) * 60 / interval,
+                                       snapshot['block_rate'], snapshot['error_rate'], record_seconds)
+            current = len(active_workers())
+            target, reason = controller.decide(sample)
+            if target > current:
+                logger.info(f"Concurrency {current} -> {target}: {reason} [{sample}]")
+                for _ in range(target - current):
+                    start_worker()
+            elif target < current:
+                logger.info(f"Concurrency {current} -> {target}: {reason} [{sample}]")
+                # Stop the newest workers first; they finish the record in hand
+                for worker_id in sorted(active_workers())[target:]:
+                    workers[worker_id][1].set()
+            else:
+                logger.info(f"Concurrency stays at {current}: {reason} [{sample}]")
+            reporter.telemetry.set_gauge('target_workers', target)
+            record_seconds = []
+            next_decision = time.time() + interval
+        
+        if deadline is not None:
+            output_file = save_results(cached_results, all_results, output_format)
+            report_remaining(remaining_records(data, all_results))
+            return output_file
+        if processed < len(data):
+            logger.error(f"All workers exited with {len(data) - processed} records left")
+        return save_results(cached_results, all_results, output_format)
+        
+    except Exception as e:
+        logger.error(f"Error in adaptive run: {e}")
+    finally:
+        for process, stop in workers.values():
+            stop.set()
+        for process, stop in workers.values():
+            process.join()
+        if reporter:
+            reporter.stop()
+
+def enqueue_input(input_file: str, store_location: str = DEFAULT_JOB_STORE,
+                  match_confidence: float = DEFAULT_MATCH_CONFIDENCE) -> int:
+    """
+    Load an Excel file into a shared job store for distributed workers
+    Cached rows are stored as already completed
+    """
+    df = read_input(input_file)
+    logger.info(f"Loaded {len(df)} records from {input_file}")
+    
+    cached_results, data = resolve_from_cache(df, match_confidence=match_confidence)
+    cached_records = cached_results.to_dict('records')
+    reset_inflight()
+    
+    store = open_job_store(store_location)
+    try:
+        added = store.enqueue(cached_records, cached_records) + store.enqueue(data)
+    finally:
+        store.close()
+    
+    logger.info(f"Enqueued {added} new jobs into {store_location}")
+    return added
+
+def distributed_worker(store_location: str, worker_id: int, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                       claim_size: int = 1, idle_sleep: float = 30, archive_dir: str = None,
+                       profile_dir: str = None, log_config: LogConfig = None,
+                       record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                       spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Claim records from a shared job store until it is drained
+    Leases are kept alive by a heartbeat thread; each result is written back as soon
+    as its record is done, and records that fail, stay blocked or time out are
+    released for retry; a timed-out record's last attempt keeps its partial result
+    """
+    configure_worker_logging(log_config, worker_id)
+    store = open_job_store(store_location)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{worker_id}"
+    enricher = LinkedInEnricherMultiprocess(worker_id, archive_dir=archive_dir, profile_dir=profile_dir,
+                                            record_timeout=record_timeout, session_pool=session_pool,
+                                            spare_drivers=spare_drivers)
+    if enricher.profiler:
+        enricher.profiler.start()
+    held_jobs = set()
+    stop = threading.Event()
+    
+    def send_heartbeats():
+        while not stop.wait(lease_seconds / 3):
+            if held_jobs:
+                store.heartbeat(owner, list(held_jobs), lease_seconds)
+    
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    try:
+        if not enricher._start_driver():
+            logger.error(f"Worker {worker_id}: Could not start the browser or log in, not claiming work")
+            return
+        
+        heartbeat_thread.start()
+        while True:
+            jobs = store.claim(owner, claim_size, lease_seconds)
+            if not jobs:
+                progress = store.progress()
+                if progress['pending'] == 0 and progress['leased'] == 0:
+                    logger.info(f"Worker {worker_id}: Job store drained, exiting")
+                    break
+                
+                # Other hosts still hold leases; wait in case they expire
+                time.sleep(idle_sleep)
+                store.reclaim_expired()
+                continue
+            
+            held_jobs.update(job['job_id'] for job in jobs)
+            for job in jobs:
+                results = enricher.process_batch([job['record']])
+                status = results[0]['enrichment_status'] if results else 'failed'
+                if status == 'timed_out' and job['attempts'] < DEFAULT_MAX_ATTEMPTS:
+                    store.release(job['job_id'], owner)
+                elif status not in ('blocked', 'failed'):
+                    store.complete(job['job_id'], owner, results[0])
+                else:
+                    # Kept in case this was the last attempt, so the export still has the row
+                    store.release(job['job_id'], owner, result=results[0] if results else None)
+                held_jobs.discard(job['job_id'])
+    finally:
+        stop.set()
+        for job_id in list(held_jobs):
+            store.release(job_id, owner)
+        enricher.close()
+        store.close()
+
+def run_distributed_workers(store_location: str = DEFAULT_JOB_STORE, num_workers: int = 4, archive_dir: str = None,
+                            status_port: int = None, profile_dir: str = None,
+                            record_timeout: float = DEFAULT_RECORD_TIMEOUT, session_pool: str = None,
+                            spare_drivers: int = DEFAULT_SPARE_DRIVERS):
+    """
+    Start this host's share of workers against a shared job store
+    The live status covers this host's workers; 'status' reports on the whole store
+    """
+    store = open_job_store(store_location)
+    try:
+        progress = store.progress()
+    finally:
+        store.close()
+    reporter = start_status_reporter(progress['total'], progress['done'], status_port)
+    
+    processes = [mp.Process(target=distributed_worker, args=(store_location, worker_id),
+                              kwargs={'archive_dir': archive_dir, 'profile_dir': profile_dir,
+                                      'log_config': worker_log_config(), 'record_timeout': record_timeout,
+                                      'session_pool': session_pool, 'spare_drivers': spare_drivers})
+                 for worker_id in range(num_workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    reporter.stop()
+
+def print_progress(store_location: str = DEFAULT_JOB_STORE):
+    """
+    Coordinator report: overall progress across every host working on the store
+    """
+    store = open_job_store(store_location)
+    try:
+        reclaimed = store.reclaim_expired()
+        progress = store.progress()
+    finally:
+        store.close()
+    
+    print(f"\n=== JOB STORE PROGRESS ({store_location}) ===")
+    print(f"Total jobs: {progress['total']}")
+    print(f"Done: {progress['done']}  Pending: {progress['pending']}  "
+          f"Leased: {progress['leased']}  Failed: {progress['failed']}")
+    if progress['total']:
+        print(f"Complete: {(progress['done'] + progress['failed']) / progress['total'] * 100:.1f}%")
+    print(f"Throughput: {progress['records_per_minute']:.1f} records/min over the last 10 minutes")
+    if progress['eta_minutes'] is not None:
+        print(f"ETA: {progress['eta_minutes']:.0f} minutes")
+    if reclaimed:
+        print(f"Reclaimed {reclaimed} expired leases")
+    print(f"Active workers: {len(progress['active_owners'])}")
+    for owner, leased in sorted(progress['active_owners'].items()):
+        print(f"  {owner}: {leased} leased")
+
+def export_results(store_location: str = DEFAULT_JOB_STORE, output_file: str = None, output_format: str = None) -> str:
+    """
+    Write every result in the job store to a CSV or Parquet file, one row per
+    enqueued record that is done or failed
+    Without a format, an output_file ending in .parquet is written as Parquet
+    """
+    store = open_job_store(store_location)
+    try:
+        final_df = pd.DataFrame(store.results(), columns=RESULT_COLUMNS)
+    finally:
+        store.close()
+    
+    if not output_file:
+        output_file = timestamped_path('linkedin_profiles_distributed', output_format or FORMAT_CSV)
+    write_table(final_df, output_file, output_format)
+    logger.info(f"Exported {len(final_df)} results to {output_file}")
+    return output_file
+
+def main():
+    """
+    Main function to run the multiprocess enricher
+
+    With no command, enriches the input file with a local worker pool. The other
+    commands run a distributed job: enqueue once, start `work` on every host,
+    and use `status` from anywhere to follow progress.
+    """
+    parser = argparse.ArgumentParser(description="LinkedIn enrichment with multiple workers")
+    parser.add_argument('--log-level', default=DEFAULT_LOG_LEVEL, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        type=str.upper, help="DEBUG adds per-selector extraction lines for a sample of records")
+    parser.add_argument('--log-sample', type=float, default=DEFAULT_DEBUG_SAMPLE_RATE,
+                        help="Fraction of records whose DEBUG lines are kept (1 = all)")
+    parser.add_argument('--log-file', help="Also write the log to this file")
+    parser.add_argument('--log-json', action='store_true', help="Write one JSON object per log line")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                        help="Format of the result files (default: csv; export also follows the --output extension)")
+    parser.add_argument('--record-timeout', type=float, default=DEFAULT_RECORD_TIMEOUT,
+                        help="Seconds each record gets for search, page loads and extraction before it is saved "
+                        "with what it has as timed_out (0 = no limit)")
+    parser.add_argument('--session-pool', help="Rotate the LinkedIn sessions stored in this pool (see "
+                        "linkedin_sessions.py) across the workers instead of logging in by hand")
+    parser.add_argument('--spare-drivers', type=int, default=DEFAULT_SPARE_DRIVERS,
+                        help="Browsers each worker keeps launched and logged in, so a crashed, blocked or recycled "
+                        "driver is replaced at once; each is another Chrome process per worker (default 0 = "
+                        "only warm one as a driver nears its recycle limit)")
+    parser.add_argument('--history', help="Add each run's results to the profile history in this directory "
+                        "(see linkedin_history.py)")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    run_parser = subparsers.add_parser('run', help="Enrich a file with a local worker pool (default)")
+    run_parser.add_argument('input_file', nargs='?', default=DEFAULT_INPUT_FILE)
+    run_parser.add_argument('--workers', type=int, default=4, help="Worker processes (the starting count with --adaptive)")
+    run_parser.add_argument('--archive', help="Save raw SERP and profile HTML to this directory")
+    run_parser.add_argument('--pipelined', action='store_true',
+                            help="Search for upcoming records on a second driver while profiles load")
+    run_parser.add_argument('--status-port', type=int, help="Serve live status as JSON on this local port")
+    run_parser.add_argument('--adaptive', action='store_true',
+                            help="Tune the worker count at runtime between --min-workers and --max-workers")
+    run_parser.add_argument('--min-workers', type=int, default=1)
+    run_parser.add_argument('--max-workers', type=int, default=8)
+    run_parser.add_argument('--adapt-interval', type=float, default=60,
+                            help="Seconds between worker count decisions")
+    run_parser.add_argument('--max-block-rate', type=float, default=0.05,
+                            help="Halve the workers when blocks per record exceed this")
+    run_parser.add_argument('--snippets', nargs='?', type=float, const=DEFAULT_SNIPPET_MAX_AGE_DAYS,
+                            metavar='DAYS', help="Fill title and company from Google snippets when they are unambiguous "
+                            "and visit the profile only otherwise; snippets older than DAYS count as stale")
+    run_parser.add_argument('--deadline', help="Start no record that wouldn't finish by this time (e.g. 09:00)")
+    run_parser.add_argument('--budget', help="Same as --deadline, as a duration from now (e.g. 90m, 2h30m)")
+    run_parser.add_argument('--priority', choices=PRIORITY_POLICIES,
+                            help="value: never-enriched, then stalest, then most input data first; file: input order "
+                            "(default: value with a deadline or budget, file otherwise)")
+    run_parser.add_argument('--match-confidence', type=float, default=DEFAULT_MATCH_CONFIDENCE,
+                            help="Reuse known profiles for rows whose name matches someone already enriched "
+                            "(nickname, initials, maiden name, email) at this confidence or above")
+    run_parser.add_argument('--profile', action='store_true',
+                            help="Profile workers and record browser timing; writes one report per run")
+    
+    pools_parser = subparsers.add_parser('pools', help="Enrich a file with separate search and profile pools")
+    pools_parser.add_argument('input_file')
+    pools_parser.add_argument('--search-workers', type=int, default=1)
+    pools_parser.add_argument('--search-rate', type=float, default=20, help="Google searches per minute across the pool")
+    pools_parser.add_argument('--search-attempts', type=int, default=3)
+    pools_parser.add_argument('--profile-workers', type=int, default=4)
+    pools_parser.add_argument('--profile-rate', type=float, default=60, help="Profile loads per minute across the pool")
+    pools_parser.add_argument('--profile-attempts', type=int, default=2)
+    pools_parser.add_argument('--archive', help="Save raw SERP and profile HTML to this directory")
+    pools_parser.add_argument('--status-port', type=int, help="Serve live status as JSON on this local port")
+    pools_parser.add_argument('--snippets', nargs='?', type=float, const=DEFAULT_SNIPPET_MAX_AGE_DAYS,
+                              metavar='DAYS', help="Fill title and company from Google snippets when they are unambiguous "
+                              "and visit the profile only otherwise; snippets older than DAYS count as stale")
+    pools_parser.add_argument('--match-confidence', type=float, default=DEFAULT_MATCH_CONFIDENCE,
+                              help="Reuse known profiles for rows whose name matches someone already enriched "
+                              "(nickname, initials, maiden name, email) at this confidence or above")
+    pools_parser.add_argument('--profile', action='store_true',
+                              help="Profile workers and record browser timing; writes one report per run")
+    
+    enqueue_parser = subparsers.add_parser('enqueue', help="Load a file into a shared job store")
+    enqueue_parser.add_argument('input_file')
+    enqueue_parser.add_argument('--store', default=DEFAULT_JOB_STORE,
+                                help="SQLite path or postgresql:// DSN")
+    enqueue_parser.add_argument('--match-confidence', type=float, default=DEFAULT_MATCH_CONFIDENCE,
+                                help="Reuse known profiles for rows whose name matches someone already enriched "
+                                "(nickname, initials, maiden name, email) at this confidence or above")
+    
+    work_parser = subparsers.add_parser('work', help="Run this host's workers against a job store")
+    work_parser.add_argument('--store', default=DEFAULT_JOB_STORE)
+    work_parser.add_argument('--workers', type=int, default=4)
+    work_parser.add_argument('--archive', help="Save raw SERP and profile HTML to this directory")
+    work_parser.add_argument('--status-port', type=int, help="Serve live status as JSON on this local port")
+    work_parser.add_argument('--profile', action='store_true',
+                             help="Profile workers and record browser timing; writes one report per run")
+    
+    refresh_parser = subparsers.add_parser('refresh', help="Re-enrich only new, stale or incomplete rows of an export")
+    refresh_parser.add_argument('previous_file', help="Previous enriched output (CSV)")
+    refresh_parser.add_argument('export_file', help="New export to refresh against")
+    refresh_parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                                help="Re-enrich rows last enriched longer ago than this")
+    refresh_parser.add_argument('--workers', type=int, default=4)
+    refresh_parser.add_argument('--archive', help="Save raw SERP and profile HTML to this directory")
+    refresh_parser.add_argument('--pipelined', action='store_true',
+                                help="Search for upcoming records on a second driver while profiles load")
+    refresh_parser.add_argument('--status-port', type=int, help="Serve live status as JSON on this local port")
+    refresh_parser.add_argument('--snippets', nargs='?', type=float, const=DEFAULT_SNIPPET_MAX_AGE_DAYS,
+                                metavar='DAYS', help="Fill title and company from Google snippets when they are unambiguous "
+                                "and visit the profile only otherwise; snippets older than DAYS count as stale")
+    refresh_parser.add_argument('--profile', action='store_true',
+                                help="Profile workers and record browser timing; writes one report per run")
+    
+    loadtest_parser = subparsers.add_parser('loadtest', help="Measure throughput against a fake in-memory browser")
+    loadtest_parser.add_argument('--records', type=int, default=1000)
+    loadtest_parser.add_argument('--workers', type=int, default=4)
+    loadtest_parser.add_argument('--pipelined', action='store_true')
+    loadtest_parser.add_argument('--fixtures', help="Directory of profile .html files to serve (default: generated pages)")
+    loadtest_parser.add_argument('--serp-latency', type=float, default=0.05, help="Seconds per Google page load")
+    loadtest_parser.add_argument('--profile-latency', type=float, default=0.1, help="Seconds per profile page load")
+    loadtest_parser.add_argument('--block-rate', type=float, default=0.0, help="Fraction of page loads that are blocked")
+    loadtest_parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of page loads that time out")
+    loadtest_parser.add_argument('--crash-rate', type=float, default=0.0, help="Fraction of page loads that crash the browser")
+    loadtest_parser.add_argument('--hang-rate', type=float, default=0.0,
+                                 help="Fraction of page loads that hang for --hang-seconds")
+    loadtest_parser.add_argument('--hang-seconds', type=float, default=30.0)
+    loadtest_parser.add_argument('--launch-latency', type=float, default=0.0,
+                                 help="Seconds each browser takes to start")
+    loadtest_parser.add_argument('--sessions', type=int, default=0,
+                                 help="Require LinkedIn sessions from a stand-in and rotate this many across the workers")
+    loadtest_parser.add_argument('--session-limit', type=int,
+                                 help="Profile loads each session gets per --session-window before it is throttled")
+    loadtest_parser.add_argument('--session-window', type=float, default=60)
+    loadtest_parser.add_argument('--wait-scale', type=float, default=0.0,
+                                 help="Multiplier for fixed page-settle and backoff waits (1 = real delays)")
+    loadtest_parser.add_argument('--adaptive', action='store_true',
+                                 help="Tune the worker count at runtime between --min-workers and --max-workers")
+    loadtest_parser.add_argument('--min-workers', type=int, default=1)
+    loadtest_parser.add_argument('--max-workers', type=int, default=8)
+    loadtest_parser.add_argument('--adapt-interval', type=float, default=60,
+                                 help="Seconds between worker count decisions")
+    loadtest_parser.add_argument('--max-block-rate', type=float, default=0.05,
+                                 help="Halve the workers when blocks per record exceed this")
+    loadtest_parser.add_argument('--snippets', nargs='?', type=float, const=DEFAULT_SNIPPET_MAX_AGE_DAYS,
+                                 metavar='DAYS', help="Fill title and company from Google snippets when they are unambiguous "
+                                 "and visit the profile only otherwise; snippets older than DAYS count as stale")
+    loadtest_parser.add_argument('--profile', action='store_true',
+                                 help="Profile workers and record browser timing; writes one report per run")
+    
+    status_parser = subparsers.add_parser('status', help="Report overall progress of a job store")
+    status_parser.add_argument('--store', default=DEFAULT_JOB_STORE)
+    status_parser.add_argument('--watch', type=float, default=0, help="Repeat every N seconds")
+    
+    export_parser = subparsers.add_parser('export', help="Write completed results to CSV or Parquet")
+    export_parser.add_argument('--store', default=DEFAULT_JOB_STORE)
+    export_parser.add_argument('--output')
+    
+    args = parser.parse_args()
+    
+    # A deadline or budget turns on priority scheduling unless a policy is given
+    deadline = parse_deadline(getattr(args, 'deadline', None), getattr(args, 'budget', None))
+    priority = getattr(args, 'priority', None) or (PRIORITY_VALUE if deadline is not None else PRIORITY_FILE)
+    output_format = args.output_format or FORMAT_CSV
+    record_timeout = args.record_timeout or None
+    
+    # Every worker sends its log lines through a queue to one writer process
+    start_logging(args.log_level, args.log_sample, args.log_file, args.log_json)
+    
+    # Profile this coordinator process too; workers write their own profiles to the same directory
+    profile_dir = None
+    if getattr(args, 'profile', False):
+        profile_dir = f"linkedin_profile_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}"
+        coordinator_profiler = WorkerProfiler(profile_dir, 'coordinator').start()
+    
+    results_file = None
+    if args.command == 'enqueue':
+        enqueue_input(args.input_file, args.store, args.match_confidence)
+    elif args.command == 'work':
+        run_distributed_workers(args.store, args.workers, args.archive, args.status_port, profile_dir, record_timeout,
+                                args.session_pool, args.spare_drivers)
+    elif args.command == 'status':
+        print_progress(args.store)
+        while args.watch:
+            time.sleep(args.watch)
+            print_progress(args.store)
+    elif args.command == 'export':
+        results_file = export_results(args.store, args.output, args.output_format)
+    elif args.command == 'pools':
+        search_stage = StagePool('search', args.search_workers, args.search_rate, RetryPolicy(args.search_attempts))
+        profile_stage = StagePool('profile', args.profile_workers, args.profile_rate, RetryPolicy(args.profile_attempts))
+        results_file = run_split_pools(args.input_file, search_stage, profile_stage, args.archive, args.status_port,
+                                       profile_dir, args.snippets, args.match_confidence, output_format,
+                                       record_timeout, args.session_pool, args.spare_drivers)
+    elif args.command == 'refresh':
+        refreshed = run_refresh(args.previous_file, args.export_file, args.max_age_days, args.workers, args.archive,
+                                args.pipelined, args.status_port, profile_dir, snippet_max_age_days=args.snippets,
+                                output_format=output_format, record_timeout=record_timeout,
+                                session_pool=args.session_pool, spare_drivers=args.spare_drivers)
+        results_file = refreshed[0] if refreshed else None
+    elif args.command == 'loadtest':
+        backend = FakeBackend(args.fixtures, args.serp_latency, args.profile_latency, block_rate=args.block_rate,
+                              error_rate=args.error_rate, wait_scale=args.wait_scale, crash_rate=args.crash_rate,
+                              hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+                              launch_latency=args.launch_latency)
+        controller = (AIMDController(args.min_workers, args.max_workers, args.workers, max_block_rate=args.max_block_rate)
+                      if args.adaptive else None)
+        run_load_test(args.records, args.workers, args.pipelined, backend, profile_dir=profile_dir,
+                      snippet_max_age_days=args.snippets, controller=controller, interval=args.adapt_interval,
+                      record_timeout=record_timeout, sessions=args.sessions, session_limit=args.session_limit,
+                      session_window=args.session_window, spare_drivers=args.spare_drivers)
+    elif args.command == 'run' and args.adaptive:
+        controller = AIMDController(args.min_workers, args.max_workers, args.workers, max_block_rate=args.max_block_rate)
+        results_file = run_adaptive(args.input_file, controller, args.adapt_interval, args.archive,
+                                    args.status_port, profile_dir, snippet_max_age_days=args.snippets, match_confidence=args.match_confidence,
+                                    deadline=deadline, priority=priority, output_format=output_format,
+                                    record_timeout=record_timeout, session_pool=args.session_pool,
+                                    spare_drivers=args.spare_drivers)
+    elif args.command == 'run':
+        results_file = run_local(args.input_file, args.workers, args.archive, args.pipelined, args.status_port,
+                                 profile_dir, snippet_max_age_days=args.snippets,
+                                 match_confidence=args.match_confidence, deadline=deadline, priority=priority,
+                                 output_format=output_format, record_timeout=record_timeout,
+                                 session_pool=args.session_pool, spare_drivers=args.spare_drivers)
+    else:
+        results_file = run_local(output_format=output_format, record_timeout=record_timeout,
+                                 session_pool=args.session_pool, spare_drivers=args.spare_drivers)
+    
+    # Keep a version of every profile whose fields changed since the history last saw it
+    if args.history and results_file:
+        append_history(results_file, args.history)
+    
+    if profile_dir:
+        coordinator_profiler.save()
+        print(build_report(profile_dir))
 
 if __name__ == "__main__":
     main()
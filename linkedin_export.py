@@ -0,0 +1,110 @@
+import logging
+import pandas as pd
+from typing import Dict, Optional
+from linkedin_cache import normalize_columns
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+OUTPUT_FORMATS = [FORMAT_CSV, FORMAT_PARQUET]
+
+# Columns of the complete-profiles export and the result column each one comes from
+PROFILE_EXPORT_COLUMNS = {
+    'email': 'Email',
+    'linkedin_url': 'linkedin_url',
+    'additional_linkedin_urls': 'additional_linkedin_urls',
+    'company': 'current_company',
+    'job_title': 'current_title',
+    'description': 'description'
+}
+
+
+def timestamped_path(prefix: str, output_format: str = FORMAT_CSV) -> str:
+    """
+    Output file name like linkedin_profiles_multiprocess_20240501_093000.csv
+    """
+    return f"{prefix}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """
+    Load a CSV, Parquet or Excel file
+    """
+    lower_path = path.lower()
+    if lower_path.endswith('.csv'):
+        return pd.read_csv(path)
+    if lower_path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+
+def write_table(df: pd.DataFrame, output_file: str, output_format: str = None) -> str:
+    """
+    Write df as CSV or Parquet; the format defaults to the file's extension
+    """
+    output_format = output_format or (FORMAT_PARQUET if output_file.lower().endswith('.parquet') else FORMAT_CSV)
+    if output_format == FORMAT_PARQUET:
+        # Parquet needs one type per column; input columns can mix numbers and text
+        df = df.copy()
+        for column in df.columns[df.dtypes == object]:
+            values = df[column]
+            df[column] = values.where(values.isna(), values.astype(str))
+        df.to_parquet(output_file, index=False)
+    else:
+        df.to_csv(output_file, index=False)
+    return output_file
+
+
+def found_mask(df: pd.DataFrame) -> pd.Series:
+    """
+    Rows with a LinkedIn URL; blanks, NaN and 'nan' strings all count as missing
+    """
+    return normalize_columns(df, ['linkedin_url'])['linkedin_url'] != ''
+
+
+def summarize(df: pd.DataFrame) -> Dict[str, float]:
+    """
+    Record count, profiles found and success rate of an enriched frame
+    """
+    total = len(df)
+    found = int(found_mask(df).sum()) if total else 0
+    return {'total': total, 'found': found, 'success_rate': found / total * 100 if total else 0.0}
+
+
+def print_summary(df: pd.DataFrame, output_file: str = None):
+    summary = summarize(df)
+    print(f"\n=== ENRICHMENT SUMMARY ===")
+    print(f"Total records processed: {summary['total']}")
+    print(f"LinkedIn profiles found: {summary['found']}")
+    print(f"Success rate: {summary['success_rate']:.1f}%")
+    if output_file:
+        print(f"Results saved to: {output_file}")
+
+
+def found_profile_lines(df: pd.DataFrame) -> pd.Series:
+    """
+    "First Last: URL" for every row with a LinkedIn URL
+    """
+    found = normalize_columns(df[found_mask(df)], ['first_name', 'last_name', 'linkedin_url'])
+    return found['first_name'] + ' ' + found['last_name'] + ': ' + found['linkedin_url']
+
+
+def export_profiles(df: pd.DataFrame, output_file: str = None, output_format: str = FORMAT_CSV) -> Optional[str]:
+    """
+    Write the rows with a LinkedIn URL as email, linkedin_url, additional_linkedin_urls,
+    company, job_title and description, cleaned column by column
+    Returns the file written, or None if no row has a URL
+    """
+    cleaned = normalize_columns(df, list(PROFILE_EXPORT_COLUMNS.values()))
+    cleaned.columns = list(PROFILE_EXPORT_COLUMNS)
+    cleaned = cleaned[cleaned['linkedin_url'] != '']
+    if cleaned.empty:
+        logger.warning("No LinkedIn URLs found to save")
+        return None
+
+    output_file = output_file or timestamped_path('linkedin_profiles_complete', output_format)
+    write_table(cleaned, output_file, output_format)
+    logger.info(f"Saved {len(cleaned)} complete LinkedIn profiles to {output_file}")
+    return output_file
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import pandas as pd
+from typing import Dict, List, Optional
+from linkedin_browser import FakeBackend, FakeDriver
+from linkedin_profile_scraper import LinkedInProfileScraper, parse_profile_html, format_education
+from linkedin_serp import parse_serp_html, parse_snippet
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_DIR = "extraction_corpus"
+DEFAULT_BASELINE = os.path.join(DEFAULT_CORPUS_DIR, "baseline.json")
+
+# Timed runs per case; the median is reported so one slow run doesn't count
+DEFAULT_REPEATS = 5
+
+KIND_PROFILE = 'profile'
+KIND_SERP = 'serp'
+
+# LinkedInProfileScraper driving a browser through its WebDriver selectors
+STRATEGY_WEBDRIVER = 'webdriver'
+# parse_profile_html over the page source, as used for archive re-extraction
+STRATEGY_SNAPSHOT = 'snapshot'
+# parse_serp_html and parse_snippet over a Google results page
+STRATEGY_SERP = 'serp'
+STRATEGIES = [STRATEGY_WEBDRIVER, STRATEGY_SNAPSHOT, STRATEGY_SERP]
+
+# Experience entry keys compared; is_current follows from dates
+EXPERIENCE_KEYS = ['title', 'company', 'dates', 'location']
+
+
+class CorpusDriver(FakeDriver):
+    """
+    Fake driver that serves one saved page for every URL, so the WebDriver code
+    path runs against corpus HTML without a browser
+    """
+    def __init__(self, html: str):
+        super().__init__(FakeBackend(wait_scale=0.0))
+        self.html = html
+
+    def get(self, url: str):
+        self._serve(url, self.html)
+
+
+def load_corpus(corpus_dir: str = DEFAULT_CORPUS_DIR) -> Dict:
+    """
+    Corpus manifest with each case's HTML loaded into case['html']
+    """
+    with open(os.path.join(corpus_dir, 'manifest.json'), encoding='utf-8') as f:
+        corpus = json.load(f)
+    for case in corpus['cases']:
+        with open(os.path.join(corpus_dir, case['file']), encoding='utf-8') as f:
+            case['html'] = f.read()
+    return corpus
+
+
+def _extract_webdriver(case: Dict) -> Dict:
+    scraper = LinkedInProfileScraper(CorpusDriver(case['html']))
+    return scraper.extract_profile_info(case['url'])
+
+
+def _extract_snapshot(case: Dict) -> Dict:
+    return parse_profile_html(case['html'], case['url'])
+
+
+def _extract_serp(case: Dict) -> Dict:
+    results = parse_serp_html(case['html'])
+    fields, reason = None, 'no results'
+    if results:
+        now = pd.Timestamp(case['as_of']) if case.get('as_of') else None
+        fields, reason = parse_snippet(results[0], case['first_name'], case['last_name'], now=now)
+    extracted = {'urls': [result['url'] for result in results], 'reason': reason}
+    extracted.update(fields or {})
+    return extracted
+
+
+# Kind of case each strategy runs on, and the function that runs it
+EXTRACTORS = {
+    STRATEGY_WEBDRIVER: (KIND_PROFILE, _extract_webdriver),
+    STRATEGY_SNAPSHOT: (KIND_PROFILE, _extract_snapshot),
+    STRATEGY_SERP: (KIND_SERP, _extract_serp)
+}
+
+
+def _comparable(field: str, value):
+    """
+    Extracted or expected value in the form the corpus compares on
+    """
+    if field == 'education' and isinstance(value, list):
+        return format_education(value)
+    if field == 'experience':
+        return [{key: ' '.join(str(entry.get(key, '')).split()) for key in EXPERIENCE_KEYS} for entry in value or []]
+    if field == 'urls':
+        return list(value or [])
+    return ' '.join(str(value or '').split())
+
+
+def score_case(expected: Dict, extracted: Dict) -> Dict[str, bool]:
+    """
+    Whether each expected field was extracted exactly
+    """
+    return {field: _comparable(field, extracted.get(field)) == _comparable(field, value)
+            for field, value in expected.items()}
+
+
+def run_strategy(strategy: str, cases: List[Dict], repeats: int = DEFAULT_REPEATS) -> Dict:
+    """
+    Field accuracy and per-case extraction time of one strategy over the cases it applies to
+    """
+    kind, extract = EXTRACTORS[strategy]
+    field_scores = {}
+    timings = []
+    per_case = {}
+    for case in cases:
+        if case['kind'] != kind:
+            continue
+        extracted = extract(case)
+        seconds = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            extract(case)
+            seconds.append(time.perf_counter() - start_time)
+        case_ms = statistics.median(seconds) * 1000
+        timings.append(case_ms)
+
+        scores = score_case(case['expected'], extracted)
+        for field, correct in scores.items():
+            field_scores.setdefault(field, []).append(correct)
+        per_case[case['id']] = {
+            'ms': round(case_ms, 3),
+            'mismatches': {field: {'expected': _comparable(field, case['expected'][field]),
+                                   'extracted': _comparable(field, extracted.get(field))}
+                           for field, correct in scores.items() if not correct}
+        }
+
+    return {
+        'cases': len(per_case),
+        'fields': {field: round(sum(scores) / len(scores), 4) for field, scores in field_scores.items()},
+        'median_ms': round(statistics.median(timings), 3) if timings else None,
+        'max_ms': round(max(timings), 3) if timings else None,
+        'per_case': per_case
+    }
+
+
+def run_benchmark(corpus_dir: str = DEFAULT_CORPUS_DIR, strategies: List[str] = None,
+                  repeats: int = DEFAULT_REPEATS) -> Dict:
+    """
+    Run every strategy over the corpus
+    """
+    corpus = load_corpus(corpus_dir)
+    report = {'corpus_version': corpus['version'], 'strategies': {}}
+    for strategy in strategies or STRATEGIES:
+        report['strategies'][strategy] = run_strategy(strategy, corpus['cases'], repeats)
+    return report
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, max_slowdown: Optional[float] = None) -> List[str]:
+    """
+    Regressions of report against baseline: any field less accurate than before and,
+    with max_slowdown, a median time more than that fraction slower
+    """
+    if report['corpus_version'] != baseline.get('corpus_version'):
+        return [f"baseline is for corpus version {baseline.get('corpus_version')}, "
+                f"corpus is version {report['corpus_version']}: save a new baseline"]
+
+    regressions = []
+    for strategy, result in report['strategies'].items():
+        previous = baseline.get('strategies', {}).get(strategy)
+        if not previous:
+            continue
+        for field, accuracy in result['fields'].items():
+            before = previous['fields'].get(field)
+            if before is not None and accuracy < before:
+                regressions.append(f"{strategy}.{field}: accuracy {before:.0%} -> {accuracy:.0%}")
+        if max_slowdown is not None and previous.get('median_ms') and result['median_ms']:
+            if result['median_ms'] > previous['median_ms'] * (1 + max_slowdown):
+                regressions.append(f"{strategy}: median {previous['median_ms']:.1f}ms -> {result['median_ms']:.1f}ms "
+                                   f"(more than {max_slowdown:.0%} slower)")
+    return regressions
+
+
+def print_report(report: Dict, verbose: bool = False):
+    print(f"\n=== EXTRACTION BENCHMARK (corpus v{report['corpus_version']}) ===")
+    for strategy, result in report['strategies'].items():
+        print(f"\n{strategy}: {result['cases']} cases, median {result['median_ms']}ms, max {result['max_ms']}ms per page")
+        for field, accuracy in result['fields'].items():
+            print(f"  {field:<20} {accuracy:6.0%}")
+        for case_id, case in result['per_case'].items():
+            print(f"  {case_id:<28} {case['ms']:8.2f}ms  {len(case['mismatches'])} fields wrong")
+            if verbose:
+                for field, values in case['mismatches'].items():
+                    print(f"      {field}: expected {values['expected']!r}, got {values['extracted']!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline extraction accuracy and speed check against the saved corpus")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="Corpus directory with manifest.json")
+    parser.add_argument("--strategy", action="append", choices=STRATEGIES,
+                        help="Strategy to run, repeatable (default: all)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Timed runs per case")
+    parser.add_argument("--output", help="Write the full report to this JSON file")
+    parser.add_argument("--baseline", help="Fail if any field is less accurate than in this report")
+    parser.add_argument("--max-slowdown", type=float, default=None,
+                        help="With --baseline, also fail if a strategy's median time grows by more than this fraction")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write the report to {DEFAULT_BASELINE}")
+    parser.add_argument("--verbose", action="store_true", help="Show expected and extracted values of wrong fields")
+    args = parser.parse_args()
+
+    # The scrapers log a warning for every field they can't find
+    logging.getLogger('linkedin_profile_scraper').setLevel(logging.ERROR)
+
+    report = run_benchmark(args.corpus, args.strategy, args.repeats)
+    print_report(report, args.verbose)
+
+    for path in [args.output, DEFAULT_BASELINE if args.save_baseline else None]:
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"\nReport saved to: {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.max_slowdown)
+        if regressions:
+            print("\n=== REGRESSIONS ===")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
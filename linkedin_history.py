@@ -0,0 +1,380 @@
+import os
+import json
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from linkedin_cache import canonical_profile_url, normalize_columns
+from linkedin_export import read_table, write_table
+
+try:
+    import pyarrow.dataset as ds
+except ImportError:  # The history store is Parquet and needs pyarrow
+    ds = None
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DIR = "linkedin_history"
+
+# Profile fields the history versions; a new version is stored only when one of them changes
+HISTORY_FIELDS = [
+    'current_title', 'current_company', 'description', 'location_linkedin', 'industry_linkedin',
+    'education', 'experience'
+]
+
+# Result rows with these statuses have no profile fields to record
+SKIPPED_STATUSES = ['not_found', 'blocked']
+
+# Columns of every version row, sorted by linkedin_url within each part file
+VERSION_COLUMNS = (['linkedin_url', 'enriched_at', 'version', 'changed_fields', 'previous_values',
+                    'email', 'first_name', 'last_name'] + HISTORY_FIELDS)
+
+# Columns of the latest-version index, one row per profile
+LATEST_COLUMNS = (['linkedin_url', 'version', 'first_seen_at', 'enriched_at', 'checked_at',
+                   'email', 'first_name', 'last_name'] + HISTORY_FIELDS)
+
+EMAIL_COLUMNS = ['email', 'linkedin_url', 'checked_at']
+
+# Rows per Parquet row group; files are sorted by URL, so a URL lookup only reads the groups
+# whose min/max range covers it
+ROW_GROUP_SIZE = 10000
+
+PARTS_DIR = 'parts'
+MANIFEST_FILE = 'manifest.json'
+LATEST_FILE = 'latest.parquet'
+EMAILS_FILE = 'emails.parquet'
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    """
+    Write df as zstd-compressed Parquet, replacing path only once the file is complete
+    """
+    temp_path = f"{path}.tmp"
+    df.to_parquet(temp_path, index=False, compression='zstd', row_group_size=ROW_GROUP_SIZE)
+    os.replace(temp_path, path)
+
+
+def history_rows(results: pd.DataFrame, now: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    Canonical URL, enrichment time, email, name and history fields of every result
+    row that found a profile, with missing values as ''
+    Rows without a last_enriched_at are taken as enriched now
+    """
+    normalized = normalize_columns(results, ['Email', 'first_name', 'last_name', 'linkedin_url',
+                                             'enrichment_status'] + HISTORY_FIELDS)
+    unique_urls = normalized['linkedin_url'].astype(object).unique()
+    urls = normalized['linkedin_url'].astype(object).map(dict(zip(unique_urls, map(canonical_profile_url, unique_urls))))
+    enriched_at = (pd.to_datetime(results['last_enriched_at'], errors='coerce') if 'last_enriched_at' in results.columns
+                   else pd.Series(pd.NaT, index=results.index))
+
+    rows = pd.DataFrame({
+        'linkedin_url': urls,
+        'enriched_at': enriched_at.fillna(now or pd.Timestamp.now().floor('s')),
+        'email': normalized['Email'].str.lower().astype(object),
+        'first_name': normalized['first_name'].astype(object),
+        'last_name': normalized['last_name'].astype(object)
+    }, index=results.index)
+    for field in HISTORY_FIELDS:
+        rows[field] = normalized[field].astype(object)
+
+    has_fields = (rows[HISTORY_FIELDS] != '').any(axis=1)
+    keep = (rows['linkedin_url'] != '') & ~normalized['enrichment_status'].isin(SKIPPED_STATUSES) & has_fields
+    return rows[keep]
+
+
+class ProfileHistory:
+    """
+    Append-only history of enriched profiles in a directory of Parquet files
+    Each append writes one part file holding a version for every profile that is
+    new or has a changed field; unchanged profiles only move their checked_at
+    manifest.json keeps each part's enrichment time range so time queries skip
+    older parts, and latest.parquet and emails.parquet index the current version
+    of every profile by URL and by email
+    """
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        if ds is None:
+            raise ImportError("The profile history needs pyarrow (pip install pyarrow)")
+        self.root = root
+        os.makedirs(os.path.join(root, PARTS_DIR), exist_ok=True)
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        self.latest_path = os.path.join(root, LATEST_FILE)
+        self.emails_path = os.path.join(root, EMAILS_FILE)
+        self.manifest = {'parts': []}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self):
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def _read(self, path: str, columns: List[str], expression=None) -> pd.DataFrame:
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns)
+        return ds.dataset(path, format='parquet').to_table(columns=columns, filter=expression).to_pandas()
+
+    def _part_paths(self, since: pd.Timestamp = None, until: pd.Timestamp = None) -> List[str]:
+        """
+        Part files with versions enriched in [since, until)
+        """
+        paths = []
+        for part in self.manifest['parts']:
+            if since is not None and pd.Timestamp(part['max_enriched_at']) < since:
+                continue
+            if until is not None and pd.Timestamp(part['min_enriched_at']) >= until:
+                continue
+            paths.append(os.path.join(self.root, PARTS_DIR, part['file']))
+        return paths
+
+    def _read_versions(self, paths: List[str], expression=None, columns: List[str] = None) -> pd.DataFrame:
+        columns = columns or VERSION_COLUMNS
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        return ds.dataset(paths, format='parquet').to_table(columns=columns, filter=expression).to_pandas()
+
+    def latest(self, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Current version of every profile
+        """
+        return self._read(self.latest_path, columns or LATEST_COLUMNS)
+
+    def append(self, results: pd.DataFrame) -> Dict[str, int]:
+        """
+        Record a frame of enrichment results
+        A field left blank in a result keeps its previous value, since a page that
+        timed out or a selector that missed says nothing about the profile; results
+        no newer than what the history already saw for a profile are skipped
+        Returns counts of new, changed, unchanged and skipped profiles
+        """
+        rows = history_rows(results)
+        # Several rows can find the same profile (two emails); the newest result wins
+        rows = rows.sort_values('enriched_at', kind='stable')
+        emails = rows.loc[rows['email'] != '', ['email', 'linkedin_url', 'enriched_at']]
+        rows = rows.drop_duplicates('linkedin_url', keep='last').set_index('linkedin_url')
+
+        latest = self.latest().set_index('linkedin_url')
+        previous = latest.reindex(rows.index)
+        known = previous['version'].notna()
+        stale = known & (rows['enriched_at'] <= pd.to_datetime(previous['checked_at']))
+        rows, previous, known = rows[~stale], previous[~stale], known[~stale]
+
+        changed = pd.DataFrame(index=rows.index)
+        for field in HISTORY_FIELDS:
+            old = previous[field].fillna('').astype(object)
+            rows[field] = rows[field].where(rows[field] != '', old)
+            changed[field] = known & (rows[field] != old)
+        versioned = ~known | changed.any(axis=1)
+
+        changed_fields = pd.Series('', index=rows.index, dtype=object)
+        for field in HISTORY_FIELDS:
+            changed_fields = changed_fields + np.where(changed[field], f"{field}; ", '')
+        changed_fields = changed_fields.str[:-2]
+
+        versions = rows[versioned].copy()
+        versions['version'] = (previous.loc[versioned, 'version'].fillna(0) + 1).astype('int64')
+        versions['changed_fields'] = changed_fields[versioned]
+        versions['previous_values'] = [
+            json.dumps({field: previous.at[url, field] for field in fields.split('; ')}, ensure_ascii=False)
+            if fields else ''
+            for url, fields in changed_fields[versioned].items()
+        ]
+        versions = versions.reset_index().sort_values('linkedin_url')[VERSION_COLUMNS]
+
+        counts = {'new': int((~known).sum()), 'changed': int((known & versioned).sum()),
+                  'unchanged': int((known & ~versioned).sum()), 'skipped': int(stale.sum())}
+
+        if not versions.empty:
+            part_file = f"part-{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet"
+            _write_parquet(versions, os.path.join(self.root, PARTS_DIR, part_file))
+            self.manifest['parts'].append({
+                'file': part_file,
+                'rows': len(versions),
+                'min_enriched_at': str(versions['enriched_at'].min()),
+                'max_enriched_at': str(versions['enriched_at'].max())
+            })
+            self._save_manifest()
+
+        if not rows.empty:
+            current = rows.copy()
+            current['checked_at'] = current['enriched_at']
+            current['version'] = previous['version'].where(~versioned, previous['version'].fillna(0) + 1).astype('int64')
+            current['first_seen_at'] = pd.to_datetime(previous['first_seen_at']).fillna(current['enriched_at'])
+            # An unchanged profile keeps the time its current version was recorded
+            current['enriched_at'] = current['enriched_at'].where(versioned, pd.to_datetime(previous['enriched_at']))
+            latest = latest.drop(current.index, errors='ignore')
+            latest = pd.concat([latest, current]) if not latest.empty else current
+            _write_parquet(latest.sort_index().rename_axis('linkedin_url').reset_index()[LATEST_COLUMNS],
+                           self.latest_path)
+
+            stale_urls = set(stale[stale].index)
+            emails = emails[~emails['linkedin_url'].isin(stale_urls)].rename(columns={'enriched_at': 'checked_at'})
+            email_index = self._read(self.emails_path, EMAIL_COLUMNS)
+            email_index = pd.concat([email_index, emails[EMAIL_COLUMNS]]) if not email_index.empty else emails[EMAIL_COLUMNS]
+            email_index = email_index.drop_duplicates('email', keep='last').sort_values('email')
+            _write_parquet(email_index, self.emails_path)
+
+        logger.info(f"History: {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+                    f"{counts['skipped']} already recorded")
+        return counts
+
+    def changes(self, field: str = None, since=None, until=None) -> pd.DataFrame:
+        """
+        Versions that changed an already known profile, enriched in [since, until),
+        optionally only those that changed field; with a field, previous_<field>
+        holds its value before the change
+        """
+        since = pd.Timestamp(since) if since is not None else None
+        until = pd.Timestamp(until) if until is not None else None
+        expression = ds.field('version') > 1
+        if since is not None:
+            expression = expression & (ds.field('enriched_at') >= since)
+        if until is not None:
+            expression = expression & (ds.field('enriched_at') < until)
+        versions = self._read_versions(self._part_paths(since, until), expression)
+
+        if field:
+            changed = versions['changed_fields'].fillna('').str.split('; ').map(lambda fields: field in fields)
+            versions = versions[changed.astype(bool)].copy()
+            versions.insert(versions.columns.get_loc(field), f"previous_{field}",
+                            versions['previous_values'].map(lambda values: json.loads(values).get(field, '')))
+        return versions.sort_values(['enriched_at', 'linkedin_url']).reset_index(drop=True)
+
+    def versions(self, urls: List[str]) -> pd.DataFrame:
+        """
+        Every recorded version of the given profiles, oldest first
+        """
+        urls = [canonical_profile_url(url) or url for url in urls]
+        versions = self._read_versions(self._part_paths(), ds.field('linkedin_url').isin(urls))
+        return versions.sort_values(['linkedin_url', 'version']).reset_index(drop=True)
+
+    def latest_for_emails(self, emails: List[str], fields: List[str] = None) -> pd.DataFrame:
+        """
+        Current linkedin_url and fields for each email, in the order given; emails
+        the history doesn't know get blanks
+        """
+        emails = pd.Series(emails, dtype=object).fillna('').astype(str).str.strip().str.lower()
+        fields = fields or HISTORY_FIELDS
+        unique_emails = [email for email in emails.unique() if email]
+        index = self._read(self.emails_path, ['email', 'linkedin_url'], ds.field('email').isin(unique_emails))
+        urls = list(index['linkedin_url'].unique())
+        latest = self._read(self.latest_path, ['linkedin_url', 'enriched_at', 'checked_at'] + fields,
+                            ds.field('linkedin_url').isin(urls))
+
+        found = index.merge(latest, on='linkedin_url', how='left')
+        result = pd.DataFrame({'email': emails}).merge(found, on='email', how='left')
+        return result[['email', 'linkedin_url', 'enriched_at', 'checked_at'] + fields]
+
+    def rebuild(self) -> int:
+        """
+        Recreate latest.parquet and emails.parquet from the part files, e.g. after an
+        append was interrupted; checked_at falls back to each version's enrichment time
+        Returns the number of profiles
+        """
+        versions = self._read_versions(self._part_paths()).sort_values(['linkedin_url', 'version'])
+        first_seen = versions.groupby('linkedin_url')['enriched_at'].min()
+        latest = versions.drop_duplicates('linkedin_url', keep='last').set_index('linkedin_url')
+        latest['first_seen_at'] = first_seen
+        latest['checked_at'] = latest['enriched_at']
+        _write_parquet(latest.reset_index()[LATEST_COLUMNS], self.latest_path)
+
+        emails = versions[versions['email'] != ''].sort_values('enriched_at', kind='stable')
+        emails = emails.rename(columns={'enriched_at': 'checked_at'}).drop_duplicates('email', keep='last')
+        _write_parquet(emails.sort_values('email')[EMAIL_COLUMNS], self.emails_path)
+        logger.info(f"Rebuilt the history index: {len(latest)} profiles from {len(self.manifest['parts'])} parts")
+        return len(latest)
+
+    def stats(self) -> Dict[str, float]:
+        paths = [self.latest_path, self.emails_path] + self._part_paths()
+        return {
+            'profiles': len(self.latest(['linkedin_url'])),
+            'versions': sum(part['rows'] for part in self.manifest['parts']),
+            'parts': len(self.manifest['parts']),
+            'size_mb': sum(os.path.getsize(path) for path in paths if os.path.exists(path)) / (1024 * 1024)
+        }
+
+
+def append_history(results_file: str, history_dir: str = DEFAULT_HISTORY_DIR) -> Dict[str, int]:
+    """
+    Add a result file (CSV, Parquet or Excel) to the history
+    """
+    return ProfileHistory(history_dir).append(read_table(results_file))
+
+
+def _latest_enriched_at(path: str) -> pd.Timestamp:
+    results = read_table(path)
+    if 'last_enriched_at' not in results.columns:
+        return pd.Timestamp.min
+    latest = pd.to_datetime(results['last_enriched_at'], errors='coerce').max()
+    return pd.Timestamp.min if pd.isna(latest) else latest
+
+
+def _show(df: pd.DataFrame, output_file: str = None, columns: List[str] = None):
+    if output_file:
+        write_table(df, output_file)
+        print(f"{len(df)} rows saved to: {output_file}")
+        return
+    with pd.option_context('display.max_rows', 50, 'display.max_columns', None, 'display.width', 250,
+                           'display.max_colwidth', 40):
+        print(df[columns] if columns else df)
+    print(f"{len(df)} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and maintain the history of enriched profiles")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_DIR, help="History directory")
+    subparsers = parser.add_subparsers(dest='command')
+
+    append_parser = subparsers.add_parser('append', help="Add result files, oldest first")
+    append_parser.add_argument('files', nargs='+')
+
+    changes_parser = subparsers.add_parser('changes', help="Profiles that changed, optionally one field since a date")
+    changes_parser.add_argument('--field', choices=HISTORY_FIELDS)
+    changes_parser.add_argument('--since', help="Date or time, e.g. 2024-05-01")
+    changes_parser.add_argument('--until')
+    changes_parser.add_argument('--output', help="Write the rows to a CSV or Parquet file")
+
+    latest_parser = subparsers.add_parser('latest', help="Current fields for the emails in a file")
+    latest_parser.add_argument('emails_file', help="CSV, Parquet or Excel file with an Email column")
+    latest_parser.add_argument('--field', action='append', choices=HISTORY_FIELDS,
+                               help="Field to return, repeatable (default: all)")
+    latest_parser.add_argument('--output')
+
+    show_parser = subparsers.add_parser('show', help="Every version of one or more profiles")
+    show_parser.add_argument('urls', nargs='+')
+
+    subparsers.add_parser('rebuild', help="Recreate the latest and email indexes from the part files")
+    subparsers.add_parser('stats', help="Profiles, versions and size on disk")
+    args = parser.parse_args()
+
+    history = ProfileHistory(args.history)
+    if args.command == 'append':
+        # Backfilled files go in time order, a file older than what is recorded is skipped
+        for path in sorted(args.files, key=_latest_enriched_at):
+            counts = history.append(read_table(path))
+            print(f"{path}: {counts}")
+    elif args.command == 'changes':
+        changes = history.changes(args.field, args.since, args.until)
+        columns = ['enriched_at', 'linkedin_url', 'email', 'first_name', 'last_name', 'changed_fields']
+        if args.field:
+            columns += [f"previous_{args.field}", args.field]
+        _show(changes, args.output, columns)
+    elif args.command == 'latest':
+        emails = read_table(args.emails_file)['Email']
+        _show(history.latest_for_emails(emails, args.field), args.output)
+    elif args.command == 'show':
+        _show(history.versions(args.urls), columns=['version', 'enriched_at', 'changed_fields', 'current_title',
+                                                    'current_company', 'location_linkedin'])
+    elif args.command == 'rebuild':
+        history.rebuild()
+    if args.command not in ('changes', 'latest', 'show'):
+        stats = history.stats()
+        print(f"History {args.history}: {stats['profiles']} profiles, {stats['versions']} versions "
+              f"in {stats['parts']} parts, {stats['size_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
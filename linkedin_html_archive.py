@@ -0,0 +1,192 @@
+import os
+import gzip
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import argparse
+import logging
+import multiprocessing as mp
+import pandas as pd
+from typing import Dict, List, Optional
+from linkedin_cache import EnrichmentCache, DEFAULT_CACHE_PATH, profile_key
+from linkedin_profile_scraper import parse_profile_html, to_enrichment_fields
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = "html_archive"
+
+KIND_SERP = 'serp'
+KIND_PROFILE = 'profile'
+
+
+class HtmlArchive:
+    """
+    Content-addressed store of raw page HTML
+    Each distinct page body is written once as objects/<sha[:2]>/<sha>.html.gz and an
+    SQLite index maps canonical URL and fetch time to the content hash
+    """
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (kind, url, fetched_at)")
+        self.conn.commit()
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}.html.gz")
+
+    def save(self, url: str, html: str, kind: str = KIND_PROFILE, fetched_at: str = None) -> Optional[str]:
+        """
+        Archive one page and return its content hash
+        Profile URLs are indexed by their canonical form so refetches line up
+        """
+        try:
+            data = html.encode('utf-8')
+            sha256 = hashlib.sha256(data).hexdigest()
+            path = self._object_path(sha256)
+
+            # Identical pages share one object; write to a temp file so readers never see a partial one
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=6))
+                os.replace(temp_path, path)
+
+            canonical_url = profile_key(url) if kind == KIND_PROFILE else url
+            fetched_at = fetched_at or pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            with self._lock:
+                self.conn.execute(
+                    "INSERT INTO pages (url, kind, fetched_at, sha256, size) VALUES (?, ?, ?, ?, ?)",
+                    (canonical_url, kind, fetched_at, sha256, len(data))
+                )
+                self.conn.commit()
+            return sha256
+        except Exception as e:
+            logger.warning(f"Could not archive {kind} page {url}: {e}")
+            return None
+
+    def load(self, sha256: str) -> str:
+        """
+        Read an archived page back by content hash
+        """
+        with open(self._object_path(sha256), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def latest(self, kind: str = KIND_PROFILE) -> List[Dict[str, str]]:
+        """
+        Most recent fetch of every URL of one kind
+        """
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT url, MAX(fetched_at), sha256 FROM pages
+                WHERE kind = ? GROUP BY url ORDER BY url
+            """, (kind,)).fetchall()
+        return [{'url': url, 'fetched_at': fetched_at, 'sha256': sha256} for url, fetched_at, sha256 in rows]
+
+    def history(self, url: str, kind: str = KIND_PROFILE) -> List[Dict[str, str]]:
+        """
+        Every archived fetch of one URL, oldest first
+        """
+        canonical_url = profile_key(url) if kind == KIND_PROFILE else url
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT fetched_at, sha256 FROM pages WHERE kind = ? AND url = ? ORDER BY fetched_at",
+                (kind, canonical_url)
+            ).fetchall()
+        return [{'url': canonical_url, 'fetched_at': fetched_at, 'sha256': sha256} for fetched_at, sha256 in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def _reextract_entry(args) -> Optional[Dict[str, str]]:
+    """
+    Pool task: decompress one archived profile and run the current parser over it
+    """
+    root, entry = args
+    try:
+        path = os.path.join(root, 'objects', entry['sha256'][:2], f"{entry['sha256']}.html.gz")
+        with open(path, 'rb') as f:
+            html = gzip.decompress(f.read()).decode('utf-8')
+        profile_data = parse_profile_html(html, entry['url'], entry['fetched_at'])
+        return to_enrichment_fields(profile_data)
+    except Exception as e:
+        logger.error(f"Error re-extracting {entry['url']}: {e}")
+        return None
+
+
+def reextract_archive(archive_dir: str = DEFAULT_ARCHIVE_DIR, output_file: str = None,
+                      num_workers: int = None, update_cache: bool = False,
+                      cache_path: str = DEFAULT_CACHE_PATH) -> pd.DataFrame:
+    """
+    Re-run the profile parser over the latest archived copy of every profile,
+    spread across all cores, without starting a browser
+    """
+    archive = HtmlArchive(archive_dir)
+    entries = archive.latest(KIND_PROFILE)
+    archive.close()
+
+    num_workers = num_workers or mp.cpu_count()
+    logger.info(f"Re-extracting {len(entries)} archived profiles with {num_workers} processes")
+
+    start_time = pd.Timestamp.now()
+    results = []
+    with mp.Pool(processes=num_workers) as pool:
+        tasks = [(archive_dir, entry) for entry in entries]
+        for i, result in enumerate(pool.imap_unordered(_reextract_entry, tasks, chunksize=16), 1):
+            if result:
+                results.append(result)
+            if i % 1000 == 0:
+                logger.info(f"Re-extracted {i}/{len(entries)} profiles")
+
+    elapsed = (pd.Timestamp.now() - start_time).total_seconds()
+    logger.info(f"Re-extracted {len(results)} profiles in {elapsed:.1f}s")
+
+    results_df = pd.DataFrame(results)
+    if output_file:
+        results_df.to_csv(output_file, index=False, encoding='utf-8')
+        logger.info(f"Re-extracted fields saved to: {output_file}")
+
+    # Refresh the profile cache so the next run picks up the improved fields
+    if update_cache:
+        cache = EnrichmentCache(cache_path)
+        for result in results:
+            cache.store_profile(result)
+        cache.close()
+        logger.info(f"Profile cache updated: {cache_path}")
+
+    return results_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract profile fields from archived HTML")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument("--output", default="linkedin_reextracted.csv", help="Output CSV file")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to use (default: all cores)")
+    parser.add_argument("--update-cache", action="store_true", help="Write the re-extracted fields to the profile cache")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Profile cache to update")
+    args = parser.parse_args()
+
+    reextract_archive(args.archive, args.output, args.workers, args.update_cache, args.cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+import re
+import sqlite3
+import argparse
+import threading
+import logging
+import unicodedata
+import pandas as pd
+from typing import Dict, List, Set
+from linkedin_cache import DEFAULT_CACHE_PATH, canonical_profile_url, normalize_input_frame, normalize_value
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Matches below this confidence are left to the normal search
+DEFAULT_MATCH_CONFIDENCE = 0.85
+
+# Confidence of each kind of key before the company is compared; name keys on their
+# own stay below DEFAULT_MATCH_CONFIDENCE, only an agreeing company lifts them over it
+KEY_CONFIDENCE = {
+    'email': 1.0,
+    'name': 0.8,
+    'nickname': 0.75,
+    'phonetic': 0.7
+}
+
+# Added when both rows name the same company, subtracted when they name different ones
+COMPANY_AGREEMENT = 0.15
+
+# A row whose two best candidates are closer than this is ambiguous and not matched
+AMBIGUITY_MARGIN = 0.05
+
+# Name suffixes dropped from surnames
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'phd', 'md', 'esq'}
+
+# Formal name first, then the short forms and nicknames it goes by
+NICKNAME_GROUPS = [
+    ['alexander', 'alex', 'al', 'xander', 'sandy'],
+    ['alexandra', 'alex', 'alexa', 'sandra', 'sandy', 'lexi'],
+    ['andrew', 'andy', 'drew'],
+    ['anthony', 'tony'],
+    ['benjamin', 'ben', 'benny', 'benji'],
+    ['catherine', 'cathy', 'cat', 'kate', 'katie', 'kathy', 'katherine', 'kathryn'],
+    ['charles', 'charlie', 'chuck', 'chas'],
+    ['christina', 'chris', 'christy', 'tina', 'christine'],
+    ['christopher', 'chris', 'topher', 'kit'],
+    ['daniel', 'dan', 'danny'],
+    ['david', 'dave', 'davey'],
+    ['deborah', 'debbie', 'deb', 'debra'],
+    ['donald', 'don', 'donny'],
+    ['douglas', 'doug'],
+    ['edward', 'ed', 'eddie', 'ted', 'ned'],
+    ['elizabeth', 'liz', 'lizzie', 'beth', 'betsy', 'betty', 'eliza', 'libby'],
+    ['frederick', 'fred', 'freddie', 'rick'],
+    ['gregory', 'greg'],
+    ['henry', 'hank', 'harry'],
+    ['jacob', 'jake'],
+    ['james', 'jim', 'jimmy', 'jamie'],
+    ['jeffrey', 'jeff', 'geoffrey', 'geoff'],
+    ['jennifer', 'jen', 'jenny', 'jenn'],
+    ['jessica', 'jess', 'jessie'],
+    ['john', 'johnny', 'jack', 'jon'],
+    ['jonathan', 'jon', 'jonny', 'nathan'],
+    ['joseph', 'joe', 'joey'],
+    ['joshua', 'josh'],
+    ['katherine', 'kate', 'katie', 'kathy', 'kat'],
+    ['kenneth', 'ken', 'kenny'],
+    ['lawrence', 'larry', 'laurence'],
+    ['margaret', 'maggie', 'meg', 'peggy', 'marge', 'greta'],
+    ['matthew', 'matt', 'matty'],
+    ['michael', 'mike', 'mikey', 'mick'],
+    ['nicholas', 'nick', 'nicky', 'nico'],
+    ['patricia', 'pat', 'patty', 'trish', 'tricia'],
+    ['patrick', 'pat', 'paddy'],
+    ['peter', 'pete'],
+    ['philip', 'phil', 'phillip'],
+    ['rebecca', 'becky', 'becca'],
+    ['richard', 'rich', 'rick', 'ricky', 'dick'],
+    ['robert', 'rob', 'bob', 'bobby', 'robbie', 'bert'],
+    ['ronald', 'ron', 'ronnie'],
+    ['samantha', 'sam', 'sammy'],
+    ['samuel', 'sam', 'sammy'],
+    ['stephen', 'steve', 'steven', 'stevie'],
+    ['susan', 'sue', 'susie', 'suzanne'],
+    ['theodore', 'ted', 'teddy', 'theo'],
+    ['thomas', 'tom', 'tommy'],
+    ['timothy', 'tim', 'timmy'],
+    ['victoria', 'vicky', 'tori'],
+    ['william', 'will', 'bill', 'billy', 'willie', 'liam'],
+    ['zachary', 'zach', 'zack'],
+]
+
+# Every spelling -> the formal names it can stand for
+NICKNAMES: Dict[str, Set[str]] = {}
+for _group in NICKNAME_GROUPS:
+    for _name in _group:
+        NICKNAMES.setdefault(_name, set()).add(_group[0])
+
+SOUNDEX_CODES = {letter: str(code) for code, letters in enumerate(
+    ['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for letter in letters}
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase ASCII form of a name: diacritics removed, punctuation turned into spaces
+    """
+    text = unicodedata.normalize('NFKD', normalize_value(text)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9 ]', ' ', text.lower().replace("'", '')).split())
+
+
+def soundex(word: str) -> str:
+    """
+    American Soundex code of a folded word
+    """
+    letters = [letter for letter in word if letter.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit != '0' and digit != previous:
+            code += digit
+        # h and w don't separate letters with the same code, vowels do
+        if letter not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def given_names(first_name: str) -> List[str]:
+    """
+    First given name without initials, e.g. "J. Robert" -> "robert", "Mary-Kate" -> "mary"
+    """
+    tokens = [token for token in fold(first_name).split() if len(token) > 1]
+    return tokens[:1]
+
+
+def surname_variants(last_name: str) -> List[str]:
+    """
+    The full surname plus each part of a double or maiden surname, so "Smith-Jones",
+    "Smith (Jones)" and "Jones" share a key
+    """
+    tokens = [token for token in fold(last_name).split() if token not in NAME_SUFFIXES and len(token) > 1]
+    if not tokens:
+        return []
+    variants = [' '.join(tokens)]
+    if len(tokens) > 1:
+        # Particles like "de" or "la" aren't surnames on their own
+        variants += [token for token in tokens if len(token) > 2 and token not in variants]
+    return variants
+
+
+def identity_keys(first_name: str, last_name: str) -> List[str]:
+    """
+    Name keys of one person, prefixed with their kind: 'name' (as written),
+    'nickname' (formal given name) and 'phonetic' (Soundex of both)
+    """
+    keys = []
+    surnames = surname_variants(last_name)
+    for given in given_names(first_name):
+        formal_names = sorted(NICKNAMES.get(given, {given}))
+        for surname in surnames:
+            keys.append(f"name:{given}|{surname}")
+            keys += [f"nickname:{name}|{surname}" for name in formal_names]
+            keys += [f"phonetic:{soundex(name)}|{soundex(surname)}" for name in formal_names]
+    return list(dict.fromkeys(keys))
+
+
+def _company_key(company: str) -> str:
+    return fold(company)
+
+
+class IdentityIndex:
+    """
+    Email, name, nickname and phonetic keys of everyone enriched so far, each pointing
+    at their LinkedIn URL, so differently formatted exports of the same people find
+    the profiles we already have
+    Lives next to the search and profile caches in the same SQLite file
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS identity_index (
+                key TEXT,
+                linkedin_url TEXT,
+                company_key TEXT,
+                PRIMARY KEY (key, linkedin_url)
+            )
+        """)
+        self.conn.commit()
+
+        # Caches from before the index existed are indexed from their search keys once
+        if not self.conn.execute("SELECT 1 FROM identity_index LIMIT 1").fetchone():
+            self.rebuild()
+
+    def _rows(self, email: str, first_name: str, last_name: str, company: str, linkedin_url: str) -> List[tuple]:
+        linkedin_url = canonical_profile_url(linkedin_url)
+        if not linkedin_url:
+            return []
+        company_key = _company_key(company)
+        keys = identity_keys(first_name, last_name)
+        email = normalize_value(email).lower()
+        if email:
+            keys.append(f"email:{email}")
+        return [(key, linkedin_url, company_key) for key in keys]
+
+    def add(self, fields: Dict[str, str], linkedin_url: str):
+        """
+        Index the person in an input record under the profile they were matched to
+        """
+        rows = self._rows(fields.get('Email', ''), fields['first_name'], fields['last_name'],
+                          fields.get('company', ''), linkedin_url)
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO identity_index VALUES (?, ?, ?)", rows)
+            self.conn.commit()
+
+    def rebuild(self):
+        """
+        Index every search in the search cache that found a profile
+        Search keys hold no email, so those people are indexed by name only until
+        they are enriched again
+        """
+        try:
+            searches = self.conn.execute(
+                "SELECT search_key, linkedin_url FROM search_cache WHERE linkedin_url != ''"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return
+        rows = []
+        for search_key, linkedin_url in searches:
+            first_name, last_name, company, _ = (search_key.split('|') + ['', '', '', ''])[:4]
+            rows += self._rows('', first_name, last_name, company, linkedin_url)
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO identity_index VALUES (?, ?, ?)", rows)
+            self.conn.commit()
+        if rows:
+            logger.info(f"Indexed {len(searches)} cached searches under {len(rows)} identity keys")
+
+    def match(self, normalized: pd.DataFrame, min_confidence: float = DEFAULT_MATCH_CONFIDENCE) -> pd.DataFrame:
+        """
+        Match a normalized input frame against the index in bulk
+        Returns a frame aligned with the input holding linkedin_url, match_confidence
+        and match_key ('' where nothing reached min_confidence or the best two
+        candidates were too close to call)
+        A profile indexed under emails other than the row's is never a candidate
+        """
+        result = pd.DataFrame({'linkedin_url': '', 'match_confidence': 0.0, 'match_key': ''}, index=normalized.index)
+        with self._lock:
+            index = pd.read_sql_query("SELECT key, linkedin_url, company_key FROM identity_index", self.conn)
+        if index.empty or normalized.empty:
+            return result
+
+        # Keys are computed once per distinct name, exports repeat names a lot
+        names = normalized[['first_name', 'last_name']].astype(object)
+        distinct = names.drop_duplicates()
+        name_keys = {(first, last): identity_keys(first, last)
+                     for first, last in zip(distinct['first_name'], distinct['last_name'])}
+        keys = pd.Series([name_keys[name] for name in zip(names['first_name'], names['last_name'])],
+                         index=normalized.index)
+        email = normalized['Email'].astype(object).str.lower()
+        keys = keys + email.map(lambda value: [f"email:{value}"] if value else [])
+
+        wanted = keys.explode().dropna().rename('key').rename_axis('index').reset_index()
+        candidates = wanted.merge(index, on='key')
+        if candidates.empty:
+            return result
+
+        # A profile indexed under other emails belongs to someone else with the same name
+        profile_emails = index.loc[index['key'].str.startswith('email:'), ['linkedin_url', 'key']]
+        profile_emails = profile_emails.groupby('linkedin_url')['key'].agg(set)
+        input_email = keys.map(lambda row_keys: next((key for key in row_keys if key.startswith('email:')), ''))
+        conflicting = [bool(email) and email not in profile_emails.get(url, {email})
+                       for email, url in zip(input_email.reindex(candidates['index']).values,
+                                             candidates['linkedin_url'])]
+        candidates = candidates[~pd.Series(conflicting, index=candidates.index, dtype=bool)]
+        if candidates.empty:
+            return result
+
+        candidates['confidence'] = candidates['key'].str.split(':', n=1).str[0].map(KEY_CONFIDENCE)
+        companies = normalized['company'].astype(object).map(_company_key)
+        input_company = companies.reindex(candidates['index']).values
+        both = (input_company != '') & (candidates['company_key'] != '')
+        same = both & (candidates['company_key'] == input_company)
+        candidates.loc[same, 'confidence'] += COMPANY_AGREEMENT
+        candidates.loc[both & ~same, 'confidence'] -= COMPANY_AGREEMENT
+        candidates['confidence'] = candidates['confidence'].clip(upper=1.0)
+
+        # Best key per (row, profile), then the best profile per row
+        best = (candidates.sort_values('confidence', ascending=False, kind='stable')
+                .drop_duplicates(['index', 'linkedin_url']))
+        top = best.drop_duplicates('index').set_index('index')
+        runner_up = best[best.duplicated('index')].drop_duplicates('index').set_index('index')['confidence']
+        margin = top['confidence'] - runner_up.reindex(top.index).fillna(0.0)
+        top = top[(top['confidence'] >= min_confidence) & (margin >= AMBIGUITY_MARGIN)]
+
+        result.loc[top.index, 'linkedin_url'] = top['linkedin_url']
+        result.loc[top.index, 'match_confidence'] = top['confidence'].round(2)
+        result.loc[top.index, 'match_key'] = top['key']
+        return result
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match an input file against everyone already enriched")
+    parser.add_argument("input_file", help="Excel or CSV input")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Cache holding the identity index")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MATCH_CONFIDENCE)
+    parser.add_argument("--rebuild", action="store_true", help="Re-index the search cache first")
+    parser.add_argument("--output", help="Write the matched rows to this CSV")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input_file) if args.input_file.lower().endswith('.csv') else pd.read_excel(args.input_file)
+    index = IdentityIndex(args.cache)
+    try:
+        if args.rebuild:
+            index.rebuild()
+        matched = index.match(normalize_input_frame(df), args.min_confidence)
+    finally:
+        index.close()
+
+    hits = matched['linkedin_url'] != ''
+    print(f"{hits.sum()} of {len(df)} rows match a known profile at confidence >= {args.min_confidence:g}")
+    print(matched.loc[hits, 'match_key'].str.split(':', n=1).str[0].value_counts().to_string())
+    if args.output:
+        pd.concat([df, matched], axis=1)[hits].to_csv(args.output, index=False)
+        print(f"Matches saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Optional
+
+try:
+    import psycopg2
+except ImportError:  # Only needed for postgresql:// job stores
+    psycopg2 = None
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Window used for the throughput figure in progress reports
+THROUGHPUT_WINDOW_SECONDS = 600
+
+# SQLite release that added RETURNING, which the SQLite job store's updates rely on
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def make_job_id(record: Dict) -> str:
+    """
+    Stable id for a record so enqueueing the same export twice doesn't duplicate work
+    Uses the email when present, otherwise the name, company and location
+    """
+    email = str(record.get('Email', '')).strip().lower()
+    if email and email != 'nan':
+        key = email
+    else:
+        key = '|'.join(str(record.get(column, '')).strip().lower()
+                       for column in ['first_name', 'last_name', 'company', 'location'])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _json_default(value):
+    # Excel timestamps and numpy scalars in input records
+    return str(value)
+
+
+class JobStore:
+    """
+    Shared queue of enrichment records claimed by workers on any host
+
+    Workers claim records under a time-limited lease, extend it with heartbeats
+    while they work, and write results back with complete(). A lease that
+    expires (worker or host died) makes the record claimable again; completing
+    an already completed record is a no-op, so results are written idempotently.
+    """
+    def enqueue(self, records: List[Dict], results: Optional[List[Dict]] = None) -> int:
+        """
+        Add records to the queue, skipping any already present
+        results, if given, marks records as done up front (e.g. cache hits); these
+        don't count towards throughput
+        Returns the number of new jobs
+        """
+        raise NotImplementedError
+
+    def claim(self, owner: str, limit: int = 1, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[Dict]:
+        """
+        Lease up to limit pending or expired jobs
+        Returns a list of {'job_id', 'record', 'attempts'}
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, owner: str, job_ids: List[str], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """
+        Extend the leases the owner still holds
+        Returns the number of leases extended
+        """
+        raise NotImplementedError
+
+    def complete(self, job_id: str, owner: str, result: Optional[Dict]) -> bool:
+        """
+        Store a job's result; returns False if it was already completed
+        """
+        raise NotImplementedError
+
+    def release(self, job_id: str, owner: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                result: Optional[Dict] = None):
+        """
+        Give a job back for another worker, or mark it failed after max_attempts
+        result, if given, is kept as the job's last result so a job that ends up
+        failed is still exported with it
+        """
+        raise NotImplementedError
+
+    def reclaim_expired(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """
+        Return expired leases to the queue (or fail them after max_attempts)
+        Returns the number of jobs reclaimed
+        """
+        raise NotImplementedError
+
+    def progress(self) -> Dict:
+        """
+        Counts by status, active lease owners, recent throughput and an ETA
+        """
+        raise NotImplementedError
+
+    def results(self) -> List[Dict]:
+        """
+        Results of every completed or failed job, in queue order
+        A failed job gives its last result, or its input record with enrichment_status
+        'failed' if no attempt produced one, so every record is accounted for
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _failed_result(record: Dict, result: Optional[Dict]) -> Dict:
+        return result or {**record, 'enrichment_status': FAILED}
+
+    def _summarize(self, counts: Dict[str, int], recent_done: int, owners: Dict[str, int]) -> Dict:
+        total = sum(counts.values())
+        remaining = counts.get(PENDING, 0) + counts.get(LEASED, 0)
+        records_per_minute = recent_done / (THROUGHPUT_WINDOW_SECONDS / 60)
+        return {
+            'total': total,
+            PENDING: counts.get(PENDING, 0),
+            LEASED: counts.get(LEASED, 0),
+            DONE: counts.get(DONE, 0),
+            FAILED: counts.get(FAILED, 0),
+            'active_owners': owners,
+            'records_per_minute': records_per_minute,
+            'eta_minutes': remaining / records_per_minute if records_per_minute else None
+        }
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Thread-safe in-process stand-in for the database-backed stores
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def enqueue(self, records: List[Dict], results: Optional[List[Dict]] = None) -> int:
+        now = time.time()
+        added = 0
+        with self._lock:
+            for i, record in enumerate(records):
+                job_id = make_job_id(record)
+                if job_id in self._jobs:
+                    continue
+                result = results[i] if results else None
+                self._jobs[job_id] = {
+                    'job_id': job_id, 'record': record, 'position': len(self._jobs),
+                    'status': DONE if result else PENDING, 'lease_owner': None, 'lease_expires': 0,
+                    'attempts': 0, 'result': result, 'updated_at': 0 if result else now
+                }
+                added += 1
+        return added
+
+    def claim(self, owner: str, limit: int = 1, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[Dict]:
+        now = time.time()
+        claimed = []
+        with self._lock:
+            for job in sorted(self._jobs.values(), key=lambda job: job['position']):
+                if len(claimed) >= limit:
+                    break
+                expired = job['status'] == LEASED and job['lease_expires'] < now
+                if (job['status'] == PENDING or expired) and job['attempts'] < max_attempts:
+                    job.update(status=LEASED, lease_owner=owner, lease_expires=now + lease_seconds,
+                               attempts=job['attempts'] + 1, updated_at=now)
+                    claimed.append({'job_id': job['job_id'], 'record': job['record'], 'attempts': job['attempts']})
+        return claimed
+
+    def heartbeat(self, owner: str, job_ids: List[str], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        now = time.time()
+        extended = 0
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job and job['status'] == LEASED and job['lease_owner'] == owner:
+                    job['lease_expires'] = now + lease_seconds
+                    extended += 1
+        return extended
+
+    def complete(self, job_id: str, owner: str, result: Optional[Dict]) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] == DONE:
+                return False
+            job.update(status=DONE, result=result, lease_owner=owner, updated_at=time.time())
+            return True
+
+    def release(self, job_id: str, owner: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                result: Optional[Dict] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job['status'] == LEASED and job['lease_owner'] == owner:
+                job.update(status=FAILED if job['attempts'] >= max_attempts else PENDING,
+                           lease_owner=None, result=result or job['result'], updated_at=time.time())
+
+    def reclaim_expired(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        now = time.time()
+        reclaimed = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] == LEASED and job['lease_expires'] < now:
+                    job.update(status=FAILED if job['attempts'] >= max_attempts else PENDING,
+                               lease_owner=None, updated_at=now)
+                    reclaimed += 1
+        return reclaimed
+
+    def progress(self) -> Dict:
+        now = time.time()
+        counts, owners = {}, {}
+        recent_done = 0
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+                if job['status'] == DONE and job['updated_at'] >= now - THROUGHPUT_WINDOW_SECONDS:
+                    recent_done += 1
+                if job['status'] == LEASED and job['lease_expires'] >= now:
+                    owners[job['lease_owner']] = owners.get(job['lease_owner'], 0) + 1
+        return self._summarize(counts, recent_done, owners)
+
+    def results(self) -> List[Dict]:
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job['position'])
+            return [job['result'] if job['status'] == DONE else self._failed_result(job['record'], job['result'])
+                    for job in jobs if (job['status'] == DONE and job['result']) or job['status'] == FAILED]
+
+
+class SQLJobStore(JobStore):
+    """
+    Job store on a DB-API connection; subclasses provide the connection and claim query
+    """
+    placeholder = '?'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conn = self._connect()
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                position BIGINT,
+                record TEXT,
+                status TEXT,
+                lease_owner TEXT,
+                lease_expires DOUBLE PRECISION,
+                attempts INTEGER DEFAULT 0,
+                result TEXT,
+                updated_at DOUBLE PRECISION
+            )
+        """)
+        self._execute("CREATE INDEX IF NOT EXISTS jobs_status_position ON jobs (status, position)")
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _sql(self, query: str) -> str:
+        return query.replace('?', self.placeholder)
+
+    def _execute(self, query: str, params: tuple = ()) -> list:
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(self._sql(query), params)
+                rows = cursor.fetchall() if cursor.description else []
+                self.conn.commit()
+                return rows
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def enqueue(self, records: List[Dict], results: Optional[List[Dict]] = None) -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute("SELECT COALESCE(MAX(position), -1) FROM jobs")
+                start = cursor.fetchone()[0] + 1
+                added = 0
+                for i, record in enumerate(records):
+                    result = results[i] if results else None
+                    cursor.execute(self._sql(
+                        "INSERT INTO jobs (job_id, position, record, status, attempts, result, updated_at) "
+                        "VALUES (?, ?, ?, ?, 0, ?, ?) ON CONFLICT (job_id) DO NOTHING"),
+                        (make_job_id(record), start + i, json.dumps(record, default=_json_default),
+                         DONE if result else PENDING,
+                         json.dumps(result, default=_json_default) if result else None, 0 if result else now))
+                    added += cursor.rowcount
+                self.conn.commit()
+                return added
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def heartbeat(self, owner: str, job_ids: List[str], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        extended = 0
+        for job_id in job_ids:
+            rows = self._execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND status = ? AND lease_owner = ? RETURNING job_id",
+                (time.time() + lease_seconds, job_id, LEASED, owner))
+            extended += len(rows)
+        return extended
+
+    def complete(self, job_id: str, owner: str, result: Optional[Dict]) -> bool:
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, result = ?, lease_owner = ?, updated_at = ? "
+            "WHERE job_id = ? AND status <> ? RETURNING job_id",
+            (DONE, json.dumps(result, default=_json_default) if result else None, owner, time.time(), job_id, DONE))
+        return bool(rows)
+
+    def release(self, job_id: str, owner: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                result: Optional[Dict] = None):
+        self._execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_owner = NULL, "
+            "result = COALESCE(?, result), updated_at = ? WHERE job_id = ? AND status = ? AND lease_owner = ?",
+            (max_attempts, FAILED, PENDING, json.dumps(result, default=_json_default) if result else None,
+             time.time(), job_id, LEASED, owner))
+
+    def reclaim_expired(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        now = time.time()
+        rows = self._execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_owner = NULL, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ? RETURNING job_id",
+            (max_attempts, FAILED, PENDING, now, LEASED, now))
+        return len(rows)
+
+    def progress(self) -> Dict:
+        now = time.time()
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        recent_done = self._execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND updated_at >= ?",
+                                    (DONE, now - THROUGHPUT_WINDOW_SECONDS))[0][0]
+        owners = dict(self._execute(
+            "SELECT lease_owner, COUNT(*) FROM jobs WHERE status = ? AND lease_expires >= ? GROUP BY lease_owner",
+            (LEASED, now)))
+        return self._summarize(counts, recent_done, owners)
+
+    def results(self) -> List[Dict]:
+        rows = self._execute(
+            "SELECT status, record, result FROM jobs WHERE (status = ? AND result IS NOT NULL) OR status = ? "
+            "ORDER BY position", (DONE, FAILED))
+        return [json.loads(result) if status == DONE
+                else self._failed_result(json.loads(record), json.loads(result) if result else None)
+                for status, record, result in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SQLiteJobStore(SQLJobStore):
+    """
+    Job store in a SQLite file, for one machine or hosts sharing a filesystem with working locks
+    """
+    def __init__(self, path: str):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(f"The SQLite job store needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or "
+                               f"newer, this Python has {sqlite3.sqlite_version}; use a newer Python or a "
+                               f"postgresql:// store")
+        self.path = path
+        super().__init__()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def claim(self, owner: str, limit: int = 1, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                # Take the write lock up front so two hosts can't claim the same rows
+                cursor.execute("BEGIN IMMEDIATE")
+                rows = cursor.execute(
+                    "SELECT job_id, record, attempts FROM jobs "
+                    "WHERE (status = ? OR (status = ? AND lease_expires < ?)) AND attempts < ? "
+                    "ORDER BY position LIMIT ?",
+                    (PENDING, LEASED, now, max_attempts, limit)).fetchall()
+                cursor.executemany(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE job_id = ?",
+                    [(LEASED, owner, now + lease_seconds, now, row[0]) for row in rows])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return [{'job_id': row[0], 'record': json.loads(row[1]), 'attempts': row[2] + 1} for row in rows]
+
+
+class PostgresJobStore(SQLJobStore):
+    """
+    Job store in Postgres, for workers spread across machines
+    """
+    placeholder = '%s'
+
+    def __init__(self, dsn: str):
+        if psycopg2 is None:
+            raise ImportError("psycopg2 is required for postgresql:// job stores")
+        self.dsn = dsn
+        super().__init__()
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def claim(self, owner: str, limit: int = 1, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[Dict]:
+        now = time.time()
+        # SKIP LOCKED lets concurrent workers claim disjoint rows without waiting on each other
+        rows = self._execute(
+            "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE job_id IN (SELECT job_id FROM jobs "
+            "WHERE (status = ? OR (status = ? AND lease_expires < ?)) AND attempts < ? "
+            "ORDER BY position LIMIT ? FOR UPDATE SKIP LOCKED) "
+            "RETURNING job_id, record, attempts",
+            (LEASED, owner, now + lease_seconds, now, PENDING, LEASED, now, max_attempts, limit))
+        return [{'job_id': row[0], 'record': json.loads(row[1]), 'attempts': row[2]} for row in rows]
+
+
+def open_job_store(location: str) -> JobStore:
+    """
+    Open a job store from a postgresql:// DSN, ':memory:' or a SQLite file path
+    """
+    if location.startswith(('postgres://', 'postgresql://')):
+        return PostgresJobStore(location)
+    if location == ':memory:':
+        return InMemoryJobStore()
+    return SQLiteJobStore(location)
@@ -0,0 +1,229 @@
+import sys
+import json
+import zlib
+import atexit
+import random
+import logging
+import threading
+import multiprocessing as mp
+from logging.handlers import QueueHandler
+from typing import Optional
+
+DEFAULT_LOG_LEVEL = 'INFO'
+
+# Fraction of records whose DEBUG lines (per-selector hits, experience entries) are kept
+DEFAULT_DEBUG_SAMPLE_RATE = 0.05
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(worker)s/%(record)s - %(message)s'
+
+# Third-party loggers that stay at WARNING even when our own code runs at DEBUG
+NOISY_LOGGERS = ['selenium', 'urllib3', 'WDM', 'asyncio']
+
+# Most records the writer formats before flushing its handlers
+WRITER_BATCH_SIZE = 500
+
+# Worker and record id of the current process and thread, stamped on every log record
+_context = threading.local()
+_worker_id = 'main'
+
+# Writer started by start_logging in this process, if any
+_writer = None
+
+
+class LogConfig:
+    """
+    Picklable logging settings handed to worker processes
+    """
+    def __init__(self, log_queue, level: str = DEFAULT_LOG_LEVEL,
+                 debug_sample_rate: float = DEFAULT_DEBUG_SAMPLE_RATE):
+        self.queue = log_queue
+        self.level = level
+        self.debug_sample_rate = debug_sample_rate
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps the worker id and current record id on each log record
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.worker = _worker_id
+        record.record = getattr(_context, 'record', None) or '-'
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keeps every DEBUG line for a sample of records and drops the rest
+    Sampling by record keeps each kept record's trace complete; lines logged
+    outside a record are sampled individually
+    """
+    def __init__(self, rate: float = DEFAULT_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        record_id = getattr(_context, 'record', None)
+        if record_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(record_id.encode('utf-8')) % 10000 < self.rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line with the event name and its fields at the top level
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'worker': getattr(record, 'worker', '-'),
+            'record': getattr(record, 'record', '-')
+        }
+        if getattr(record, 'event', None):
+            entry['event'] = record.event
+            entry.update(getattr(record, 'data', {}))
+        entry['message'] = record.getMessage()
+        return json.dumps(entry, default=str)
+
+
+def set_log_record(record_id: Optional[str]):
+    """
+    Tag log lines from this thread with a record id until the next call
+    """
+    _context.record = record_id
+
+
+def log_event(log: logging.Logger, event: str, level: int = logging.INFO, **fields):
+    """
+    Log a structured event; text output shows "event key=value ...", JSON output
+    carries the fields as separate keys
+    """
+    if not log.isEnabledFor(level):
+        return
+    details = ' '.join(f"{key}={value}" for key, value in fields.items() if value not in (None, ''))
+    log.log(level, f"{event} {details}".rstrip(), extra={'event': event, 'data': fields})
+
+
+def _install(handler: logging.Handler, level: str, debug_sample_rate: float):
+    """
+    Make handler the only root handler, behind the context and sampling filters
+    """
+    handler.addFilter(ContextFilter())
+    handler.addFilter(DebugSampler(debug_sample_rate))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    if logging.getLevelName(level) < logging.WARNING:
+        for name in NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def _writer_main(log_queue, log_file: Optional[str], json_format: bool):
+    """
+    Writer process: the only place log lines are formatted and written
+    Drains whatever is queued before flushing, so a busy run costs one write
+    per batch of lines rather than one per line
+    """
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        # Flushing is done once per batch below
+        handler.flush = lambda: None
+
+    streams = [handler.stream for handler in handlers]
+    running = True
+    while running:
+        batch = [log_queue.get()]
+        while len(batch) < WRITER_BATCH_SIZE:
+            try:
+                batch.append(log_queue.get_nowait())
+            except Exception:
+                break
+        for record in batch:
+            if record is None:
+                running = False
+                continue
+            for handler in handlers:
+                handler.handle(record)
+        for stream in streams:
+            stream.flush()
+    for handler in handlers:
+        handler.close()
+
+
+class LogWriter:
+    """
+    Log queue plus the process that writes it
+    """
+    def __init__(self, level: str = DEFAULT_LOG_LEVEL, debug_sample_rate: float = DEFAULT_DEBUG_SAMPLE_RATE,
+                 log_file: str = None, json_format: bool = False):
+        self.queue = mp.Queue()
+        self.config = LogConfig(self.queue, level, debug_sample_rate)
+        self.process = mp.Process(target=_writer_main, args=(self.queue, log_file, json_format),
+                                  name='log-writer', daemon=True)
+        self.process.start()
+
+    def stop(self):
+        """
+        Write out everything queued and stop the writer
+        """
+        if not self.process.is_alive():
+            return
+        self.queue.put(None)
+        self.process.join(timeout=10)
+        self.queue.close()
+
+
+def start_logging(level: str = DEFAULT_LOG_LEVEL, debug_sample_rate: float = DEFAULT_DEBUG_SAMPLE_RATE,
+                  log_file: str = None, json_format: bool = False) -> LogWriter:
+    """
+    Route this process's logging, and that of any worker started with
+    worker_log_config(), through a queue to a single writer process
+    """
+    global _writer
+    if _writer is None:
+        level = level.upper()
+        _writer = LogWriter(level, debug_sample_rate, log_file, json_format)
+        _install(QueueHandler(_writer.queue), level, debug_sample_rate)
+        atexit.register(stop_logging)
+    return _writer
+
+
+def stop_logging():
+    """
+    Flush and stop the writer started by start_logging
+    """
+    global _writer
+    if _writer is not None:
+        logging.getLogger().handlers.clear()
+        _writer.stop()
+        _writer = None
+
+
+def worker_log_config() -> Optional[LogConfig]:
+    """
+    Settings to pass to worker processes, or None if start_logging wasn't called
+    and workers should keep logging to the console directly
+    """
+    return _writer.config if _writer else None
+
+
+def configure_worker_logging(config: Optional[LogConfig], worker_id):
+    """
+    Called first thing in a worker process: send its logging to the writer and
+    tag every line with worker_id
+    """
+    global _worker_id
+    _worker_id = str(worker_id)
+    if config is None:
+        return
+    _install(QueueHandler(config.queue), config.level, config.debug_sample_rate)
+
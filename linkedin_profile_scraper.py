@@ -1,48 +1,425 @@
 import pandas as pd
-import time
+import re
+import json
 import logging
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from typing import Dict, Optional, List
 import os
+from linkedin_block_detector import BlockDetectedError, raise_if_blocked
+from linkedin_browser import load_page, pause
+from linkedin_driver_manager import raise_if_crashed
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Matches the date range of an experience or education entry
+DATE_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b|\bPresent\b')
+
+# Industry is only present in the JSON LinkedIn embeds in the page for logged-in views
+INDUSTRY_PATTERN = re.compile(r'"industryName"\s*:\s*"([^"]+)"')
+
+LOCATION_SELECTORS = [
+    ".pv-text-details__left-panel span.text-body-small.inline.t-black--light.break-words",
+    "span.text-body-small.inline.t-black--light.break-words",
+    ".pv-top-card--list-bullet li.t-16",
+    ".top-card__subline-item"
+]
+
+INDUSTRY_SELECTORS = [
+    ".pv-top-card__industry",
+    ".top-card__industry"
+]
+
+DESCRIPTION_XPATHS = [
+    "//*[@id='profile-content']/div/div[2]/div/div/main/section[1]/div[2]/div[2]/div[1]/div[2]",
+    "//div[@class='text-body-medium break-words']",
+    "//div[contains(@class, 'text-body-medium') and contains(@class, 'break-words')]"
+]
+
+DESCRIPTION_SELECTORS = [
+    "div.text-body-medium.break-words[data-generated-suggestion-target*='profileActionDelegate']",
+    "div.text-body-medium.break-words",
+    ".pv-text-details__left-panel .text-body-medium",
+    ".pv-top-card--list-bullet .text-body-medium"
+]
+
+EXPERIENCE_SECTION_SELECTORS = [
+    "#experience",
+    "[data-test-id='experience-section']",
+    ".pv-profile-section.experience",
+    "section[aria-labelledby*='experience']"
+]
+
+JOB_TITLE_SELECTORS = [
+    ".pv-entity__summary-info h3",
+    ".pv-entity__summary-info .t-16.t-black.t-bold",
+    ".pv-entity__summary-info .t-14.t-black.t-bold",
+    ".pv-entity__summary-info-v2 h3",
+    ".pv-entity__summary-info-v2 .t-16.t-black.t-bold"
+]
+
+COMPANY_SELECTORS = [
+    ".pv-entity__secondary-title",
+    ".pv-entity__summary-info h4",
+    ".pv-entity__summary-info .t-14.t-black--light.t-normal",
+    ".pv-entity__summary-info-v2 h4",
+    ".pv-entity__summary-info-v2 .t-14.t-black--light.t-normal"
+]
+
+DATE_SELECTORS = [
+    ".pv-entity__dates .t-14.t-black--light.t-normal",
+    ".pv-entity__summary-info .t-14.t-black--light.t-normal",
+    ".pv-entity__summary-info-v2 .t-14.t-black--light.t-normal",
+    ".pvs-entity__caption-wrapper"
+]
+
+HEADLINE_SELECTORS = [
+    "div.text-body-medium.break-words",
+    "div[data-generated-suggestion-target*='profileActionDelegate']",
+    ".pv-text-details__left-panel .text-body-medium",
+    ".pv-text-details__left-panel .break-words",
+    ".pv-top-card--list-bullet .text-body-medium",
+    ".pv-top-card--list-bullet .break-words"
+]
+
+
+def _clean_text(element) -> str:
+    return ' '.join(element.get_text(' ', strip=True).split())
+
+
+def _own_texts(item) -> List[str]:
+    """
+    Visible text of a list item, skipping anything inside nested list items
+    LinkedIn renders each value twice: once aria-hidden for display and once for screen readers
+    """
+    texts = []
+    for span in item.select('span[aria-hidden="true"]'):
+        if span.find_parent('li') is not item:
+            continue
+        text = _clean_text(span)
+        if text:
+            texts.append(text)
+    return texts
+
+
+def _section_items(soup, anchor_id: str) -> list:
+    """
+    Top-level list items of a profile section such as #experience or #education
+    """
+    anchor = soup.find(id=anchor_id)
+    section = anchor.find_parent('section') if anchor else None
+    if section is None:
+        return []
+    return [item for item in section.find_all('li')
+            if item.find_parent('li') is None and _own_texts(item)]
+
+
+def _parse_position(texts: List[str], company: str = '') -> Dict[str, str]:
+    """
+    Turn the text lines of an experience entry into title, company, dates and location
+    """
+    date_index = next((i for i, text in enumerate(texts) if DATE_PATTERN.search(text)), None)
+    
+    title = texts[0] if texts else ''
+    if not company and len(texts) > 1 and date_index != 1:
+        company = texts[1].split(' · ')[0]
+    
+    dates = texts[date_index] if date_index is not None else ''
+    location = ''
+    if date_index is not None and date_index + 1 < len(texts) and len(texts[date_index + 1]) <= 60:
+        location = texts[date_index + 1]
+    
+    return {
+        'title': title,
+        'company': company,
+        'dates': dates,
+        'location': location,
+        'is_current': 'Present' in dates
+    }
+
+
+def _json_ld_person(soup) -> Dict:
+    """
+    Person object from the page's JSON-LD block, if LinkedIn included one
+    """
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        candidates = data.get('@graph', [data]) if isinstance(data, dict) else data
+        for candidate in candidates:
+            if isinstance(candidate, dict) and candidate.get('@type') == 'Person':
+                return candidate
+    return {}
+
+
+def parse_profile_snapshot(html: str) -> Dict:
+    """
+    Parse location, industry, education and the full experience list from a
+    profile page_source, so they come from the same page load as everything else
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    person = _json_ld_person(soup)
+    
+    # Location: top card, then JSON-LD address
+    location = ''
+    for selector in LOCATION_SELECTORS:
+        element = soup.select_one(selector)
+        if element and _clean_text(element):
+            location = _clean_text(element)
+            break
+    if not location:
+        address = person.get('address') or {}
+        if isinstance(address, dict):
+            location = ', '.join(part for part in [address.get('addressLocality', ''), address.get('addressCountry', '')] if part)
+    
+    # Industry: embedded profile JSON, then older top card markup
+    industry = ''
+    match = INDUSTRY_PATTERN.search(html)
+    if match:
+        industry = match.group(1)
+    else:
+        for selector in INDUSTRY_SELECTORS:
+            element = soup.select_one(selector)
+            if element and _clean_text(element):
+                industry = _clean_text(element)
+                break
+    
+    # Experience: one entry per role; roles grouped under one company are flattened
+    experience = []
+    for item in _section_items(soup, 'experience'):
+        texts = _own_texts(item)
+        roles = [role for role in item.find_all('li') if any(DATE_PATTERN.search(text) for text in _own_texts(role))]
+        if roles:
+            company = texts[0]
+            experience.extend(_parse_position(_own_texts(role), company) for role in roles)
+        else:
+            experience.append(_parse_position(texts))
+    
+    # Education: school, degree and dates, then JSON-LD alumniOf
+    education = []
+    for item in _section_items(soup, 'education'):
+        texts = _own_texts(item)
+        degree = texts[1] if len(texts) > 1 and not DATE_PATTERN.fullmatch(texts[1]) else ''
+        dates = next((text for text in texts[1:] if DATE_PATTERN.search(text)), '')
+        education.append({'school': texts[0], 'degree': degree, 'dates': dates})
+    if not education:
+        alumni_of = person.get('alumniOf') or []
+        for organization in alumni_of if isinstance(alumni_of, list) else [alumni_of]:
+            if isinstance(organization, dict) and organization.get('name'):
+                education.append({'school': organization['name'], 'degree': '', 'dates': ''})
+    
+    return {
+        'location': location,
+        'industry': industry,
+        'education': education,
+        'experience': experience
+    }
+
+
+def format_education(education: List[Dict]) -> str:
+    """
+    Flatten education entries into the single 'education' output column
+    """
+    return '; '.join(' - '.join(part for part in [entry['school'], entry['degree']] if part) for entry in education)
+
+
+def parse_company_and_title(text: str) -> tuple:
+    """
+    Parse company and job title from profile text
+    """
+    try:
+        # Handle "Job Title at Company" format (most common)
+        if ' at ' in text:
+            parts = text.split(' at ')
+            if len(parts) == 2:
+                job_title = parts[0].strip()
+                company = parts[1].strip()
+                
+                # Clean up job title (remove common prefixes)
+                job_title = job_title.replace('former ', '').replace('current ', '').strip()
+                
+                return company, job_title
+        
+        # Handle comma-separated format: "Company, Department, Job Title"
+        if ',' in text:
+            parts = [part.strip() for part in text.split(',')]
+            if len(parts) >= 2:
+                company = parts[0]
+                job_title = parts[-1]  # Last part is usually the job title
+                
+                # Clean up the job title
+                job_title = job_title.replace('Department Chair', '').replace('Manager', '').strip()
+                if job_title.endswith(','):
+                    job_title = job_title[:-1].strip()
+                
+                return company, job_title
+        
+        # Single part - treat as job title, no company
+        return '', text.strip()
+                
+    except Exception as e:
+        logger.error(f"Error parsing company and title from '{text}': {e}")
+        return '', text.strip()
+
+
+def _first_text(elements, min_length: int = 0) -> str:
+    for element in elements:
+        text = _clean_text(element)
+        if text and len(text) > min_length:
+            return text
+    return ''
+
+
+def _select_text(element, selectors: List[str]) -> str:
+    """
+    Text of the first match of the first selector that finds something, like find_element
+    """
+    for selector in selectors:
+        match = element.select_one(selector)
+        text = _clean_text(match) if match else ''
+        if text:
+            return text
+    return ''
+
+
+def _html_current_job(soup) -> tuple:
+    """
+    Offline version of LinkedInProfileScraper._extract_current_job_from_experience
+    """
+    experience_section = None
+    for selector in EXPERIENCE_SECTION_SELECTORS:
+        experience_section = soup.select_one(selector)
+        if experience_section:
+            break
+    if not experience_section:
+        return '', ''
+    
+    experience_entries = (experience_section.select("li.artdeco-list__item")
+                          or experience_section.select(".pv-entity__position-group-pager")
+                          or experience_section.select(".pv-entity__summary-info"))
+    
+    for i, entry in enumerate(experience_entries):
+        job_title = _select_text(entry, JOB_TITLE_SELECTORS)
+        company = _select_text(entry, COMPANY_SELECTORS)
+        date_text = _select_text(entry, DATE_SELECTORS)
+        is_current = 'Present' in date_text or 'Current' in date_text
+        if job_title and company and (is_current or i == 0):
+            return company, job_title
+    return '', ''
+
+
+def parse_profile_html(html: str, linkedin_url: str = '', scraped_at: str = '') -> Dict:
+    """
+    Extract the same profile_data as LinkedInProfileScraper.extract_profile_info
+    from saved page HTML, without a browser
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Description: the XPaths first (run through lxml), then the CSS fallbacks
+    description = ''
+    tree = lxml_html.fromstring(html)
+    for xpath in DESCRIPTION_XPATHS:
+        matches = tree.xpath(xpath)
+        if matches:
+            description = ' '.join(matches[0].text_content().split())
+            if description:
+                break
+    if not description:
+        for selector in DESCRIPTION_SELECTORS:
+            description = _first_text(soup.select(selector), min_length=10)
+            if description:
+                break
+    
+    # Company and job title: Experience section first, then the headline
+    company, job_title = _html_current_job(soup)
+    if not (company and job_title):
+        company, job_title = '', ''
+        for selector in HEADLINE_SELECTORS:
+            text = _first_text(soup.select(selector), min_length=10)
+            if text:
+                company, job_title = parse_company_and_title(text)
+                if company or job_title:
+                    break
+    
+    profile_data = {
+        'linkedin_url': linkedin_url,
+        'company': company,
+        'job_title': job_title,
+        'description': description,
+        'scraped_at': scraped_at or pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    profile_data.update(parse_profile_snapshot(html))
+    return profile_data
+
+
+def to_enrichment_fields(profile_data: Dict) -> Dict[str, str]:
+    """
+    Map scraper profile_data onto the enrichment output columns
+    """
+    return {
+        'linkedin_url': profile_data['linkedin_url'],
+        'headline': profile_data['description'][:200] if profile_data['description'] else '',  # Truncate for headline
+        'current_title': profile_data['job_title'],
+        'current_company': profile_data['company'],
+        'location_linkedin': profile_data.get('location', ''),
+        'industry_linkedin': profile_data.get('industry', ''),
+        'education': format_education(profile_data.get('education', [])),
+        'experience': json.dumps(profile_data.get('experience', [])),
+        'last_enriched_at': profile_data['scraped_at'],
+        'description': profile_data['description']  # Add the full description
+    }
+
+
 class LinkedInProfileScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, archive=None, page_timeout: Optional[float] = None):
         """
         Initialize the scraper with an existing WebDriver instance
+        Pages are saved to archive (an HtmlArchive) when one is given
+        A page still loading after page_timeout seconds is stopped and extracted as it is
         """
         self.driver = driver
+        self.archive = archive
+        self.page_timeout = page_timeout
         
     def extract_profile_info(self, linkedin_url: str) -> Dict[str, str]:
         """
         Extract company, job_title, and description from a LinkedIn profile page
         """
         try:
-            logger.info(f"Extracting profile info from: {linkedin_url}")
+            logger.debug("Extracting profile info from: %s", linkedin_url)
             
-            # Navigate to the LinkedIn profile
-            self.driver.get(linkedin_url)
-            time.sleep(3)
+            # Navigate to the LinkedIn profile; a load cut short is extracted as far as it rendered
+            if load_page(self.driver, linkedin_url, self.page_timeout):
+                pause(self.driver, 3)
+                
+                # Wait for page to load
+                try:
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.TAG_NAME, "body"))
+                    )
+                except:
+                    logger.warning("Page load timeout, continuing anyway")
             
-            # Wait for page to load
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except:
-                logger.warning("Page load timeout, continuing anyway")
+            # Bail out instead of recording empty fields from an authwall or CAPTCHA
+            raise_if_blocked(self.driver)
             
             profile_data = {
                 'linkedin_url': linkedin_url,
                 'company': '',
                 'job_title': '',
                 'description': '',
+                'location': '',
+                'industry': '',
+                'education': [],
+                'experience': [],
                 'scraped_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
@@ -55,57 +432,72 @@ class LinkedInProfileScraper:
             description = self._extract_description()
             profile_data['description'] = description
             
-            logger.info(f"Successfully extracted profile info for {linkedin_url}")
+            # Location, industry, education and the experience list from one snapshot of the same page
+            page_source = self.driver.page_source
+            profile_data.update(self._extract_snapshot_fields(page_source))
+            
+            # Keep the raw page so later parser changes can be replayed offline
+            if self.archive:
+                self.archive.save(linkedin_url, page_source, 'profile', profile_data['scraped_at'])
+            
+            logger.debug("Successfully extracted profile info for %s", linkedin_url)
             return profile_data
             
+        except BlockDetectedError:
+            raise
         except Exception as e:
+            raise_if_crashed(e)
             logger.error(f"Error extracting profile info from {linkedin_url}: {e}")
             return {
                 'linkedin_url': linkedin_url,
                 'company': '',
                 'job_title': '',
                 'description': '',
+                'location': '',
+                'industry': '',
+                'education': [],
+                'experience': [],
                 'scraped_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
             }
     
+    def _extract_snapshot_fields(self, page_source: str) -> Dict:
+        """
+        Parse the fields that don't need WebDriver lookups from the loaded page_source
+        """
+        try:
+            fields = parse_profile_snapshot(page_source)
+            logger.debug("Snapshot: location='%s', industry='%s', %d education and %d experience entries",
+                         fields['location'], fields['industry'], len(fields['education']), len(fields['experience']))
+            return fields
+        except Exception as e:
+            logger.error(f"Error parsing profile snapshot: {e}")
+            return {}
+    
     def _extract_description(self) -> str:
         """
         Extract description from the main profile title section (fallback only)
         """
         try:
             # Use the specific XPath you provided to get the main title section
-            xpath_selectors = [
-                "//*[@id='profile-content']/div/div[2]/div/div/main/section[1]/div[2]/div[2]/div[1]/div[2]",
-                "//div[@class='text-body-medium break-words']",
-                "//div[contains(@class, 'text-body-medium') and contains(@class, 'break-words')]"
-            ]
-            
-            for xpath in xpath_selectors:
+            for xpath in DESCRIPTION_XPATHS:
                 try:
                     element = self.driver.find_element(By.XPATH, xpath)
                     if element:
                         text = element.text.strip()
                         if text:
-                            logger.info(f"Found main profile title: {text}")
+                            logger.debug("Found main profile title: %s", text)
                             return text
                 except:
                     continue
             
             # Fallback: try CSS selectors
-            fallback_selectors = [
-                "div.text-body-medium.break-words[data-generated-suggestion-target*='profileActionDelegate']",
-                "div.text-body-medium.break-words",
-                ".pv-text-details__left-panel .text-body-medium",
-                ".pv-top-card--list-bullet .text-body-medium"
-            ]
-            
-            for selector in fallback_selectors:
+            for selector in DESCRIPTION_SELECTORS:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         if text and len(text) > 10:
-                            logger.info(f"Found fallback profile title: {text}")
+                            logger.debug("Found fallback profile title: %s", text)
                             return text
                 except:
                     continue
@@ -130,22 +522,15 @@ class LinkedInProfileScraper:
         """
         try:
             # Wait for page to load completely
-            time.sleep(2)
+            pause(self.driver, 2)
             
             # Try to find the Experience section
-            experience_selectors = [
-                "#experience",
-                "[data-test-id='experience-section']",
-                ".pv-profile-section.experience",
-                "section[aria-labelledby*='experience']"
-            ]
-            
             experience_section = None
-            for selector in experience_selectors:
+            for selector in EXPERIENCE_SECTION_SELECTORS:
                 try:
                     experience_section = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if experience_section:
-                        logger.info(f"Found Experience section with selector: {selector}")
+                        logger.debug("Found Experience section with selector: %s", selector)
                         break
                 except:
                     continue
@@ -163,22 +548,14 @@ class LinkedInProfileScraper:
                 if not experience_entries:
                     experience_entries = experience_section.find_elements(By.CSS_SELECTOR, ".pv-entity__summary-info")
             
-            logger.info(f"Found {len(experience_entries)} experience entries")
+            logger.debug("Found %d experience entries", len(experience_entries))
             
             # Process each experience entry to find the most recent one
             for i, entry in enumerate(experience_entries):
                 try:
                     # Extract job title
-                    job_title_selectors = [
-                        ".pv-entity__summary-info h3",
-                        ".pv-entity__summary-info .t-16.t-black.t-bold",
-                        ".pv-entity__summary-info .t-14.t-black.t-bold",
-                        ".pv-entity__summary-info-v2 h3",
-                        ".pv-entity__summary-info-v2 .t-16.t-black.t-bold"
-                    ]
-                    
                     job_title = ''
-                    for selector in job_title_selectors:
+                    for selector in JOB_TITLE_SELECTORS:
                         try:
                             title_element = entry.find_element(By.CSS_SELECTOR, selector)
                             job_title = title_element.text.strip()
@@ -188,16 +565,8 @@ class LinkedInProfileScraper:
                             continue
                     
                     # Extract company name
-                    company_selectors = [
-                        ".pv-entity__secondary-title",
-                        ".pv-entity__summary-info h4",
-                        ".pv-entity__summary-info .t-14.t-black--light.t-normal",
-                        ".pv-entity__summary-info-v2 h4",
-                        ".pv-entity__summary-info-v2 .t-14.t-black--light.t-normal"
-                    ]
-                    
                     company = ''
-                    for selector in company_selectors:
+                    for selector in COMPANY_SELECTORS:
                         try:
                             company_element = entry.find_element(By.CSS_SELECTOR, selector)
                             company = company_element.text.strip()
@@ -207,16 +576,9 @@ class LinkedInProfileScraper:
                             continue
                     
                     # Extract date information to check if it's current/most recent
-                    date_selectors = [
-                        ".pv-entity__dates .t-14.t-black--light.t-normal",
-                        ".pv-entity__summary-info .t-14.t-black--light.t-normal",
-                        ".pv-entity__summary-info-v2 .t-14.t-black--light.t-normal",
-                        ".pvs-entity__caption-wrapper"
-                    ]
-                    
                     date_text = ''
                     is_current = False
-                    for selector in date_selectors:
+                    for selector in DATE_SELECTORS:
                         try:
                             date_element = entry.find_element(By.CSS_SELECTOR, selector)
                             date_text = date_element.text.strip()
@@ -228,12 +590,12 @@ class LinkedInProfileScraper:
                         except:
                             continue
                     
-                    logger.info(f"Entry {i+1}: Job='{job_title}', Company='{company}', Date='{date_text}', Current={is_current}")
+                    logger.debug("Entry %d: Job='%s', Company='%s', Date='%s', Current=%s", i + 1, job_title, company, date_text, is_current)
                     
                     # Return the first entry (most recent) or the current one
                     if job_title and company:
                         if is_current or i == 0:  # First entry is usually most recent
-                            logger.info(f"Selected most recent job: {job_title} at {company}")
+                            logger.debug("Selected most recent job: %s at %s", job_title, company)
                             return company, job_title
                 
                 except Exception as e:
@@ -258,25 +620,16 @@ class LinkedInProfileScraper:
                 return company, job_title
             
             # Fallback: try the main profile section
-            logger.info("Experience section failed, trying main profile section")
+            logger.debug("Experience section failed, trying main profile section")
             
             # Try multiple selectors for the main profile info
-            selectors_to_try = [
-                "div.text-body-medium.break-words",
-                "div[data-generated-suggestion-target*='profileActionDelegate']",
-                ".pv-text-details__left-panel .text-body-medium",
-                ".pv-text-details__left-panel .break-words",
-                ".pv-top-card--list-bullet .text-body-medium",
-                ".pv-top-card--list-bullet .break-words"
-            ]
-            
-            for selector in selectors_to_try:
+            for selector in HEADLINE_SELECTORS:
                 try:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         if text and len(text) > 10:  # Filter out short/empty text
-                            logger.info(f"Found profile text: {text}")
+                            logger.debug("Found profile text: %s", text)
                             
                             # Try to parse company and job title
                             company, job_title = self._parse_company_and_title(text)
@@ -296,39 +649,7 @@ class LinkedInProfileScraper:
         """
         Parse company and job title from profile text
         """
-        try:
-            # Handle "Job Title at Company" format (most common)
-            if ' at ' in text:
-                parts = text.split(' at ')
-                if len(parts) == 2:
-                    job_title = parts[0].strip()
-                    company = parts[1].strip()
-                    
-                    # Clean up job title (remove common prefixes)
-                    job_title = job_title.replace('former ', '').replace('current ', '').strip()
-                    
-                    return company, job_title
-            
-            # Handle comma-separated format: "Company, Department, Job Title"
-            if ',' in text:
-                parts = [part.strip() for part in text.split(',')]
-                if len(parts) >= 2:
-                    company = parts[0]
-                    job_title = parts[-1]  # Last part is usually the job title
-                    
-                    # Clean up the job title
-                    job_title = job_title.replace('Department Chair', '').replace('Manager', '').strip()
-                    if job_title.endswith(','):
-                        job_title = job_title[:-1].strip()
-                    
-                    return company, job_title
-            
-            # Single part - treat as job title, no company
-            return '', text.strip()
-                    
-        except Exception as e:
-            logger.error(f"Error parsing company and title from '{text}': {e}")
-            return '', text.strip()
+        return parse_company_and_title(text)
 
 def test_single_url():
     """
@@ -362,6 +683,12 @@ def test_single_url():
         print(f"Company: '{profile_data['company']}'")
         print(f"Job Title: '{profile_data['job_title']}'")
         print(f"Description: '{profile_data['description'][:200]}...' (first 200 chars)")
+        print(f"Location: '{profile_data['location']}'")
+        print(f"Industry: '{profile_data['industry']}'")
+        print(f"Education: '{format_education(profile_data['education'])}'")
+        print(f"Experience: {len(profile_data['experience'])} entries")
+        for entry in profile_data['experience']:
+            print(f"  - {entry['title']} at {entry['company']} ({entry['dates']})")
         print(f"Scraped At: {profile_data['scraped_at']}")
         
         # Test individual methods for debugging
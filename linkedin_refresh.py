@@ -0,0 +1,142 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from linkedin_cache import normalize_input_frame, NAME_COLUMNS
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_DAYS = 30
+
+# A row missing any of these is re-enriched regardless of age
+REQUIRED_FIELDS = ['linkedin_url', 'current_title', 'current_company']
+
+# Rows whose last enrichment ended with one of these statuses are re-enriched regardless of age
+RETRY_STATUSES = ['timed_out', 'failed']
+
+# Enriched fields compared to decide whether a refreshed row changed
+COMPARED_FIELDS = [
+    'linkedin_url', 'additional_linkedin_urls', 'current_title', 'current_company', 'description',
+    'location_linkedin', 'industry_linkedin', 'education', 'experience'
+]
+
+REASON_NEW = 'new'
+REASON_STALE = 'stale'
+REASON_INCOMPLETE = 'incomplete'
+
+
+def row_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Key that lines up the same person across exports: the lowercased email, or the
+    name/company/location search key for rows without one
+    """
+    normalized = normalize_input_frame(df)
+    email = normalized['Email'].str.lower()
+    return email.where(email != '', normalized['search_key']).astype(object)
+
+
+def _align_previous(previous: pd.DataFrame, keys: pd.Series) -> pd.DataFrame:
+    """
+    Previous output rows reindexed onto keys; rows without a previous result are all NaN
+    """
+    previous = previous.reset_index(drop=True)
+    positions = pd.Series(previous.index, index=row_keys(previous))
+    # The last row wins when a key appears twice in the previous output
+    positions = positions[~positions.index.duplicated(keep='last')]
+    aligned = previous.reindex(positions.reindex(keys.values).fillna(-1).astype(int).values)
+    aligned.index = keys.index
+    return aligned
+
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series('', index=df.index)
+    values = df[column].fillna('').astype(str).str.strip()
+    return values.mask(values.str.lower() == 'nan', '')
+
+
+def plan_refresh(previous: pd.DataFrame, export: pd.DataFrame, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 now: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    Diff a new export against the previous enriched output by row key
+    Returns a frame aligned with the export holding row_key, has_previous,
+    last_enriched_at and reason ('new', 'stale', 'incomplete', or '' if current);
+    timed-out and failed rows count as incomplete
+    """
+    now = now or pd.Timestamp.now()
+    keys = row_keys(export)
+    aligned = _align_previous(previous, keys)
+
+    plan = pd.DataFrame({'row_key': keys}, index=export.index)
+    plan['has_previous'] = aligned.notna().any(axis=1)
+    plan['last_enriched_at'] = pd.to_datetime(_text(aligned, 'last_enriched_at'), errors='coerce')
+
+    stale = plan['last_enriched_at'].isna() | (plan['last_enriched_at'] < now - pd.Timedelta(days=max_age_days))
+    incomplete = pd.concat([_text(aligned, column) == '' for column in REQUIRED_FIELDS], axis=1).any(axis=1)
+    incomplete |= _text(aligned, 'enrichment_status').isin(RETRY_STATUSES)
+    plan['reason'] = np.select([~plan['has_previous'], stale, incomplete],
+                               [REASON_NEW, REASON_STALE, REASON_INCOMPLETE], '')
+
+    # Rows without a name can't be searched, so they are never scheduled
+    plan.loc[~normalize_input_frame(export)['has_name'], 'reason'] = ''
+    return plan
+
+
+def refresh_records(previous: pd.DataFrame, export: pd.DataFrame, plan: pd.DataFrame) -> List[Dict]:
+    """
+    Export rows to re-enrich, never-enriched first and then oldest first
+    URLs found last time are carried over so those rows go straight to the profile
+    """
+    scheduled = plan[plan['reason'] != ''].sort_values('last_enriched_at', na_position='first', kind='stable')
+    records = export.loc[scheduled.index].copy()
+    aligned = _align_previous(previous, scheduled['row_key'])
+    for column in ['linkedin_url', 'additional_linkedin_urls']:
+        current = _text(records, column)
+        records[column] = current.where(current != '', _text(aligned, column))
+    return records.to_dict('records')
+
+
+def merge_refresh(previous: pd.DataFrame, export: pd.DataFrame, plan: pd.DataFrame,
+                  results: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Combine the previous output with freshly enriched rows for the new export
+    A refreshed row replaces the previous one unless the refresh failed to enrich it.
+    Returns (merged, delta); the delta lists new, updated and removed rows with the
+    fields that changed
+    """
+    columns = list(results.columns)
+    aligned = _align_previous(previous, plan['row_key']).reindex(columns=columns)
+
+    fresh = results.copy()
+    fresh.index = row_keys(fresh).values
+    fresh = fresh[~fresh.index.duplicated(keep='last')].reindex(plan['row_key'].values)
+    fresh.index = plan.index
+
+    has_fresh = fresh['enrichment_status'].notna()
+    use_fresh = has_fresh & ((fresh['enrichment_status'] == 'enriched') | ~plan['has_previous'])
+    merged = aligned.where(~use_fresh, fresh)
+
+    # Input columns always come from the new export
+    normalized = normalize_input_frame(export)
+    for column in ['Email'] + NAME_COLUMNS:
+        merged[column] = normalized[column].astype(object)
+    merged = merged[plan['has_previous'] | has_fresh]
+
+    changed = pd.DataFrame({column: _text(merged, column) != _text(aligned.loc[merged.index], column)
+                            for column in COMPARED_FIELDS})
+    change_type = pd.Series(np.where(~plan.loc[merged.index, 'has_previous'], 'new',
+                                     np.where(changed.any(axis=1), 'updated', '')), index=merged.index)
+    delta = merged[change_type != ''].copy()
+    delta.insert(0, 'change_type', change_type[change_type != ''])
+    delta['changed_fields'] = [', '.join(column for column in COMPARED_FIELDS if row[column])
+                               for row in changed.loc[delta.index].to_dict('records')]
+
+    # Rows dropped from the export are reported but not carried into the merged output
+    removed = previous[~row_keys(previous).isin(set(plan['row_key']))].reindex(columns=columns)
+    if len(removed):
+        removed.insert(0, 'change_type', 'removed')
+        removed['changed_fields'] = ''
+        delta = pd.concat([delta, removed], ignore_index=True)
+
+    return merged.reset_index(drop=True), delta.reset_index(drop=True)
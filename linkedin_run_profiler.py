@@ -0,0 +1,208 @@
+import os
+import io
+import glob
+import json
+import pstats
+import cProfile
+import argparse
+import threading
+import statistics
+import logging
+from collections import Counter
+from typing import List
+from urllib.parse import urlparse
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Navigation Timing for the page currently loaded in the driver, in milliseconds
+NAVIGATION_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+return {
+    ttfb_ms: nav.responseStart - nav.requestStart,
+    dom_ready_ms: nav.domContentLoadedEventEnd - nav.startTime,
+    load_ms: nav.loadEventEnd - nav.startTime,
+    transfer_bytes: nav.transferSize
+};
+"""
+
+# Python self time is attributed to the first category whose markers match the
+# function's file path or name; everything else counts as "other Python"
+TIME_CATEGORIES = [
+    ('fixed sleeps', [], ['time.sleep']),
+    ('waiting on browser / network', [], ['_socket.socket', '_ssl._SSLSocket', 'select.', 'selectors']),
+    ('waiting on queues / locks', ['/multiprocessing/', '/queue.py', '/threading.py'], ['_thread.lock', '_thread.RLock', 'posix.read', 'posix.waitpid']),
+    ('WebDriver client', ['/selenium/', '/urllib3/', '/http/client.py'], []),
+    ('HTML parsing', ['/bs4/', '/lxml/', '/soupsieve/'], ['lxml']),
+    ('pandas / numpy', ['/pandas/', '/numpy/', '/pyarrow/'], []),
+    ('SQLite', ['/sqlite3/'], ['sqlite3.']),
+]
+
+
+def enable_performance_logging(chrome_options):
+    """
+    Ask Chrome for the DevTools performance log so network events can be read per page
+    """
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+class WorkerProfiler:
+    """
+    cProfile plus per-page browser timing for one worker
+    The Python profile only covers threads that call start(); page timings are
+    recorded for every page passed to record_page()
+    """
+    def __init__(self, output_dir: str, name: str):
+        self.output_dir = output_dir
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.pages = []
+        self._active_thread = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start(self):
+        """
+        Profile the calling thread until pause() or save()
+        """
+        if self._active_thread is None:
+            self.profile.enable()
+            self._active_thread = threading.get_ident()
+        return self
+
+    def pause(self):
+        # cProfile hooks are per thread, so only the thread that started it can stop it
+        if self._active_thread == threading.get_ident():
+            self.profile.disable()
+            self._active_thread = None
+
+    def record_page(self, driver, kind: str):
+        """
+        Store navigation timing and the network events Chrome logged since the last call
+        """
+        page = {'worker': self.name, 'kind': kind, 'url': '', 'ttfb_ms': None, 'dom_ready_ms': None,
+                'load_ms': None, 'requests': 0, 'failed': 0, 'blocked': []}
+        try:
+            page['url'] = driver.current_url
+            timing = driver.execute_script(NAVIGATION_TIMING_SCRIPT) or {}
+            page.update({key: timing.get(key) for key in ['ttfb_ms', 'dom_ready_ms', 'load_ms']})
+        except Exception as e:
+            logger.debug(f"Could not read navigation timing: {e}")
+
+        try:
+            request_urls = {}
+            for entry in driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                method = message.get('method')
+                params = message.get('params', {})
+                if method == 'Network.requestWillBeSent':
+                    page['requests'] += 1
+                    request_urls[params.get('requestId')] = params.get('request', {}).get('url', '')
+                elif method == 'Network.loadingFailed':
+                    page['failed'] += 1
+                    reason = params.get('blockedReason')
+                    if reason:
+                        host = urlparse(request_urls.get(params.get('requestId'), '')).netloc
+                        page['blocked'].append(f"{host} ({reason})")
+        except Exception as e:
+            logger.debug(f"Could not read the performance log: {e}")
+
+        self.pages.append(page)
+
+    def save(self):
+        """
+        Write the Python profile and page timings for the report
+        """
+        self.pause()
+        try:
+            self.profile.dump_stats(os.path.join(self.output_dir, f"{self.name}-{os.getpid()}.prof"))
+            with open(os.path.join(self.output_dir, f"{self.name}-{os.getpid()}.pages.jsonl"), 'w', encoding='utf-8') as f:
+                for page in self.pages:
+                    f.write(json.dumps(page) + '\n')
+        except Exception as e:
+            logger.warning(f"Could not save profile for {self.name}: {e}")
+
+
+def _categorize(filename: str, function_name: str) -> str:
+    filename = filename.replace('\\', '/')
+    for label, path_markers, name_markers in TIME_CATEGORIES:
+        if any(marker in filename for marker in path_markers) or any(marker in function_name for marker in name_markers):
+            return label
+    return 'other Python'
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _format_ms(values: List[float], fraction: float) -> str:
+    return f"{_percentile(values, fraction):>9.0f}" if values else f"{'-':>9}"
+
+
+def build_report(output_dir: str, top: int = 25) -> str:
+    """
+    Merge every worker's profile and page timings into one report ranked by where time went
+    """
+    lines = [f"=== PROFILE REPORT ({output_dir}) ==="]
+
+    profile_files = sorted(glob.glob(os.path.join(output_dir, '*.prof')))
+    if profile_files:
+        stats = pstats.Stats(*profile_files, stream=io.StringIO())
+
+        # Self time never overlaps, so the categories add up to the total
+        by_category = Counter()
+        for (filename, _, function_name), (_, _, self_time, _, _) in stats.stats.items():
+            by_category[_categorize(filename, function_name)] += self_time
+        total = sum(by_category.values()) or 1
+
+        lines.append(f"\nPython time across {len(profile_files)} processes/threads: {total:.1f}s")
+        for label, seconds in by_category.most_common():
+            lines.append(f"  {label:<32} {seconds:>10.1f}s  {seconds / total:>6.1%}")
+
+        output = io.StringIO()
+        stats.stream = output
+        stats.sort_stats('cumulative').print_stats(top)
+        lines.append(f"\nTop {top} functions by cumulative time:")
+        lines.append(output.getvalue().split('\n', 1)[-1].strip())
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(output_dir, '*.pages.jsonl'))):
+        with open(path, encoding='utf-8') as f:
+            pages.extend(json.loads(line) for line in f if line.strip())
+
+    if pages:
+        lines.append(f"\nBrowser timing over {len(pages)} pages (ms):")
+        lines.append(f"  {'kind':<10} {'pages':>6} {'TTFB p50':>9} {'TTFB p90':>9} {'DOM p50':>9} "
+                     f"{'DOM p90':>9} {'load p50':>9} {'requests':>9} {'failed':>7}")
+        for kind in sorted({page['kind'] for page in pages}):
+            kind_pages = [page for page in pages if page['kind'] == kind]
+            ttfb, dom_ready, load = ([page[key] for page in kind_pages if page.get(key) is not None]
+                                     for key in ['ttfb_ms', 'dom_ready_ms', 'load_ms'])
+            requests = statistics.mean(page['requests'] for page in kind_pages)
+            failed = sum(page['failed'] for page in kind_pages)
+            lines.append(f"  {kind:<10} {len(kind_pages):>6} {_format_ms(ttfb, 0.5)} {_format_ms(ttfb, 0.9)} "
+                         f"{_format_ms(dom_ready, 0.5)} {_format_ms(dom_ready, 0.9)} {_format_ms(load, 0.5)} "
+                         f"{requests:>9.1f} {failed:>7}")
+
+        blocked = Counter(resource for page in pages for resource in page['blocked'])
+        if blocked:
+            lines.append("\nMost blocked resources:")
+            for resource, count in blocked.most_common(10):
+                lines.append(f"  {count:>6}  {resource}")
+
+    report = '\n'.join(lines)
+    with open(os.path.join(output_dir, 'report.txt'), 'w', encoding='utf-8') as f:
+        f.write(report + '\n')
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the report of a profiled run")
+    parser.add_argument("output_dir", help="Directory written by a --profile run")
+    args = parser.parse_args()
+    print(build_report(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import re
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Optional
+from linkedin_cache import normalize_input_frame
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Never-enriched rows first, then the stalest, then the rows with the most input to go on
+PRIORITY_VALUE = 'value'
+# Input file order
+PRIORITY_FILE = 'file'
+PRIORITY_POLICIES = [PRIORITY_VALUE, PRIORITY_FILE]
+
+# Input columns that make a record easier to find; a known URL skips the search entirely
+SIGNAL_WEIGHTS = {'linkedin_url': 4, 'company': 2, 'location': 1, 'Email': 1}
+
+# Weight of the latest record time in the running estimate used near the deadline
+RECORD_TIME_SMOOTHING = 0.3
+
+# Seconds one record may spend on search, page loads and extraction before it is
+# cut short, saved with what it has and marked timed_out for a later run
+DEFAULT_RECORD_TIMEOUT = 120
+
+
+def parse_deadline(deadline: str = None, budget: str = None, now: pd.Timestamp = None) -> Optional[float]:
+    """
+    Deadline as a time.time() value from either a clock time ("09:00", the next one
+    to come, or "2024-05-01 09:00") or a budget from now ("90m", "2h30m")
+    Returns None when neither is given
+    """
+    now = now or pd.Timestamp.now()
+    if budget:
+        return (now + pd.Timedelta(budget)).timestamp()
+    if not deadline:
+        return None
+    if re.fullmatch(r'\d{1,2}:\d{2}', deadline.strip()):
+        target = pd.Timestamp.combine(now.date(), pd.Timestamp(deadline).time())
+        if target <= now:
+            target += pd.Timedelta(days=1)
+        return target.timestamp()
+    return pd.Timestamp(deadline).timestamp()
+
+
+def priority_order(df: pd.DataFrame, policy: str = PRIORITY_VALUE) -> pd.Index:
+    """
+    Index of df in the order records should be worked on under policy
+    With the value policy: rows without last_enriched_at first, then oldest
+    last_enriched_at first, then most input signal, then file order
+    """
+    if policy == PRIORITY_FILE or df.empty:
+        return df.index
+
+    normalized = normalize_input_frame(df)
+    last_enriched = (pd.to_datetime(df['last_enriched_at'], errors='coerce') if 'last_enriched_at' in df.columns
+                     else pd.Series(pd.NaT, index=df.index))
+    signal = sum((normalized[column] != '').astype(int) * weight for column, weight in SIGNAL_WEIGHTS.items())
+
+    order = pd.DataFrame({
+        'enriched_before': last_enriched.notna(),
+        'last_enriched_at': last_enriched,
+        'signal': -signal,
+        'position': np.arange(len(df))
+    }, index=df.index)
+    return order.sort_values(['enriched_before', 'last_enriched_at', 'signal', 'position'], kind='stable').index
+
+
+def priority_reasons(df: pd.DataFrame) -> pd.Series:
+    """
+    'never enriched' or 'stale' for each row, for the remaining-work report
+    """
+    if 'last_enriched_at' not in df.columns:
+        return pd.Series('never enriched', index=df.index)
+    last_enriched = pd.to_datetime(df['last_enriched_at'], errors='coerce')
+    return pd.Series(np.where(last_enriched.isna(), 'never enriched', 'stale'), index=df.index)
+
+
+class DeadlineGuard:
+    """
+    Decides whether another record can start before the deadline
+    Keeps a running estimate of record time, so the last record started is one
+    that is expected to finish in time
+    """
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self.record_seconds = None
+        self._started = None
+
+    def allows_next(self) -> bool:
+        if self.deadline is None:
+            return True
+        return time.time() + (self.record_seconds or 0) < self.deadline
+
+    def start(self):
+        self._started = time.time()
+
+    def finish(self):
+        if self._started is None:
+            return
+        seconds = time.time() - self._started
+        self._started = None
+        if self.record_seconds is None:
+            self.record_seconds = seconds
+        else:
+            self.record_seconds += RECORD_TIME_SMOOTHING * (seconds - self.record_seconds)
+
+
+class RecordTimeoutError(Exception):
+    """
+    Raised when a record has used up its time budget
+    """
+    def __init__(self, stage: str):
+        super().__init__(f"record time budget ran out during {stage}")
+        self.stage = stage
+
+
+class RecordBudget:
+    """
+    Time budget of one record across search, navigation and extraction
+    A budget of None seconds never runs out
+    """
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+        self.started = time.time()
+        self.expires = self.started + seconds if seconds else None
+
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def remaining(self) -> Optional[float]:
+        if self.expires is None:
+            return None
+        return max(self.expires - time.time(), 0.0)
+
+    def expired(self) -> bool:
+        return self.expires is not None and time.time() >= self.expires
+
+    def check(self, stage: str):
+        """
+        Raise RecordTimeoutError if the budget ran out by the end of stage
+        """
+        if self.expired():
+            raise RecordTimeoutError(stage)
+
+
+def report_remaining(remaining: pd.DataFrame, output_file: str = None) -> Optional[str]:
+    """
+    Print what the deadline left undone and save those rows, in priority order, so
+    they can be passed straight to the next run
+    Returns the file written, or None if nothing remains
+    """
+    if remaining.empty:
+        print("\nDeadline: every record finished in time")
+        return None
+
+    if not output_file:
+        output_file = f"linkedin_remaining_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    remaining = remaining.copy()
+    remaining['priority_reason'] = priority_reasons(remaining)
+    remaining.to_csv(output_file, index=False)
+
+    print("\n=== DEADLINE REACHED ===")
+    print(f"Records left: {len(remaining)} {remaining['priority_reason'].value_counts().to_dict()}")
+    print(f"Remaining records saved to: {output_file}")
+    logger.info(f"Deadline reached with {len(remaining)} records left, saved to {output_file}")
+    return output_file
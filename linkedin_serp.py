@@ -0,0 +1,141 @@
+import re
+import logging
+import unicodedata
+import pandas as pd
+from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Tuple
+from linkedin_cache import canonical_profile_url
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Snippets dated further back than this are treated as stale and the profile is visited
+DEFAULT_SNIPPET_MAX_AGE_DAYS = 180
+
+# Result containers and snippet blocks on Google results pages, newest layout first
+RESULT_CONTAINER_CLASSES = ['MjjYud', 'g', 'tF2Cxc']
+SNIPPET_SELECTORS = ['div.VwiC3b', 'div[data-sncf]', 'span.aCOpRe', 'div.IsZvec']
+
+# Title separators Google uses between name, headline and company
+TITLE_SEPARATOR = re.compile(r'\s+[-–—|]\s+')
+
+# Leading date Google puts on some snippets, e.g. "Mar 3, 2023 — "
+SNIPPET_DATE = re.compile(r'^([A-Z][a-z]{2} \d{1,2}, \d{4})\s*[—–-]\s*')
+
+SNIPPET_LABELS = ['Experience', 'Education', 'Location', 'Connections']
+
+
+def _fold(text: str) -> str:
+    """
+    Lowercase ASCII version of a name for comparison
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9 ]', ' ', text.lower()).split())
+
+
+def _result_container(link):
+    for parent in link.parents:
+        classes = parent.get('class') or []
+        if any(name in classes for name in RESULT_CONTAINER_CLASSES):
+            return parent
+    return link.parent
+
+
+def parse_serp_html(html: str) -> List[Dict[str, str]]:
+    """
+    Every LinkedIn profile result on a Google results page with its title and
+    snippet text, in page order, one entry per canonical profile URL
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    results = []
+    seen = set()
+    for link in soup.select("a[href*='linkedin.com/in/']"):
+        url = canonical_profile_url(link.get('href'))
+        if not url or url in seen:
+            continue
+        seen.add(url)
+
+        container = _result_container(link)
+        heading = link.find('h3') or container.find('h3')
+        title = heading.get_text(' ', strip=True) if heading else link.get_text(' ', strip=True)
+
+        snippet = ''
+        for selector in SNIPPET_SELECTORS:
+            element = container.select_one(selector)
+            if element:
+                snippet = element.get_text(' ', strip=True)
+                break
+        results.append({'url': url, 'title': title, 'snippet': snippet})
+    return results
+
+
+def _snippet_labels(snippet: str) -> Dict[str, str]:
+    """
+    "Experience: Acme · Location: Austin" style fields of a snippet
+    """
+    labels = {}
+    for part in re.split(r'\s*·\s*', snippet):
+        for label in SNIPPET_LABELS:
+            if part.startswith(f"{label}:"):
+                labels[label] = part[len(label) + 1:].strip()
+    return labels
+
+
+def parse_snippet(result: Dict[str, str], first_name: str, last_name: str,
+                  max_age_days: float = DEFAULT_SNIPPET_MAX_AGE_DAYS,
+                  now: pd.Timestamp = None) -> Tuple[Optional[Dict[str, str]], str]:
+    """
+    Profile fields from one result's title and snippet
+    Returns (fields, '') when the result names the person and gives both a current
+    title and company, otherwise (None, reason the profile has to be visited)
+    """
+    title = re.sub(r'\s*[|\-–—]\s*LinkedIn\s*$', '', result.get('title', '')).strip()
+    parts = [part.strip() for part in TITLE_SEPARATOR.split(title) if part.strip()]
+    if not parts:
+        return None, 'no title'
+
+    # The result has to be about this person; the first part of the title is the name
+    name = set(_fold(parts[0]).split())
+    if not set(_fold(first_name).split()) <= name or not set(_fold(last_name).split()) <= name:
+        return None, 'name mismatch'
+
+    snippet = result.get('snippet', '')
+    date_match = SNIPPET_DATE.match(snippet)
+    if date_match:
+        snippet = snippet[date_match.end():]
+        dated = pd.to_datetime(date_match.group(1), format='%b %d, %Y', errors='coerce')
+        if pd.notna(dated) and dated < (now or pd.Timestamp.now()) - pd.Timedelta(days=max_age_days):
+            return None, 'stale snippet'
+
+    labels = _snippet_labels(snippet)
+    job_title, company = '', ''
+    if len(parts) >= 3:
+        # "Name - Title - Company"
+        job_title, company = parts[1], parts[2]
+    elif len(parts) == 2 and ' at ' in parts[1]:
+        # "Name - Title at Company"
+        job_title, company = [text.strip() for text in parts[1].rsplit(' at ', 1)]
+    elif len(parts) == 2:
+        # "Name - Company" or "Name - Title"; the snippet's Experience entry tells which
+        if labels.get('Experience') == parts[1]:
+            company = parts[1]
+        else:
+            job_title = parts[1]
+
+    if not company:
+        company = labels.get('Experience', '')
+    elif labels.get('Experience') and _fold(labels['Experience']) != _fold(company):
+        # The title and the snippet disagree about where they work
+        return None, 'conflicting company'
+
+    if not job_title:
+        return None, 'no title'
+    if not company:
+        return None, 'no company'
+
+    return {
+        'headline': f"{job_title} at {company}"[:200],
+        'current_title': job_title,
+        'current_company': company,
+        'location_linkedin': labels.get('Location', '')
+    }, ''
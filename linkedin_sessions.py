@@ -0,0 +1,353 @@
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import logging
+from typing import Dict, List, Optional
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_POOL = "linkedin_sessions.sqlite"
+
+# LinkedIn page loads one session makes per window before it is rested until the window ends,
+# so no single account runs into LinkedIn's per-account throttling
+DEFAULT_MAX_REQUESTS = 80
+DEFAULT_WINDOW_SECONDS = 3600
+
+# Rest after an authwall or login redirect on a session, doubling with each block in a row
+DEFAULT_COOLDOWN_SECONDS = 900
+MAX_COOLDOWN_SECONDS = 6 * 3600
+
+# Longest single wait for a session to come out of its cooldown
+MAX_SESSION_WAIT_SECONDS = 60
+
+STATUS_ACTIVE = 'active'
+# Its cookies no longer log in; it stays out of rotation until added again
+STATUS_EXPIRED = 'expired'
+
+
+class SessionPool:
+    """
+    LinkedIn sessions (stored cookie sets of different accounts) shared by every
+    worker on a machine through SQLite
+    Each worker holds one session at a time, picked among the rested sessions with
+    the fewest holders and requests; request counts and blocks are tracked per
+    session, and a session is rested when it reaches its request limit or is blocked
+    """
+    def __init__(self, path: str = DEFAULT_SESSION_POOL):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                name TEXT PRIMARY KEY,
+                cookies TEXT,
+                status TEXT,
+                window_start REAL DEFAULT 0,
+                window_requests INTEGER DEFAULT 0,
+                total_requests INTEGER DEFAULT 0,
+                total_blocks INTEGER DEFAULT 0,
+                consecutive_blocks INTEGER DEFAULT 0,
+                cooldown_until REAL DEFAULT 0,
+                last_used REAL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS holders (holder TEXT PRIMARY KEY, session TEXT, since REAL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value REAL)")
+        self.conn.commit()
+
+    def _setting(self, key: str, default: float) -> float:
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    @property
+    def limits(self) -> Dict[str, float]:
+        """
+        Request limit, window and cooldown every worker applies to this pool
+        """
+        with self._lock:
+            return {
+                'max_requests': self._setting('max_requests', DEFAULT_MAX_REQUESTS),
+                'window_seconds': self._setting('window_seconds', DEFAULT_WINDOW_SECONDS),
+                'cooldown_seconds': self._setting('cooldown_seconds', DEFAULT_COOLDOWN_SECONDS)
+            }
+
+    def configure(self, max_requests: int = None, window_seconds: float = None, cooldown_seconds: float = None):
+        """
+        Store the pool's limits; unset ones keep their current value
+        """
+        values = {'max_requests': max_requests, 'window_seconds': window_seconds, 'cooldown_seconds': cooldown_seconds}
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                                  [(key, value) for key, value in values.items() if value is not None])
+            self.conn.commit()
+
+    def add(self, name: str, cookies: List[Dict]):
+        """
+        Add a session, or replace its cookies and put it back into rotation
+        """
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO sessions (name, cookies, status) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET cookies = excluded.cookies, status = excluded.status,
+                    consecutive_blocks = 0, cooldown_until = 0
+            """, (name, json.dumps(cookies), STATUS_ACTIVE))
+            self.conn.commit()
+
+    def remove(self, name: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM sessions WHERE name = ?", (name,))
+            self.conn.execute("DELETE FROM holders WHERE session = ?", (name,))
+            self.conn.commit()
+
+    def acquire(self, holder: str, exclude: List[str] = None) -> Optional[Dict]:
+        """
+        Give holder the rested session with the fewest holders, then the fewest
+        requests this window, releasing whatever it held before
+        Returns {'name', 'cookies'}, or None if every session is resting or expired
+        """
+        exclude = list(exclude or [])
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM holders WHERE holder = ?", (holder,))
+                placeholders = ', '.join('?' for _ in exclude)
+                row = self.conn.execute(f"""
+                    SELECT s.name, s.cookies FROM sessions s
+                    LEFT JOIN (SELECT session, COUNT(*) AS holders FROM holders GROUP BY session) h
+                        ON h.session = s.name
+                    WHERE s.status = ? AND s.cooldown_until <= ?
+                        {f'AND s.name NOT IN ({placeholders})' if exclude else ''}
+                    ORDER BY COALESCE(h.holders, 0), s.window_requests, s.last_used
+                    LIMIT 1
+                """, (STATUS_ACTIVE, now, *exclude)).fetchone()
+                if row:
+                    self.conn.execute("INSERT INTO holders VALUES (?, ?, ?)", (holder, row[0], now))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return {'name': row[0], 'cookies': json.loads(row[1])} if row else None
+
+    def release(self, holder: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM holders WHERE holder = ?", (holder,))
+            self.conn.commit()
+
+    def clear_holders(self):
+        """
+        Start a new run: holders left by processes that didn't exit cleanly are dropped
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM holders")
+            self.conn.commit()
+
+    def seconds_until_available(self) -> Optional[float]:
+        """
+        Time until the first resting session is back, or None if no session is active
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(cooldown_until) FROM sessions WHERE status = ?",
+                                    (STATUS_ACTIVE,)).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def record_request(self, name: str) -> bool:
+        """
+        Count one LinkedIn page load on a session
+        Returns False once the session has reached its limit for the window; it
+        then rests until the window ends
+        """
+        limits = self.limits
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT window_start, window_requests FROM sessions WHERE name = ?",
+                                        (name,)).fetchone()
+                if row is None:
+                    self.conn.commit()
+                    return False
+                window_start, window_requests = row
+                if now - window_start >= limits['window_seconds']:
+                    window_start, window_requests = now, 0
+                window_requests += 1
+                exhausted = window_requests >= limits['max_requests']
+                self.conn.execute("""
+                    UPDATE sessions SET window_start = ?, window_requests = ?, total_requests = total_requests + 1,
+                        last_used = ?, cooldown_until = MAX(cooldown_until, ?) WHERE name = ?
+                """, (window_start, window_requests, now,
+                      window_start + limits['window_seconds'] if exhausted else 0, name))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        if exhausted:
+            logger.info(f"Session {name} reached {window_requests} requests, resting it until the window ends")
+        return not exhausted
+
+    def record_block(self, name: str, block_type: str) -> float:
+        """
+        Rest a session after a block, longer for each block in a row
+        Returns the cooldown in seconds
+        """
+        cooldown_seconds = self.limits['cooldown_seconds']
+        with self._lock:
+            row = self.conn.execute("SELECT consecutive_blocks FROM sessions WHERE name = ?", (name,)).fetchone()
+            blocks = (row[0] if row else 0) + 1
+            cooldown = min(MAX_COOLDOWN_SECONDS, cooldown_seconds * (2 ** (blocks - 1)))
+            self.conn.execute("""
+                UPDATE sessions SET consecutive_blocks = ?, total_blocks = total_blocks + 1, cooldown_until = ?
+                WHERE name = ?
+            """, (blocks, time.time() + cooldown, name))
+            self.conn.commit()
+        logger.warning(f"Session {name}: {block_type} ({blocks} in a row), resting it for {cooldown:.0f}s")
+        return cooldown
+
+    def record_success(self, name: str):
+        with self._lock:
+            self.conn.execute("UPDATE sessions SET consecutive_blocks = 0 WHERE name = ? AND consecutive_blocks > 0",
+                              (name,))
+            self.conn.commit()
+
+    def expire(self, name: str):
+        """
+        Take a session whose cookies no longer log in out of rotation
+        """
+        with self._lock:
+            self.conn.execute("UPDATE sessions SET status = ? WHERE name = ?", (STATUS_EXPIRED, name))
+            self.conn.execute("DELETE FROM holders WHERE session = ?", (name,))
+            self.conn.commit()
+        logger.warning(f"Session {name} is no longer logged in, taking it out of rotation")
+
+    def snapshot(self) -> List[Dict]:
+        """
+        Every session with its status, counts, remaining rest and holders
+        """
+        now = time.time()
+        window_seconds = self.limits['window_seconds']
+        with self._lock:
+            holders = dict(self.conn.execute("SELECT session, COUNT(*) FROM holders GROUP BY session").fetchall())
+            rows = self.conn.execute("""
+                SELECT name, status, window_start, window_requests, total_requests, total_blocks, cooldown_until
+                FROM sessions ORDER BY name
+            """).fetchall()
+        return [{
+            'name': name,
+            'status': status,
+            'window_requests': window_requests if now - window_start < window_seconds else 0,
+            'total_requests': total_requests,
+            'total_blocks': total_blocks,
+            'resting_seconds': max(cooldown_until - now, 0.0),
+            'holders': holders.get(name, 0)
+        } for name, status, window_start, window_requests, total_requests, total_blocks, cooldown_until in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def reset_session_holders(path: str = DEFAULT_SESSION_POOL):
+    """
+    Start a new run against a session pool
+    """
+    pool = SessionPool(path)
+    try:
+        pool.clear_holders()
+    finally:
+        pool.close()
+
+
+def capture_session(name: str, path: str = DEFAULT_SESSION_POOL):
+    """
+    Open Chrome, wait for a manual LinkedIn login and store the session's cookies
+    """
+    from selenium.webdriver.chrome.options import Options
+    from linkedin_browser import SeleniumBackend
+    from linkedin_driver_manager import export_session_cookies
+
+    chrome_options = Options()
+    chrome_options.add_argument(f"--user-data-dir=C:/temp/chrome_session_{name}")
+    driver = SeleniumBackend().create_driver(chrome_options)
+    try:
+        driver.get("https://www.linkedin.com/login")
+        input(f"Log in to LinkedIn as '{name}' in the browser window, then press ENTER...")
+        cookies = export_session_cookies(driver)
+    finally:
+        driver.quit()
+
+    if not any(cookie['name'] == 'li_at' for cookie in cookies):
+        print("No LinkedIn session cookie found, the login didn't complete")
+        return
+    pool = SessionPool(path)
+    try:
+        pool.add(name, cookies)
+    finally:
+        pool.close()
+    print(f"Stored session '{name}' ({len(cookies)} cookies) in {path}")
+
+
+def print_sessions(path: str = DEFAULT_SESSION_POOL):
+    pool = SessionPool(path)
+    try:
+        limits = pool.limits
+        sessions = pool.snapshot()
+    finally:
+        pool.close()
+
+    print(f"\n=== SESSION POOL ({path}) ===")
+    print(f"Limit: {limits['max_requests']:.0f} requests per {limits['window_seconds']:.0f}s, "
+          f"cooldown after a block: {limits['cooldown_seconds']:.0f}s")
+    for session in sessions:
+        resting = f"resting {session['resting_seconds']:.0f}s" if session['resting_seconds'] else 'ready'
+        print(f"  {session['name']:<20} {session['status']:<8} {resting:<14} "
+              f"{session['window_requests']:>5} this window  {session['total_requests']:>7} total  "
+              f"{session['total_blocks']:>4} blocks  {session['holders']} workers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the pool of LinkedIn sessions shared by the workers")
+    parser.add_argument('--pool', default=DEFAULT_SESSION_POOL, help="Session pool database")
+    subparsers = parser.add_subparsers(dest='command')
+
+    capture_parser = subparsers.add_parser('capture', help="Log in through Chrome and store the session")
+    capture_parser.add_argument('name')
+
+    add_parser = subparsers.add_parser('add', help="Store a session from a JSON file of exported cookies")
+    add_parser.add_argument('name')
+    add_parser.add_argument('cookies_file')
+
+    remove_parser = subparsers.add_parser('remove', help="Delete a session")
+    remove_parser.add_argument('name')
+
+    limits_parser = subparsers.add_parser('limits', help="Set the per-session request limit and cooldown")
+    limits_parser.add_argument('--max-requests', type=int, help="LinkedIn page loads per session per window")
+    limits_parser.add_argument('--window', type=float, help="Window length in seconds")
+    limits_parser.add_argument('--cooldown', type=float, help="Rest after a block in seconds (doubles per block in a row)")
+
+    subparsers.add_parser('list', help="Show every session's status and counts")
+    args = parser.parse_args()
+
+    if args.command == 'capture':
+        capture_session(args.name, args.pool)
+        return
+    pool = SessionPool(args.pool)
+    try:
+        if args.command == 'add':
+            with open(args.cookies_file, encoding='utf-8') as f:
+                cookies = json.load(f)
+            pool.add(args.name, cookies)
+            print(f"Stored session '{args.name}' ({len(cookies)} cookies)")
+        elif args.command == 'remove':
+            pool.remove(args.name)
+        elif args.command == 'limits':
+            pool.configure(args.max_requests, args.window, args.cooldown)
+    finally:
+        pool.close()
+    print_sessions(args.pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+import logging
+import multiprocessing as mp
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Request budget shared by every process of one stage pool
+    Calls to acquire() are spaced evenly so the whole pool stays under
+    per_minute requests, however many workers it has
+    """
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self._next_slot = mp.Value('d', 0.0)
+
+    def acquire(self) -> float:
+        """
+        Block until this worker's next request slot and return how long it waited
+        """
+        if not self.interval:
+            return 0.0
+        with self._next_slot.get_lock():
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RetryPolicy:
+    """
+    How often and how patiently a stage retries a record
+    Blocks are retried through the worker's circuit breaker, other errors after
+    an exponential backoff
+    """
+    def __init__(self, max_attempts: int = 3, base_delay: float = 5, max_delay: float = 300):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, attempts: int) -> bool:
+        return attempts < self.max_attempts
+
+    def delay(self, attempts: int) -> float:
+        return min(self.max_delay, self.base_delay * (2 ** attempts))
+
+
+class StagePool:
+    """
+    Settings of one stage: how many worker processes, their shared rate budget
+    and their retry policy
+    """
+    def __init__(self, name: str, workers: int, per_minute: float, retry_policy: RetryPolicy):
+        self.name = name
+        self.workers = workers
+        self.rate_limiter = RateLimiter(per_minute)
+        self.retry_policy = retry_policy
+
+    def __repr__(self):
+        return (f"{self.name}: {self.workers} workers, {self.rate_limiter.per_minute}/min, "
+                f"{self.retry_policy.max_attempts} attempts")
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_TELEMETRY_PATH = "linkedin_telemetry.sqlite"
+DEFAULT_STATUS_FILE = "linkedin_status.json"
+
+# Rates are computed over this many trailing seconds
+RATE_WINDOW_SECONDS = 600
+
+# Every record ends in exactly one of these
+OUTCOME_KINDS = ['enriched', 'not_found', 'blocked', 'timed_out', 'failed']
+
+# Events that are counted but don't finish a record
+EVENT_BLOCK = 'block'
+EVENT_ERROR = 'error'
+
+STATE_IDLE = 'idle'
+STATE_SEARCHING = 'searching'
+STATE_PROFILE = 'loading profile'
+STATE_BACKOFF = 'backoff'
+STATE_STOPPED = 'stopped'
+
+
+class Telemetry:
+    """
+    Run telemetry shared by every process on this machine through SQLite
+    Workers record outcomes, blocks and errors and publish their current state;
+    snapshot() aggregates everything into rates and an ETA
+    """
+    def __init__(self, path: str = DEFAULT_TELEMETRY_PATH, worker: str = ''):
+        self.path = path
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS events (ts REAL, worker TEXT, kind TEXT)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS workers (
+                worker TEXT PRIMARY KEY,
+                pid INTEGER,
+                state TEXT,
+                detail TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS run_info (key TEXT PRIMARY KEY, value REAL)")
+        self.conn.commit()
+
+    def start_run(self, total: int, cache_hits: int = 0):
+        """
+        Reset the telemetry for a new run of total input records, cache_hits of
+        which were filled without a worker
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM events")
+            self.conn.execute("DELETE FROM workers")
+            self.conn.execute("DELETE FROM run_info")
+            self.conn.executemany("INSERT INTO run_info VALUES (?, ?)",
+                                  [('started_at', time.time()), ('total', total), ('cache_hits', cache_hits)])
+            self.conn.commit()
+
+    def set_gauge(self, name: str, value: float):
+        """
+        Publish a run-wide value such as a queue length
+        """
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO run_info VALUES (?, ?)", (f"gauge:{name}", value))
+            self.conn.commit()
+
+    def set_state(self, state: str, detail: str = ''):
+        """
+        Publish what this worker is doing right now
+        """
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO workers VALUES (?, ?, ?, ?, ?)",
+                              (self.worker, os.getpid(), state, detail, time.time()))
+            self.conn.commit()
+
+    def record(self, kind: str):
+        """
+        Record one event: a record outcome (OUTCOME_KINDS), a block or an error
+        """
+        with self._lock:
+            self.conn.execute("INSERT INTO events VALUES (?, ?, ?)", (time.time(), self.worker, kind))
+            self.conn.commit()
+
+    def snapshot(self, window_seconds: float = RATE_WINDOW_SECONDS) -> Dict:
+        """
+        Aggregate view of the run across all workers
+        """
+        now = time.time()
+        with self._lock:
+            info = dict(self.conn.execute("SELECT key, value FROM run_info").fetchall())
+            totals = dict(self.conn.execute("SELECT kind, COUNT(*) FROM events GROUP BY kind").fetchall())
+            recent = dict(self.conn.execute("SELECT kind, COUNT(*) FROM events WHERE ts >= ? GROUP BY kind",
+                                            (now - window_seconds,)).fetchall())
+            per_worker = {}
+            for worker, kind, count in self.conn.execute("SELECT worker, kind, COUNT(*) FROM events GROUP BY worker, kind"):
+                per_worker.setdefault(worker, {})[kind] = count
+            worker_rows = self.conn.execute("SELECT worker, pid, state, detail, updated_at FROM workers ORDER BY worker").fetchall()
+
+        started_at = info.get('started_at', now)
+        total = int(info.get('total', 0))
+        cache_hits = int(info.get('cache_hits', 0))
+        processed = sum(totals.get(kind, 0) for kind in OUTCOME_KINDS)
+        recent_processed = sum(recent.get(kind, 0) for kind in OUTCOME_KINDS)
+
+        # Until the window has filled up, the rate is over the time elapsed so far
+        window_minutes = max(min(window_seconds, now - started_at), 1) / 60
+        records_per_minute = recent_processed / window_minutes
+
+        workers = []
+        busy = 0
+        for worker, pid, state, detail, updated_at in worker_rows:
+            counts = per_worker.get(worker, {})
+            if state not in (STATE_IDLE, STATE_STOPPED):
+                busy += 1
+            workers.append({
+                'worker': worker,
+                'pid': pid,
+                'state': state,
+                'detail': detail,
+                'seconds_in_state': round(now - updated_at, 1),
+                'processed': sum(counts.get(kind, 0) for kind in OUTCOME_KINDS),
+                'blocks': counts.get(EVENT_BLOCK, 0),
+                'errors': counts.get(EVENT_ERROR, 0)
+            })
+
+        remaining = max(total - cache_hits - processed, 0)
+        return {
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)),
+            'elapsed_minutes': round((now - started_at) / 60, 1),
+            'total': total,
+            'processed': processed,
+            'outcomes': {kind: totals.get(kind, 0) for kind in OUTCOME_KINDS},
+            'remaining': remaining,
+            'queue_depth': max(remaining - busy, 0),
+            'records_per_minute': round(records_per_minute, 2),
+            'cache_hit_rate': round(cache_hits / total, 3) if total else 0.0,
+            'error_rate': round(recent.get(EVENT_ERROR, 0) / recent_processed, 3) if recent_processed else 0.0,
+            'block_rate': round(recent.get(EVENT_BLOCK, 0) / recent_processed, 3) if recent_processed else 0.0,
+            'eta_minutes': round(remaining / records_per_minute, 1) if records_per_minute else None,
+            'gauges': {key[len('gauge:'):]: value for key, value in info.items() if key.startswith('gauge:')},
+            'workers': workers
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class TelemetryReporter:
+    """
+    Publishes telemetry snapshots from the parent process: rewrites a JSON status
+    file every interval and optionally serves the latest snapshot over local HTTP
+    """
+    def __init__(self, path: str = DEFAULT_TELEMETRY_PATH, status_file: Optional[str] = DEFAULT_STATUS_FILE,
+                 port: Optional[int] = None, interval: float = 10):
+        self.telemetry = Telemetry(path, 'reporter')
+        self.status_file = status_file
+        self.port = port
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if self.port:
+            telemetry = self.telemetry
+
+            class StatusHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = json.dumps(telemetry.snapshot(), indent=2).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.port), StatusHandler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            logger.info(f"Live status at http://127.0.0.1:{self.port}/")
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write_status()
+
+    def write_status(self):
+        if not self.status_file:
+            return
+        try:
+            temp_path = f"{self.status_file}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.telemetry.snapshot(), f, indent=2)
+            os.replace(temp_path, self.status_file)
+        except Exception as e:
+            logger.warning(f"Could not write status file: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.write_status()
+        if self._server:
+            self._server.shutdown()
+        self.telemetry.close()
+
+
+def print_status(snapshot: Dict):
+    """
+    Human-readable version of a telemetry snapshot
+    """
+    print(f"\n=== LIVE STATUS ({snapshot['updated_at']}, {snapshot['elapsed_minutes']} min) ===")
+    print(f"Processed: {snapshot['processed']}/{snapshot['total']}  Remaining: {snapshot['remaining']}  "
+          f"Queue depth: {snapshot['queue_depth']}")
+    print(f"Throughput: {snapshot['records_per_minute']} records/min  ETA: "
+          f"{snapshot['eta_minutes'] if snapshot['eta_minutes'] is not None else 'unknown'} min")
+    print(f"Cache hit rate: {snapshot['cache_hit_rate']:.1%}  Error rate: {snapshot['error_rate']:.1%}  "
+          f"Block rate: {snapshot['block_rate']:.1%}")
+    for name, value in snapshot['gauges'].items():
+        print(f"{name}: {value:g}")
+    for worker in snapshot['workers']:
+        print(f"  {worker['worker']:<24} {worker['state']:<16} {worker['seconds_in_state']:>7}s  "
+              f"done={worker['processed']} blocks={worker['blocks']} errors={worker['errors']}  {worker['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show live enrichment status")
+    parser.add_argument("--path", default=DEFAULT_TELEMETRY_PATH, help="Telemetry database")
+    parser.add_argument("--watch", type=float, default=0, help="Repeat every N seconds")
+    args = parser.parse_args()
+
+    telemetry = Telemetry(args.path, 'viewer')
+    try:
+        print_status(telemetry.snapshot())
+        while args.watch:
+            time.sleep(args.watch)
+            print_status(telemetry.snapshot())
+    finally:
+        telemetry.close()
+
+
+if __name__ == "__main__":
+    main()
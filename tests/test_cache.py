@@ -0,0 +1,69 @@
+import pytest
+
+from linkedin_cache import canonical_profile_url, profile_key
+
+CANONICAL = 'https://www.linkedin.com/in/jane-doe-1a2b3c'
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.linkedin.com/in/jane-doe-1a2b3c',
+    'https://www.linkedin.com/in/jane-doe-1a2b3c/',
+    'http://linkedin.com/in/jane-doe-1a2b3c',
+    'www.linkedin.com/in/jane-doe-1a2b3c',
+    'https://www.linkedin.com/in/Jane-Doe-1A2B3C',
+    ' https://www.linkedin.com/in/jane-doe-1a2b3c \n',
+])
+def test_plain_profile_links(url):
+    assert canonical_profile_url(url) == CANONICAL
+
+
+@pytest.mark.parametrize('url', [
+    'https://uk.linkedin.com/in/jane-doe-1a2b3c',
+    'https://de.linkedin.com/in/jane-doe-1a2b3c/',
+    'https://mobile.linkedin.com/in/jane-doe-1a2b3c',
+    'https://www.linkedin.com/mwlite/in/jane-doe-1a2b3c',
+])
+def test_country_and_mobile_subdomains(url):
+    assert canonical_profile_url(url) == CANONICAL
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.google.com/url?q=https://uk.linkedin.com/in/jane-doe-1a2b3c&sa=U&ved=2ahUKE',
+    '/url?q=https%3A%2F%2Fwww.linkedin.com%2Fin%2Fjane-doe-1a2b3c%2F&sa=U',
+    'https://www.google.com/url?sa=t&url=https://www.linkedin.com/in/jane-doe-1a2b3c',
+])
+def test_google_redirects(url):
+    assert canonical_profile_url(url) == CANONICAL
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.linkedin.com/in/jane-doe-1a2b3c?trk=public_profile&originalSubdomain=uk',
+    'https://www.linkedin.com/in/jane-doe-1a2b3c/?utm_source=share#experience',
+    'https://www.linkedin.com/in/jane-doe-1a2b3c/details/experience/',
+    'https://www.linkedin.com/in/jane-doe-1a2b3c;jsessionid=abc',
+])
+def test_tracking_parameters_and_extra_path(url):
+    assert canonical_profile_url(url) == CANONICAL
+
+
+def test_non_ascii_slug_has_one_spelling():
+    assert canonical_profile_url('https://www.linkedin.com/in/maría-garcía') == \
+        canonical_profile_url('https://www.linkedin.com/in/mar%C3%ADa-garc%C3%ADa/')
+
+
+@pytest.mark.parametrize('url', [
+    '',
+    None,
+    'nan',
+    'https://www.linkedin.com/company/acme',
+    'https://www.linkedin.com/pub/dir/jane/doe',
+    'https://www.google.com/url?q=https://example.com/in/jane',
+    'https://notlinkedin.example/in/jane-doe',
+])
+def test_non_profile_links(url):
+    assert canonical_profile_url(url) == ''
+
+
+def test_profile_key_falls_back_to_the_cleaned_url():
+    assert profile_key('https://uk.linkedin.com/in/jane-doe-1a2b3c?trk=x') == CANONICAL
+    assert profile_key('https://www.linkedin.com/company/Acme/?trk=x') == 'https://www.linkedin.com/company/acme'
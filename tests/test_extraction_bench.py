@@ -0,0 +1,94 @@
+import os
+import json
+import sys
+
+import pytest
+
+import linkedin_extraction_bench
+from linkedin_extraction_bench import DEFAULT_BASELINE, DEFAULT_CORPUS_DIR, compare_to_baseline, run_benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(ROOT, DEFAULT_CORPUS_DIR)
+BASELINE = os.path.join(ROOT, DEFAULT_BASELINE)
+
+
+def report(median_ms=10.0, name=1.0, headline=1.0, version=1):
+    return {'corpus_version': version,
+            'strategies': {'snapshot': {'fields': {'name': name, 'headline': headline}, 'median_ms': median_ms}}}
+
+
+def test_matching_report_passes():
+    assert compare_to_baseline(report(), report(), max_slowdown=0.25) == []
+
+
+def test_lower_accuracy_fails():
+    regressions = compare_to_baseline(report(headline=0.5), report())
+    assert regressions == ['snapshot.headline: accuracy 100% -> 50%']
+
+
+def test_higher_accuracy_passes():
+    assert compare_to_baseline(report(name=1.0), report(name=0.5)) == []
+
+
+@pytest.mark.parametrize('median_ms, passes', [(12.0, True), (12.5, True), (12.6, False), (30.0, False)])
+def test_slowdown_threshold(median_ms, passes):
+    regressions = compare_to_baseline(report(median_ms=median_ms), report(median_ms=10.0), max_slowdown=0.25)
+    assert (regressions == []) is passes
+    if not passes:
+        assert regressions[0].startswith('snapshot: median 10.0ms')
+
+
+def test_speed_is_ignored_without_max_slowdown():
+    assert compare_to_baseline(report(median_ms=1000.0), report(median_ms=10.0)) == []
+
+
+def test_faster_passes():
+    assert compare_to_baseline(report(median_ms=2.0), report(median_ms=10.0), max_slowdown=0.0) == []
+
+
+def test_other_corpus_version_asks_for_a_new_baseline():
+    [regression] = compare_to_baseline(report(version=2), report(version=1))
+    assert 'save a new baseline' in regression
+
+
+def test_strategies_missing_from_the_baseline_are_skipped():
+    baseline = {'corpus_version': 1, 'strategies': {}}
+    assert compare_to_baseline(report(headline=0.0), baseline, max_slowdown=0.0) == []
+
+
+def test_corpus_matches_its_baseline():
+    with open(BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    # Timings depend on the machine, so only accuracy is gated here
+    assert compare_to_baseline(run_benchmark(CORPUS_DIR, repeats=1), baseline) == []
+
+
+def test_gate_exit_status(tmp_path, monkeypatch):
+    with open(BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)
+    path = tmp_path / 'baseline.json'
+
+    def run_gate(*options):
+        monkeypatch.setattr(sys, 'argv', ['linkedin_extraction_bench.py', '--corpus', CORPUS_DIR, '--repeats', '1',
+                                          '--baseline', str(path), *options])
+        linkedin_extraction_bench.main()
+
+    path.write_text(json.dumps(baseline), encoding='utf-8')
+    run_gate()
+
+    # A baseline the corpus can't reach is a regression
+    strategy = next(iter(baseline['strategies'].values()))
+    strategy['fields'] = {field: 1.01 for field in strategy['fields']}
+    path.write_text(json.dumps(baseline), encoding='utf-8')
+    with pytest.raises(SystemExit) as exit_info:
+        run_gate()
+    assert exit_info.value.code == 1
+
+    # And so is a slowdown past --max-slowdown
+    for strategy in baseline['strategies'].values():
+        strategy['fields'] = {}
+        strategy['median_ms'] = 1e-6
+    path.write_text(json.dumps(baseline), encoding='utf-8')
+    with pytest.raises(SystemExit) as exit_info:
+        run_gate('--max-slowdown', '0.25')
+    assert exit_info.value.code == 1
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from linkedin_cache import normalize_input_frame
+from linkedin_identity import DEFAULT_MATCH_CONFIDENCE, IdentityIndex, identity_keys, soundex
+
+JOHN = 'https://www.linkedin.com/in/john-smith-acme'
+ROBERT = 'https://www.linkedin.com/in/robert-jones'
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = IdentityIndex(str(tmp_path / 'cache.sqlite'))
+    index.add({'Email': 'js@a.com', 'first_name': 'John', 'last_name': 'Smith', 'company': 'Acme'}, JOHN)
+    index.add({'Email': '', 'first_name': 'Robert', 'last_name': 'Jones', 'company': 'Initech'}, ROBERT)
+    yield index
+    index.close()
+
+
+def match(index, first_name, last_name, email='', company='', min_confidence=DEFAULT_MATCH_CONFIDENCE):
+    df = pd.DataFrame([{'Email': email, 'first_name': first_name, 'last_name': last_name,
+                        'company': company, 'location': ''}])
+    return index.match(normalize_input_frame(df), min_confidence).iloc[0]
+
+
+def test_email_matches_whatever_the_name(index):
+    row = match(index, 'Jonathan', 'Smythe', email='JS@a.com')
+    assert row['linkedin_url'] == JOHN
+    assert row['match_key'] == 'email:js@a.com'
+    assert row['match_confidence'] == 1.0
+
+
+def test_name_alone_stays_below_the_default_threshold(index):
+    assert match(index, 'John', 'Smith')['linkedin_url'] == ''
+    # It is still a candidate for a lower threshold
+    assert match(index, 'John', 'Smith', min_confidence=0.5)['match_key'] == 'name:john|smith'
+
+
+def test_name_with_agreeing_company_matches(index):
+    row = match(index, 'John', 'Smith', company='ACME')
+    assert row['linkedin_url'] == JOHN
+    assert row['match_key'] == 'name:john|smith'
+
+
+def test_different_company_lowers_the_confidence(index):
+    assert match(index, 'John', 'Smith', company='Globex', min_confidence=0.5)['match_confidence'] == 0.65
+
+
+def test_conflicting_email_is_never_matched(index):
+    assert match(index, 'John', 'Smith', email='other@b.com')['linkedin_url'] == ''
+    assert match(index, 'John', 'Smith', email='other@b.com', company='Acme', min_confidence=0.0)['linkedin_url'] == ''
+
+
+def test_email_on_a_profile_indexed_without_one_is_no_conflict(index):
+    assert match(index, 'Robert', 'Jones', email='rj@initech.com', company='Initech')['linkedin_url'] == ROBERT
+
+
+def test_nickname_needs_the_company(index):
+    assert match(index, 'Bob', 'Jones')['linkedin_url'] == ''
+    row = match(index, 'Bob', 'Jones', company='Initech')
+    assert row['linkedin_url'] == ROBERT
+    assert row['match_key'] == 'nickname:robert|jones'
+
+
+def test_phonetic_needs_the_company(index):
+    assert soundex('smyth') == soundex('smith')
+    assert match(index, 'Jon', 'Smyth')['linkedin_url'] == ''
+    row = match(index, 'Jon', 'Smyth', company='Acme')
+    assert row['linkedin_url'] == JOHN
+    assert row['match_key'].startswith('phonetic:')
+
+
+def test_close_candidates_are_ambiguous(index):
+    index.add({'Email': '', 'first_name': 'John', 'last_name': 'Smith', 'company': 'Acme'},
+              'https://www.linkedin.com/in/another-john-smith')
+    assert match(index, 'John', 'Smith', company='Acme')['linkedin_url'] == ''
+
+
+def test_clear_winner_is_not_ambiguous(index):
+    index.add({'Email': '', 'first_name': 'John', 'last_name': 'Smith', 'company': 'Globex'},
+              'https://www.linkedin.com/in/another-john-smith')
+    assert match(index, 'John', 'Smith', company='Acme')['linkedin_url'] == JOHN
+
+
+def test_identity_keys_cover_nicknames_and_double_surnames():
+    keys = identity_keys('J. Bob', 'García-López Jr.')
+    assert 'name:bob|garcia lopez' in keys
+    assert 'nickname:robert|garcia lopez' in keys
+    assert 'nickname:robert|lopez' in keys
@@ -0,0 +1,174 @@
+import time
+
+import pytest
+
+from linkedin_job_store import DONE, FAILED, LEASED, PENDING, InMemoryJobStore, SQLiteJobStore, open_job_store
+
+RECORDS = [
+    {'Email': 'ada@example.com', 'first_name': 'Ada', 'last_name': 'Lovelace', 'company': 'Analytical', 'location': 'London'},
+    {'Email': '', 'first_name': 'Alan', 'last_name': 'Turing', 'company': 'Bletchley', 'location': 'Bletchley'},
+    {'Email': 'grace@example.com', 'first_name': 'Grace', 'last_name': 'Hopper', 'company': 'Navy', 'location': 'Arlington'},
+]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    store = InMemoryJobStore() if request.param == 'memory' else SQLiteJobStore(str(tmp_path / 'jobs.sqlite'))
+    yield store
+    store.close()
+
+
+def wait_for_expiry():
+    time.sleep(0.05)
+
+
+def test_enqueue_skips_records_already_queued(store):
+    assert store.enqueue(RECORDS) == 3
+    assert store.enqueue(RECORDS) == 0
+    # The email decides identity, whatever its case or the other fields say
+    assert store.enqueue([{**RECORDS[0], 'Email': 'ADA@example.com ', 'company': 'Other'}]) == 0
+    assert store.progress()['total'] == 3
+
+
+def test_enqueue_with_results_marks_records_done(store):
+    assert store.enqueue(RECORDS[:2], results=[{'Email': 'ada@example.com'}, None]) == 2
+    progress = store.progress()
+    assert progress[DONE] == 1
+    assert progress[PENDING] == 1
+    assert [job['record']['first_name'] for job in store.claim('worker-a', limit=5)] == ['Alan']
+
+
+def test_claim_leases_in_queue_order_without_double_claims(store):
+    store.enqueue(RECORDS)
+    first = store.claim('worker-a', limit=2)
+    second = store.claim('worker-b', limit=2)
+    assert [job['record']['first_name'] for job in first] == ['Ada', 'Alan']
+    assert [job['record']['first_name'] for job in second] == ['Grace']
+    assert all(job['attempts'] == 1 for job in first + second)
+    assert store.progress()['active_owners'] == {'worker-a': 2, 'worker-b': 1}
+
+
+def test_expired_lease_is_claimable_by_another_worker(store):
+    store.enqueue(RECORDS[:1])
+    [job] = store.claim('worker-a', lease_seconds=0.01)
+    assert store.claim('worker-b') == []
+    wait_for_expiry()
+    [reclaimed] = store.claim('worker-b')
+    assert reclaimed['job_id'] == job['job_id']
+    assert reclaimed['attempts'] == 2
+    # The first worker no longer holds the lease
+    assert store.heartbeat('worker-a', [job['job_id']]) == 0
+    assert store.heartbeat('worker-b', [job['job_id']]) == 1
+
+
+def test_heartbeat_keeps_a_lease_from_expiring(store):
+    store.enqueue(RECORDS[:1])
+    [job] = store.claim('worker-a', lease_seconds=0.01)
+    assert store.heartbeat('worker-a', [job['job_id']], lease_seconds=60) == 1
+    wait_for_expiry()
+    assert store.reclaim_expired() == 0
+    assert store.claim('worker-b') == []
+
+
+def test_reclaim_expired_returns_jobs_to_the_queue(store):
+    store.enqueue(RECORDS[:2])
+    store.claim('worker-a', limit=2, lease_seconds=0.01)
+    assert store.progress()[LEASED] == 2
+    wait_for_expiry()
+    assert store.reclaim_expired() == 2
+    progress = store.progress()
+    assert progress[PENDING] == 2
+    assert progress['active_owners'] == {}
+
+
+def test_reclaim_fails_jobs_that_used_up_their_attempts(store):
+    store.enqueue(RECORDS[:1])
+    for _ in range(2):
+        assert store.claim('worker-a', lease_seconds=0.01, max_attempts=2)
+        wait_for_expiry()
+    assert store.reclaim_expired(max_attempts=2) == 1
+    assert store.progress()[FAILED] == 1
+    assert store.claim('worker-b', max_attempts=2) == []
+
+
+def test_release_gives_a_job_back_or_fails_it(store):
+    store.enqueue(RECORDS[:1])
+    [job] = store.claim('worker-a', max_attempts=2)
+    # Only the lease holder can release it
+    store.release(job['job_id'], 'worker-b', max_attempts=2)
+    assert store.progress()[LEASED] == 1
+    store.release(job['job_id'], 'worker-a', max_attempts=2)
+    assert store.progress()[PENDING] == 1
+    [job] = store.claim('worker-a', max_attempts=2)
+    store.release(job['job_id'], 'worker-a', max_attempts=2)
+    assert store.progress()[FAILED] == 1
+
+
+def test_complete_is_idempotent(store):
+    store.enqueue(RECORDS)
+    [job] = store.claim('worker-a', lease_seconds=0.01)
+    wait_for_expiry()
+    [again] = store.claim('worker-b')
+    assert again['job_id'] == job['job_id']
+
+    # Both workers finish the record; only the first result is kept
+    assert store.complete(job['job_id'], 'worker-b', {'Email': 'ada@example.com', 'worker': 'b'}) is True
+    assert store.complete(job['job_id'], 'worker-a', {'Email': 'ada@example.com', 'worker': 'a'}) is False
+    assert store.results() == [{'Email': 'ada@example.com', 'worker': 'b'}]
+    assert store.progress()[DONE] == 1
+    assert store.complete('unknown', 'worker-a', {}) is False
+
+
+def test_results_follow_queue_order(store):
+    store.enqueue(RECORDS)
+    jobs = store.claim('worker-a', limit=3)
+    for job in reversed(jobs):
+        store.complete(job['job_id'], 'worker-a', {'first_name': job['record']['first_name']})
+    assert [result['first_name'] for result in store.results()] == ['Ada', 'Alan', 'Grace']
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite')
+    host_a, host_b = SQLiteJobStore(path), open_job_store(path)
+    try:
+        host_a.enqueue(RECORDS)
+        claimed = host_a.claim('host-a', limit=2) + host_b.claim('host-b', limit=2)
+        assert sorted(job['record']['first_name'] for job in claimed) == ['Ada', 'Alan', 'Grace']
+    finally:
+        host_a.close()
+        host_b.close()
+
+
+def test_open_job_store_memory():
+    assert isinstance(open_job_store(':memory:'), InMemoryJobStore)
+
+
+def test_failed_jobs_are_exported_with_their_last_result(store):
+    store.enqueue(RECORDS)
+    ada, alan, grace = store.claim('worker-a', limit=3, max_attempts=1)
+    store.complete(ada['job_id'], 'worker-a', {'first_name': 'Ada', 'enrichment_status': 'enriched'})
+    store.release(alan['job_id'], 'worker-a', max_attempts=1,
+                  result={'first_name': 'Alan', 'enrichment_status': 'blocked'})
+    # No attempt produced a result: the input record stands in for it
+    store.release(grace['job_id'], 'worker-a', max_attempts=1)
+    assert store.results() == [
+        {'first_name': 'Ada', 'enrichment_status': 'enriched'},
+        {'first_name': 'Alan', 'enrichment_status': 'blocked'},
+        {**RECORDS[2], 'enrichment_status': 'failed'},
+    ]
+
+
+def test_released_result_survives_a_later_reclaim(store):
+    store.enqueue(RECORDS[:1])
+    [job] = store.claim('worker-a', max_attempts=2)
+    store.release(job['job_id'], 'worker-a', max_attempts=2, result={'first_name': 'Ada', 'enrichment_status': 'failed'})
+    store.claim('worker-b', lease_seconds=0.01, max_attempts=2)
+    wait_for_expiry()
+    assert store.reclaim_expired(max_attempts=2) == 1
+    assert store.results() == [{'first_name': 'Ada', 'enrichment_status': 'failed'}]
+
+
+def test_sqlite_store_refuses_an_old_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr('linkedin_job_store.sqlite3.sqlite_version_info', (3, 31, 1))
+    with pytest.raises(RuntimeError, match='3.35.0'):
+        SQLiteJobStore(str(tmp_path / 'jobs.sqlite'))
@@ -0,0 +1,164 @@
+import pandas as pd
+
+from linkedin_refresh import (REASON_INCOMPLETE, REASON_NEW, REASON_STALE, merge_refresh, plan_refresh,
+                              refresh_records, row_keys)
+
+NOW = pd.Timestamp('2026-06-30 12:00')
+RECENT = '2026-06-20 09:00:00'
+OLD = '2026-01-05 09:00:00'
+
+COLUMNS = ['Email', 'first_name', 'last_name', 'company', 'location', 'linkedin_url', 'headline', 'current_title',
+           'current_company', 'location_linkedin', 'industry_linkedin', 'education', 'experience',
+           'last_enriched_at', 'additional_linkedin_urls', 'description', 'enrichment_status']
+
+
+def person(email, first_name, last_name, company='Acme', **fields):
+    return {'Email': email, 'first_name': first_name, 'last_name': last_name, 'company': company,
+            'location': 'Austin', **fields}
+
+
+def enriched(email, first_name, last_name, title='Engineer', last_enriched_at=RECENT, status='enriched', **fields):
+    row = {column: '' for column in COLUMNS}
+    row.update(person(email, first_name, last_name))
+    row.update(linkedin_url=f'https://www.linkedin.com/in/{first_name.lower()}', current_title=title,
+               current_company='Acme', last_enriched_at=last_enriched_at, enrichment_status=status)
+    row.update(fields)
+    return row
+
+
+def frame(rows):
+    return pd.DataFrame(rows)
+
+
+def reasons(plan, export):
+    return dict(zip(export['first_name'], plan['reason']))
+
+
+def test_row_keys_use_email_then_name():
+    keys = row_keys(frame([person(' Ada@Example.com ', 'Ada', 'Lovelace'), person('', 'Alan', 'Turing')]))
+    assert list(keys) == ['ada@example.com', 'alan|turing|acme|austin']
+
+
+def test_plan_reasons():
+    previous = frame([
+        enriched('ada@example.com', 'Ada', 'Lovelace'),
+        enriched('grace@example.com', 'Grace', 'Hopper', last_enriched_at=OLD),
+        enriched('alan@example.com', 'Alan', 'Turing', title=''),
+        enriched('edsger@example.com', 'Edsger', 'Dijkstra', status='timed_out'),
+        enriched('barbara@example.com', 'Barbara', 'Liskov', status='failed'),
+    ])
+    export = frame([
+        person('ADA@example.com', 'Ada', 'Lovelace'),
+        person('grace@example.com', 'Grace', 'Hopper'),
+        person('alan@example.com', 'Alan', 'Turing'),
+        person('edsger@example.com', 'Edsger', 'Dijkstra'),
+        person('barbara@example.com', 'Barbara', 'Liskov'),
+        person('ken@example.com', 'Ken', 'Thompson'),
+    ])
+    plan = plan_refresh(previous, export, max_age_days=30, now=NOW)
+    assert reasons(plan, export) == {'Ada': '', 'Grace': REASON_STALE, 'Alan': REASON_INCOMPLETE,
+                                     'Edsger': REASON_INCOMPLETE, 'Barbara': REASON_INCOMPLETE, 'Ken': REASON_NEW}
+    assert list(plan['has_previous']) == [True] * 5 + [False]
+
+
+def test_stale_takes_precedence_over_incomplete():
+    previous = frame([enriched('ada@example.com', 'Ada', 'Lovelace', title='', last_enriched_at=OLD)])
+    export = frame([person('ada@example.com', 'Ada', 'Lovelace')])
+    assert plan_refresh(previous, export, now=NOW)['reason'].tolist() == [REASON_STALE]
+
+
+def test_missing_or_unparseable_date_is_stale():
+    previous = frame([enriched('ada@example.com', 'Ada', 'Lovelace', last_enriched_at=''),
+                      enriched('alan@example.com', 'Alan', 'Turing', last_enriched_at='not a date')])
+    export = frame([person('ada@example.com', 'Ada', 'Lovelace'), person('alan@example.com', 'Alan', 'Turing')])
+    assert plan_refresh(previous, export, now=NOW)['reason'].tolist() == [REASON_STALE, REASON_STALE]
+
+
+def test_rows_without_email_line_up_by_name():
+    previous = frame([enriched('', 'Alan', 'Turing')])
+    export = frame([person('', 'alan', 'TURING'), person('', 'Alan', 'Turing', company='Other')])
+    assert plan_refresh(previous, export, now=NOW)['reason'].tolist() == ['', REASON_NEW]
+
+
+def test_last_previous_row_wins_for_a_repeated_key():
+    previous = frame([enriched('ada@example.com', 'Ada', 'Lovelace', last_enriched_at=OLD),
+                      enriched('ada@example.com', 'Ada', 'Lovelace')])
+    export = frame([person('ada@example.com', 'Ada', 'Lovelace')])
+    assert plan_refresh(previous, export, now=NOW)['reason'].tolist() == ['']
+
+
+def test_rows_without_a_name_are_never_scheduled():
+    export = frame([person('nobody@example.com', '', 'Lovelace')])
+    assert plan_refresh(frame([enriched('x@example.com', 'X', 'Y')]), export, now=NOW)['reason'].tolist() == ['']
+
+
+def test_refresh_records_order_and_carried_urls():
+    previous = frame([
+        enriched('grace@example.com', 'Grace', 'Hopper', last_enriched_at='2026-03-01 00:00:00'),
+        enriched('alan@example.com', 'Alan', 'Turing', last_enriched_at=OLD,
+                 additional_linkedin_urls='https://www.linkedin.com/in/alan-2'),
+    ])
+    export = frame([person('grace@example.com', 'Grace', 'Hopper'), person('alan@example.com', 'Alan', 'Turing'),
+                    person('ken@example.com', 'Ken', 'Thompson')])
+    plan = plan_refresh(previous, export, now=NOW)
+    records = refresh_records(previous, export, plan)
+    # Never enriched first, then oldest first
+    assert [record['first_name'] for record in records] == ['Ken', 'Alan', 'Grace']
+    assert records[0]['linkedin_url'] == ''
+    assert records[1]['linkedin_url'] == 'https://www.linkedin.com/in/alan'
+    assert records[1]['additional_linkedin_urls'] == 'https://www.linkedin.com/in/alan-2'
+
+
+def run_merge(previous_rows, export_rows, result_rows):
+    previous, export = frame(previous_rows), frame(export_rows)
+    plan = plan_refresh(previous, export, now=NOW)
+    return merge_refresh(previous, export, plan, pd.DataFrame(result_rows, columns=COLUMNS))
+
+
+def test_merge_replaces_enriched_rows_and_reports_changes():
+    merged, delta = run_merge(
+        [enriched('ada@example.com', 'Ada', 'Lovelace', last_enriched_at=OLD),
+         enriched('alan@example.com', 'Alan', 'Turing')],
+        [person('ada@example.com', 'Ada', 'Lovelace'), person('alan@example.com', 'Alan', 'Turing')],
+        [enriched('ada@example.com', 'Ada', 'Lovelace', title='Director', last_enriched_at=RECENT)])
+    assert merged['current_title'].tolist() == ['Director', 'Engineer']
+    assert delta['change_type'].tolist() == ['updated']
+    assert delta.loc[0, 'changed_fields'] == 'current_title'
+
+
+def test_merge_keeps_the_previous_row_when_the_refresh_failed():
+    merged, delta = run_merge(
+        [enriched('ada@example.com', 'Ada', 'Lovelace', last_enriched_at=OLD)],
+        [person('ada@example.com', 'Ada', 'Lovelace')],
+        [enriched('ada@example.com', 'Ada', 'Lovelace', title='', status='blocked', linkedin_url='')])
+    assert merged.loc[0, 'current_title'] == 'Engineer'
+    assert merged.loc[0, 'enrichment_status'] == 'enriched'
+    assert delta.empty
+
+
+def test_merge_adds_new_rows_even_when_they_failed():
+    merged, delta = run_merge(
+        [],
+        [person('ken@example.com', 'Ken', 'Thompson')],
+        [enriched('ken@example.com', 'Ken', 'Thompson', title='', status='not_found', linkedin_url='')])
+    assert merged['enrichment_status'].tolist() == ['not_found']
+    assert delta['change_type'].tolist() == ['new']
+
+
+def test_merge_reports_removed_rows_without_keeping_them():
+    merged, delta = run_merge(
+        [enriched('ada@example.com', 'Ada', 'Lovelace'), enriched('alan@example.com', 'Alan', 'Turing')],
+        [person('ada@example.com', 'Ada', 'Lovelace')],
+        [])
+    assert merged['first_name'].tolist() == ['Ada']
+    assert delta['change_type'].tolist() == ['removed']
+    assert delta.loc[0, 'Email'] == 'alan@example.com'
+
+
+def test_merge_takes_input_columns_from_the_new_export():
+    merged, _ = run_merge(
+        [enriched('ada@example.com', 'Ada', 'Lovelace')],
+        [person('ada@example.com', 'Ada', 'Lovelace', company='Analytical Engines')],
+        [])
+    assert merged.loc[0, 'company'] == 'Analytical Engines'
+    assert merged.loc[0, 'current_title'] == 'Engineer'
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+import linkedin_schedule
+from linkedin_schedule import (PRIORITY_FILE, PRIORITY_VALUE, RECORD_TIME_SMOOTHING, DeadlineGuard, parse_deadline,
+                               priority_order)
+
+
+def records(*rows):
+    columns = ['Email', 'first_name', 'last_name', 'company', 'location', 'linkedin_url', 'last_enriched_at']
+    return pd.DataFrame([dict(zip(columns, row)) for row in rows], index=[f'r{i}' for i in range(len(rows))])
+
+
+def test_file_policy_keeps_input_order():
+    df = records(('', 'A', 'A', '', '', '', '2026-01-01'), ('', 'B', 'B', '', '', '', ''))
+    assert list(priority_order(df, PRIORITY_FILE)) == ['r0', 'r1']
+
+
+def test_value_policy_puts_never_enriched_first_then_oldest():
+    df = records(
+        ('', 'A', 'A', '', '', '', '2026-03-01'),
+        ('', 'B', 'B', '', '', '', ''),
+        ('', 'C', 'C', '', '', '', '2025-11-15'),
+        ('', 'D', 'D', '', '', '', 'not a date'),
+    )
+    assert list(priority_order(df, PRIORITY_VALUE)) == ['r1', 'r3', 'r2', 'r0']
+
+
+def test_value_policy_breaks_ties_by_input_signal_then_file_order():
+    df = records(
+        ('', 'A', 'A', '', '', '', ''),
+        ('a@x.com', 'B', 'B', '', 'Austin', '', ''),
+        ('', 'C', 'C', 'Acme', '', '', ''),
+        ('', 'D', 'D', '', '', 'https://www.linkedin.com/in/d', ''),
+        ('', 'E', 'E', 'Acme', '', '', ''),
+    )
+    # Known URL 4, company 2, email + location 2 (then file order), nothing 0
+    assert list(priority_order(df, PRIORITY_VALUE)) == ['r3', 'r1', 'r2', 'r4', 'r0']
+
+
+def test_value_policy_without_last_enriched_column():
+    df = records(('', 'A', 'A', '', '', '', ''), ('', 'B', 'B', 'Acme', '', '', '')).drop(columns='last_enriched_at')
+    assert list(priority_order(df, PRIORITY_VALUE)) == ['r1', 'r0']
+
+
+def test_empty_frame():
+    assert list(priority_order(records(), PRIORITY_VALUE)) == []
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(linkedin_schedule.time, 'time', clock)
+    return clock
+
+
+def test_no_deadline_always_allows(clock):
+    guard = DeadlineGuard(None)
+    clock.now += 1e9
+    assert guard.allows_next()
+
+
+def test_first_record_starts_while_before_the_deadline(clock):
+    guard = DeadlineGuard(clock.now + 10)
+    assert guard.allows_next()
+    clock.now += 10
+    assert not guard.allows_next()
+
+
+def test_record_time_estimate_keeps_the_last_record_in_time(clock):
+    guard = DeadlineGuard(clock.now + 100)
+    guard.start()
+    clock.now += 30
+    guard.finish()
+    assert guard.record_seconds == 30
+    # 60s left and a 30s record fits; with 25s left it wouldn't
+    clock.now += 10
+    assert guard.allows_next()
+    clock.now += 35
+    assert not guard.allows_next()
+
+
+def test_record_time_estimate_is_smoothed(clock):
+    guard = DeadlineGuard(clock.now + 1000)
+    for seconds in [10, 20]:
+        guard.start()
+        clock.now += seconds
+        guard.finish()
+    assert guard.record_seconds == pytest.approx(10 + RECORD_TIME_SMOOTHING * 10)
+
+
+def test_finish_without_start_is_ignored(clock):
+    guard = DeadlineGuard(clock.now + 100)
+    guard.finish()
+    assert guard.record_seconds is None
+
+
+def test_parse_deadline():
+    now = pd.Timestamp('2026-06-30 10:00')
+    assert parse_deadline(budget='90m', now=now) == pd.Timestamp('2026-06-30 11:30').timestamp()
+    assert parse_deadline('09:00', now=now) == pd.Timestamp('2026-07-01 09:00').timestamp()
+    assert parse_deadline('11:00', now=now) == pd.Timestamp('2026-06-30 11:00').timestamp()
+    assert parse_deadline(now=now) is None
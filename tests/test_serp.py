@@ -0,0 +1,111 @@
+import pandas as pd
+
+from linkedin_serp import parse_serp_html, parse_snippet
+
+NOW = pd.Timestamp('2026-06-30')
+URL = 'https://www.linkedin.com/in/jane-doe'
+
+
+def snippet(title, text=''):
+    return {'url': URL, 'title': title, 'snippet': text}
+
+
+def parse(result, first_name='Jane', last_name='Doe', **kwargs):
+    return parse_snippet(result, first_name, last_name, now=NOW, **kwargs)
+
+
+def test_name_title_company():
+    fields, reason = parse(snippet('Jane Doe - Data Engineer - Acme Corp | LinkedIn',
+                                   'Experience: Acme Corp · Location: Austin, Texas · 500+ connections'))
+    assert reason == ''
+    assert fields == {'headline': 'Data Engineer at Acme Corp', 'current_title': 'Data Engineer',
+                      'current_company': 'Acme Corp', 'location_linkedin': 'Austin, Texas'}
+
+
+def test_title_at_company():
+    fields, reason = parse(snippet('Jane Doe – Senior Analyst at Globex - LinkedIn'))
+    assert reason == ''
+    assert fields['current_title'] == 'Senior Analyst'
+    assert fields['current_company'] == 'Globex'
+    assert fields['location_linkedin'] == ''
+
+
+def test_title_at_company_splits_on_the_last_at():
+    fields, _ = parse(snippet('Jane Doe - Head of Look at Me Inc at Initech | LinkedIn'))
+    assert fields['current_title'] == 'Head of Look at Me Inc'
+    assert fields['current_company'] == 'Initech'
+
+
+def test_name_company_uses_the_experience_entry():
+    # The second title part is the company when the snippet's Experience says so; no title then
+    assert parse(snippet('Jane Doe - Acme Corp | LinkedIn', 'Experience: Acme Corp'))[1] == 'no title'
+
+
+def test_name_title_takes_the_company_from_the_snippet():
+    fields, reason = parse(snippet('Jane Doe - Product Manager | LinkedIn', 'Experience: Acme Corp · Location: Austin'))
+    assert reason == ''
+    assert fields['current_title'] == 'Product Manager'
+    assert fields['current_company'] == 'Acme Corp'
+
+
+def test_name_mismatch():
+    assert parse(snippet('John Doe - Engineer - Acme | LinkedIn')) == (None, 'name mismatch')
+    assert parse(snippet('Jane Smith - Engineer - Acme | LinkedIn')) == (None, 'name mismatch')
+
+
+def test_name_match_ignores_accents_case_and_middle_names():
+    fields, reason = parse(snippet('JOSÉ A. GARCÍA - Engineer - Acme | LinkedIn'), 'Jose', 'Garcia')
+    assert reason == ''
+    assert fields['current_company'] == 'Acme'
+
+
+def test_conflicting_company():
+    result = snippet('Jane Doe - Engineer - Acme | LinkedIn', 'Experience: Globex · Location: Austin')
+    assert parse(result) == (None, 'conflicting company')
+
+
+def test_company_comparison_ignores_case_and_punctuation():
+    fields, reason = parse(snippet('Jane Doe - Engineer - Acme, Inc. | LinkedIn', 'Experience: ACME Inc'))
+    assert reason == ''
+    assert fields['current_company'] == 'Acme, Inc.'
+
+
+def test_no_company():
+    assert parse(snippet('Jane Doe - Engineer | LinkedIn', 'Location: Austin')) == (None, 'no company')
+
+
+def test_no_title():
+    assert parse(snippet('')) == (None, 'no title')
+    assert parse(snippet('Jane Doe | LinkedIn')) == (None, 'no title')
+
+
+def test_stale_snippet():
+    result = snippet('Jane Doe - Engineer - Acme | LinkedIn', 'Mar 3, 2025 — Experience: Acme')
+    assert parse(result, max_age_days=180) == (None, 'stale snippet')
+
+
+def test_recent_snippet_drops_the_date():
+    fields, reason = parse(snippet('Jane Doe - Engineer - Acme | LinkedIn', 'Jun 1, 2026 — Experience: Acme'),
+                           max_age_days=180)
+    assert reason == ''
+    assert fields['current_company'] == 'Acme'
+
+
+def test_undated_snippet_is_not_stale():
+    fields, reason = parse(snippet('Jane Doe - Engineer - Acme | LinkedIn', 'Experience: Acme'), max_age_days=0)
+    assert reason == ''
+
+
+def test_parse_serp_html_reads_results_in_order_once_each():
+    html = """<html><body>
+    <div class="MjjYud"><a href="/url?q=https://uk.linkedin.com/in/jane-doe&amp;sa=U"><h3>Jane Doe - Engineer - Acme</h3></a>
+        <div class="VwiC3b">Experience: Acme · Location: London</div></div>
+    <div class="MjjYud"><a href="https://www.linkedin.com/in/jane-doe-2?trk=x"><h3>Jane Doe - Nurse</h3></a></div>
+    <div class="MjjYud"><a href="https://www.linkedin.com/in/jane-doe/"><h3>Duplicate</h3></a></div>
+    <div class="MjjYud"><a href="https://www.linkedin.com/company/acme"><h3>Acme</h3></a></div>
+    </body></html>"""
+    results = parse_serp_html(html)
+    assert results == [
+        {'url': URL, 'title': 'Jane Doe - Engineer - Acme', 'snippet': 'Experience: Acme · Location: London'},
+        {'url': 'https://www.linkedin.com/in/jane-doe-2', 'title': 'Jane Doe - Nurse', 'snippet': ''},
+    ]
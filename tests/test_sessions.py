@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from linkedin_browser import FakeSessionAuthority
+from linkedin_sessions import MAX_COOLDOWN_SECONDS, STATUS_EXPIRED, SessionPool
+
+
+def cookies(name):
+    return [{'name': 'li_at', 'value': f'token-{name}', 'domain': '.www.linkedin.com', 'path': '/'}]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SessionPool(str(tmp_path / 'sessions.sqlite'))
+    for name in ['alpha', 'beta', 'gamma']:
+        pool.add(name, cookies(name))
+    yield pool
+    pool.close()
+
+
+def resting(pool):
+    return {session['name'] for session in pool.snapshot() if session['resting_seconds'] > 0}
+
+
+def test_acquire_spreads_workers_over_sessions(pool):
+    held = [pool.acquire(f'worker-{i}')['name'] for i in range(3)]
+    assert sorted(held) == ['alpha', 'beta', 'gamma']
+    # A fourth worker shares the session with the fewest requests this window
+    pool.record_request('alpha')
+    pool.record_request('beta')
+    assert pool.acquire('worker-3')['name'] == 'gamma'
+    assert {session['name']: session['holders'] for session in pool.snapshot()} == {'alpha': 1, 'beta': 1, 'gamma': 2}
+
+
+def test_acquire_returns_the_stored_cookies(pool):
+    session = pool.acquire('worker-0')
+    assert session['cookies'] == cookies(session['name'])
+
+
+def test_rotation_moves_a_worker_to_another_session(pool):
+    first = pool.acquire('worker-0')['name']
+    second = pool.acquire('worker-0', exclude=[first])['name']
+    assert second != first
+    # Acquiring again releases what the worker held before
+    assert {session['name']: session['holders'] for session in pool.snapshot()}[first] == 0
+
+
+def test_session_rests_at_its_request_limit(pool):
+    pool.configure(max_requests=3, window_seconds=60)
+    assert [pool.record_request('alpha') for _ in range(3)] == [True, True, False]
+    assert resting(pool) == {'alpha'}
+    held = {pool.acquire(f'worker-{i}')['name'] for i in range(4)}
+    assert held == {'beta', 'gamma'}
+
+
+def test_request_window_resets(pool):
+    pool.configure(max_requests=2, window_seconds=0.05)
+    assert pool.record_request('alpha') is True
+    time.sleep(0.1)
+    # The earlier request belongs to a finished window
+    assert pool.record_request('alpha') is True
+    assert pool.record_request('alpha') is False
+
+
+def test_block_rests_a_session_longer_each_time(pool):
+    pool.configure(cooldown_seconds=100)
+    assert pool.record_block('alpha', 'authwall') == 100
+    assert pool.record_block('alpha', 'authwall') == 200
+    assert resting(pool) == {'alpha'}
+    assert pool.acquire('worker-0', exclude=['beta', 'gamma']) is None
+    assert pool.seconds_until_available() == 0
+    pool.record_block('beta', 'captcha')
+    pool.record_block('gamma', 'captcha')
+    assert pool.acquire('worker-0') is None
+    assert 0 < pool.seconds_until_available() <= 100
+
+    # A clean request resets the doubling, and the cooldown is capped
+    pool.record_success('alpha')
+    assert pool.record_block('alpha', 'authwall') == 100
+    pool.configure(cooldown_seconds=MAX_COOLDOWN_SECONDS)
+    assert pool.record_block('alpha', 'authwall') == MAX_COOLDOWN_SECONDS
+
+
+def test_rested_session_comes_back(pool):
+    pool.configure(cooldown_seconds=0.05)
+    pool.record_block('alpha', 'captcha')
+    assert pool.acquire('worker-0', exclude=['beta', 'gamma']) is None
+    time.sleep(0.1)
+    assert pool.acquire('worker-0', exclude=['beta', 'gamma'])['name'] == 'alpha'
+
+
+def test_expired_session_leaves_rotation_until_added_again(pool):
+    pool.acquire('worker-0', exclude=['beta', 'gamma'])
+    pool.expire('alpha')
+    assert {session['name']: session['status'] for session in pool.snapshot()}['alpha'] == STATUS_EXPIRED
+    assert pool.acquire('worker-0', exclude=['beta', 'gamma']) is None
+    pool.add('alpha', cookies('alpha'))
+    assert pool.acquire('worker-0', exclude=['beta', 'gamma'])['name'] == 'alpha'
+
+
+def test_limits_are_shared_through_the_database(pool):
+    pool.configure(max_requests=5)
+    other = SessionPool(pool.path)
+    try:
+        assert other.limits['max_requests'] == 5
+        other.acquire('worker-1', exclude=['beta', 'gamma'])
+        assert pool.acquire('worker-0')['name'] != 'alpha'
+    finally:
+        other.close()
+
+
+def test_fake_authority_checks_session_cookies(tmp_path):
+    authority = FakeSessionAuthority(str(tmp_path / 'authority.sqlite'))
+    issued = authority.issue('alpha')
+    assert authority.check(issued) == 'ok'
+    assert authority.check([{'name': 'li_at', 'value': 'forged'}]) == 'invalid'
+    assert authority.check([]) == 'invalid'
+
+
+def test_fake_authority_throttles_each_session_per_window(tmp_path):
+    authority = FakeSessionAuthority(str(tmp_path / 'authority.sqlite'), max_requests=2, window_seconds=0.1)
+    alpha, beta = authority.issue('alpha'), authority.issue('beta')
+    assert [authority.check(alpha) for _ in range(3)] == ['ok', 'ok', 'throttled']
+    # Uncounted checks (login pages) and other sessions aren't affected
+    assert authority.check(alpha, counted=False) == 'ok'
+    assert authority.check(beta) == 'ok'
+    time.sleep(0.15)
+    assert authority.check(alpha) == 'ok'